@@ -26,12 +26,87 @@ coverage state consistency, and branchIndex semantics.
 
 This script investigates potential issues that could affect JDart's
 CoverageHeuristicStrategy when using this block map.
+
+Usage::
+
+    python3 analyze_block_map.py [<icfg_block_map.json>] \\
+        [--coverage-data coverage_data.json] [--stream] [--max-samples N] \\
+        [--sections 1-4,9,14] [--engine python|columnar] \\
+        [--cache-dir DIR | --no-cache]
+    python3 analyze_block_map.py --batch <dir-or-glob> [--batch ...] \\
+        [--jobs N] [--batch-output summary.tsv] [--engine ...]
+    python3 analyze_block_map.py <old_block_map.json> --delta <new_block_map.json> \\
+        [--max-samples N]
+    python3 analyze_block_map.py [...] --record runs.db [--sut NAME]
+    python3 analyze_block_map.py --registry runs.db [--sut NAME] [--last N]
+
+The block map is traversed once; every report section is a collector fed
+from that single pass, so ``--sections`` only changes which collectors are
+registered, never how often the map is read.
+
+``--stream`` walks ``methodBlockMaps[*]`` incrementally instead of calling
+``json.load`` on the whole file, and only keeps counters plus the first
+``--max-samples`` entries of every detailed listing. Peak memory is then
+bounded by the largest single method map rather than by the block map.
+
+``--batch DIR_OR_GLOB`` analyzes every matching block map (paired with the
+``coverage_data.json`` of its data directory) on a process pool and prints
+one merged cross-SUT table with per-file timings instead of the full report.
+
+``--engine columnar`` computes the sections with NumPy over the tables of
+``block_map_columnar``. Those tables are cached on disk by content hash
+(see ``block_map_cache``), so re-analysing an unchanged block map skips the
+JSON decode entirely and memory-maps the cached columns instead. Most of the
+speedup comes from that warm cache: a first (or ``--no-cache``) run still
+decodes the JSON and walks every dict once to build the tables, so it is
+only moderately faster than ``--engine python``.
+
+``--record DB`` stores every analyzed map's summary counters in the SQLite
+run registry (``scripts/run_registry.py``); ``--registry DB [--sut NAME]``
+prints the stored summaries as a batch table without reading any map.
+
+``--delta NEW`` compares the block map argument with ``NEW``: methods are
+matched by ``fullName`` and blocks by ``id``, and only changed coverage
+states, edge hits and hits=-1 transitions are reported. Both files are
+streamed in lockstep, so the comparison is a single pass over each file.
 """
 
+import argparse
+import csv
+import glob
+import heapq
 import json
+import os
+import re
 import sys
+import time
 from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import zip_longest
 from pathlib import Path
+from typing import Optional
+
+from gc_json import load_json
+from coverage_index import (
+    ATTRIBUTIONS,
+    COLLISION_ATTRIBUTIONS,
+    ScopedLineIndex,
+    block_map_scope,
+)
+
+try:
+    import numpy as np
+    from block_map_cache import BlockMapCache
+    from block_map_columnar import (
+        ColumnarBlockMap,
+        ScopedLineTable,
+        build_columnar,
+        build_scoped_line_table,
+        first_seen_counts,
+    )
+except ImportError:  # numpy is only needed for --engine columnar
+    np = None
 
 BLOCK_MAP_PATH = Path(
     "/Users/yoran.mertens/dev/master-thesis/covet"
@@ -43,410 +118,923 @@ COVERAGE_DATA_PATH = Path(
     "/development/data/coverage/coverage_data.json"
 )
 
+# Samples kept per detailed listing in --stream mode when --max-samples is
+# not given explicitly.
+DEFAULT_STREAM_MAX_SAMPLES = 25
+
+STREAM_CHUNK_SIZE = 1 << 20
+
+
+# ================================================================
+# STREAMING READER
+# ================================================================
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+
+class _JsonStream:
+    """Minimal pull tokenizer over a text file for top-level JSON walking.
+
+    Only structural characters are consumed one at a time; every value is
+    decoded with ``JSONDecoder.raw_decode`` from a sliding buffer that grows
+    just enough to hold it.
+    """
+
+    def __init__(self, f, chunk_size: int = STREAM_CHUNK_SIZE):
+        self._f = f
+        self._chunk_size = chunk_size
+        self._buf = ""
+        self._pos = 0
+        self._eof = False
+
+    def _fill(self, min_chars: int = 0) -> None:
+        # Drop the consumed prefix before appending, so the buffer only ever
+        # holds the value currently being decoded.
+        if self._pos:
+            self._buf = self._buf[self._pos:]
+            self._pos = 0
+        data = self._f.read(max(self._chunk_size, min_chars))
+        if not data:
+            self._eof = True
+        self._buf += data
+
+    def peek(self) -> str:
+        """Next non-whitespace character, or ``""`` at end of input."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if self._eof:
+                return ""
+            self._fill()
+
+    def consume(self, ch: str) -> bool:
+        if self.peek() != ch:
+            return False
+        self._pos += 1
+        return True
+
+    def expect(self, ch: str) -> None:
+        if not self.consume(ch):
+            got = self.peek() or "<EOF>"
+            raise ValueError(f"malformed block map: expected '{ch}', got '{got}'")
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                obj, end = _DECODER.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError:
+                if self._eof:
+                    raise
+                # Value straddles the buffer end: grow geometrically.
+                self._fill(len(self._buf))
+                continue
+            # A number ending exactly at the buffer edge may be truncated.
+            if end == len(self._buf) and not self._eof:
+                self._fill(len(self._buf))
+                continue
+            self._pos = end
+            return obj
+
+
+def iter_method_maps(path: Path, chunk_size: int = STREAM_CHUNK_SIZE):
+    """Yield the ``methodBlockMaps`` entries of a block map one at a time.
+
+    Other top-level members are decoded and discarded, so only one method
+    map is alive at any point.
+    """
+    with open(path, encoding="utf-8") as f:
+        stream = _JsonStream(f, chunk_size)
+        stream.expect("{")
+        if stream.consume("}"):
+            return
+        while True:
+            key = stream.value()
+            stream.expect(":")
+            if key == "methodBlockMaps":
+                stream.expect("[")
+                if not stream.consume("]"):
+                    while True:
+                        yield stream.value()
+                        if not stream.consume(","):
+                            stream.expect("]")
+                            break
+            else:
+                stream.value()
+            if not stream.consume(","):
+                stream.expect("}")
+                return
 
-def load_json(path: Path) -> dict:
-    with open(path) as f:
-        return json.load(f)
 
+class StreamedMethodMaps:
+    """Re-iterable view over ``methodBlockMaps`` that streams from disk.
 
-def analyze(data, coverage_data):
-    method_maps = data.get("methodBlockMaps", [])
-    print(f"Total method block maps: {len(method_maps)}")
-    print()
+    Every iteration re-reads the file, so sections that walk the method maps
+    again cost another sequential read rather than resident memory.
+    """
 
-    # -- Aggregate counters --
-    total_blocks = 0
-    total_edges = 0
+    def __init__(self, path: Path, chunk_size: int = STREAM_CHUNK_SIZE):
+        self.path = path
+        self.chunk_size = chunk_size
 
-    edge_hits_minus1 = 0
-    edge_hits_zero = 0
-    edge_hits_positive = 0
+    def __iter__(self):
+        return iter_method_maps(self.path, self.chunk_size)
 
-    blocks_with_edges = 0
-    blocks_without_edges = 0
 
-    blocks_all_edges_minus1 = []
-    blocks_mixed_minus1 = []
+# ================================================================
+# BOUNDED ACCUMULATORS
+# ================================================================
 
-    coverage_state_counts = Counter()
-    coverage_state_of_all_minus1 = Counter()
-    coverage_state_of_any_minus1 = Counter()
+class BoundedSample:
+    """Counts every added item but only keeps the first ``limit`` of them.
 
-    branch_type_counts = Counter()
-    branch_index_by_type = defaultdict(Counter)
+    ``len()`` reports the full count; iteration yields the kept items.
+    ``limit=None`` keeps everything.
+    """
 
-    inconsistent_blocks = []
-    covered_with_minus1_edges = []
-    not_covered_with_positive_edges = []
-    partial_blocks_edge_analysis = []
-    if_branch_index_patterns = []
-    method_summaries = []
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.count = 0
+        self.items = []
 
-    for mm in method_maps:
-        method_name = mm.get("fullName", "<unknown>")
-        blocks = mm.get("blocks", [])
-        method_block_count = len(blocks)
-        method_edge_count = 0
-        method_edges_minus1 = 0
-
-        for block in blocks:
-            total_blocks += 1
-            block_id = block["id"]
-            coverage_state = block["coverageData"]["coverageState"]
-            edges = block.get("edges", [])
-            coverage_state_counts[coverage_state] += 1
-
-            if not edges:
-                blocks_without_edges += 1
-                continue
+    def add(self, item) -> None:
+        self.count += 1
+        if self.limit is None or len(self.items) < self.limit:
+            self.items.append(item)
 
-            blocks_with_edges += 1
-            total_edges += len(edges)
-            method_edge_count += len(edges)
-
-            edge_hit_values = []
-            for edge in edges:
-                hits = edge["hits"]
-                branch_type = edge["branchType"]
-                branch_index = edge["branchIndex"]
-
-                branch_type_counts[branch_type] += 1
-                branch_index_by_type[branch_type][branch_index] += 1
-                edge_hit_values.append(hits)
-
-                if hits == -1:
-                    edge_hits_minus1 += 1
-                    method_edges_minus1 += 1
-                elif hits == 0:
-                    edge_hits_zero += 1
-                elif hits > 0:
-                    edge_hits_positive += 1
-
-            all_minus1 = all(h == -1 for h in edge_hit_values)
-            any_minus1 = any(h == -1 for h in edge_hit_values)
-            any_positive = any(h > 0 for h in edge_hit_values)
-            all_positive = all(h > 0 for h in edge_hit_values)
-
-            if all_minus1:
-                blocks_all_edges_minus1.append(
-                    (method_name, block_id, coverage_state, edges)
-                )
-                coverage_state_of_all_minus1[coverage_state] += 1
-
-            if any_minus1 and not all_minus1:
-                blocks_mixed_minus1.append(
-                    (method_name, block_id, coverage_state, edges)
-                )
-
-            if any_minus1:
-                coverage_state_of_any_minus1[coverage_state] += 1
-
-            if coverage_state == "COVERED" and any_minus1:
-                covered_with_minus1_edges.append(
-                    (method_name, block_id, edges)
-                )
-
-            if coverage_state == "NOT_COVERED" and any_positive:
-                not_covered_with_positive_edges.append(
-                    (method_name, block_id, edges)
-                )
-
-            if coverage_state == "PARTIALLY_COVERED":
-                has_taken = any(h > 0 for h in edge_hit_values)
-                has_not_taken = any(h == 0 for h in edge_hit_values)
-                has_unknown = any(h == -1 for h in edge_hit_values)
-                partial_blocks_edge_analysis.append(
-                    {
-                        "method": method_name,
-                        "block_id": block_id,
-                        "edge_hits": edge_hit_values,
-                        "has_taken": has_taken,
-                        "has_not_taken": has_not_taken,
-                        "has_unknown": has_unknown,
-                        "edges": edges,
-                    }
-                )
-
-            if coverage_state == "COVERED" and len(edges) == 2:
-                if not all_positive:
-                    inconsistent_blocks.append(
-                        {
-                            "type": "COVERED_but_not_all_positive",
-                            "method": method_name,
-                            "block_id": block_id,
-                            "edge_hits": edge_hit_values,
-                            "edges": edges,
-                        }
-                    )
-
-            if coverage_state == "NOT_COVERED" and any_positive:
-                inconsistent_blocks.append(
-                    {
-                        "type": "NOT_COVERED_but_has_positive",
-                        "method": method_name,
-                        "block_id": block_id,
-                        "edge_hits": edge_hit_values,
-                        "edges": edges,
-                    }
-                )
-
-            if_true_indices = []
-            if_false_indices = []
-            for edge in edges:
-                if edge["branchType"] == "IF_TRUE":
-                    if_true_indices.append(edge["branchIndex"])
-                elif edge["branchType"] == "IF_FALSE":
-                    if_false_indices.append(edge["branchIndex"])
-
-            if if_true_indices or if_false_indices:
-                if_branch_index_patterns.append(
-                    {
-                        "method": method_name,
-                        "block_id": block_id,
-                        "if_true_indices": if_true_indices,
-                        "if_false_indices": if_false_indices,
-                    }
-                )
-
-        method_summaries.append(
-            {
-                "method": method_name,
-                "blocks": method_block_count,
-                "edges": method_edge_count,
-                "edges_minus1": method_edges_minus1,
-            }
-        )
+    def skip(self, n: int) -> None:
+        """Count ``n`` further items without keeping any of them."""
+        self.count += n
 
-    # ================================================================
-    # REPORT
-    # ================================================================
-    sep = "=" * 72
-
-    print(sep)
-    print("1. OVERALL STATISTICS")
-    print(sep)
-    print(f"  Total blocks:         {total_blocks}")
-    print(f"  Blocks with edges:    {blocks_with_edges}")
-    print(f"  Blocks without edges: {blocks_without_edges}")
-    print(f"  Total edges:          {total_edges}")
-    print()
+    @property
+    def omitted(self) -> int:
+        return self.count - len(self.items)
 
-    print(sep)
-    print("2. EDGE HIT VALUE DISTRIBUTION")
-    print(sep)
-    print(f"  hits = -1:  {edge_hits_minus1:>5}  ({edge_hits_minus1/total_edges*100:.1f}%)")
-    print(f"  hits =  0:  {edge_hits_zero:>5}  ({edge_hits_zero/total_edges*100:.1f}%)")
-    print(f"  hits >  0:  {edge_hits_positive:>5}  ({edge_hits_positive/total_edges*100:.1f}%)")
-    print()
+    def __len__(self) -> int:
+        return self.count
 
-    print(sep)
-    print("3. COVERAGE STATE DISTRIBUTION (all blocks)")
-    print(sep)
-    for state, count in coverage_state_counts.most_common():
-        print(f"  {state:>20s}: {count:>5}  ({count/total_blocks*100:.1f}%)")
-    print()
+    def __iter__(self):
+        return iter(self.items)
 
-    print(sep)
-    print("4. BLOCKS WHERE ALL EDGES HAVE hits=-1")
-    print(sep)
-    print(f"  Count: {len(blocks_all_edges_minus1)}")
-    print()
-    print("  Coverage state breakdown of these blocks:")
-    for state, count in coverage_state_of_all_minus1.most_common():
-        print(f"    {state:>20s}: {count}")
-    print()
-    print("  Detailed listing:")
-    for method, bid, state, edges in blocks_all_edges_minus1:
-        short_method = method.split(".")[-1].split("(")[0] if "." in method else method
-        edge_types = [f"{e['branchType']}(idx={e['branchIndex']})" for e in edges]
-        print(f"    Block {bid:>3} in ...{short_method}  state={state:>20s}  edges={edge_types}")
-    print()
 
-    print(sep)
-    print("5. BLOCKS WITH MIXED hits=-1 AND OTHER VALUES")
-    print(sep)
-    print(f"  Count: {len(blocks_mixed_minus1)}")
-    if blocks_mixed_minus1:
-        for method, bid, state, edges in blocks_mixed_minus1:
-            short_method = method.split(".")[-1].split("(")[0] if "." in method else method
-            edge_desc = [f"{e['branchType']}(idx={e['branchIndex']},hits={e['hits']})" for e in edges]
-            print(f"    Block {bid:>3} in ...{short_method}  state={state:>20s}  edges={edge_desc}")
-    print()
+class TopSample:
+    """Keeps the ``limit`` items with the largest key (all if ``limit=None``).
 
-    print(sep)
-    print("6. CONSISTENCY: COVERED BLOCKS WITH hits=-1 EDGES")
-    print(sep)
-    print(f"  Count: {len(covered_with_minus1_edges)}")
-    print()
-    for method, bid, edges in covered_with_minus1_edges:
-        short_method = method.split(".")[-1].split("(")[0] if "." in method else method
-        edge_desc = [f"{e['branchType']}(idx={e['branchIndex']},hits={e['hits']})" for e in edges]
-        print(f"    Block {bid:>3} in ...{short_method}  edges={edge_desc}")
-    print()
+    Ties are broken by insertion order, matching a stable descending sort.
+    """
 
-    print(sep)
-    print("7. CONSISTENCY: NOT_COVERED BLOCKS WITH hits>0 EDGES (BUGS)")
-    print(sep)
-    print(f"  Count: {len(not_covered_with_positive_edges)}")
-    if not_covered_with_positive_edges:
-        for method, bid, edges in not_covered_with_positive_edges:
-            short_method = method.split(".")[-1].split("(")[0] if "." in method else method
-            edge_desc = [f"{e['branchType']}(idx={e['branchIndex']},hits={e['hits']})" for e in edges]
-            print(f"    Block {bid:>3} in ...{short_method}  edges={edge_desc}")
-    else:
-        print("  None found (good).")
-    print()
+    def __init__(self, limit=None):
+        self.limit = limit
+        self.count = 0
+        self._heap = []
 
-    print(sep)
-    print("8. PARTIALLY_COVERED BLOCKS: EDGE ANALYSIS")
-    print(sep)
-    print(f"  Total PARTIALLY_COVERED blocks with edges: {len(partial_blocks_edge_analysis)}")
-    print()
-    partial_consistent = 0
-    partial_all_minus1 = 0
-    partial_no_taken = 0
-    partial_other = 0
-    for p in partial_blocks_edge_analysis:
-        hit_vals = p["edge_hits"]
-        if all(h == -1 for h in hit_vals):
-            partial_all_minus1 += 1
-        elif p["has_taken"] and (p["has_not_taken"] or p["has_unknown"]):
-            partial_consistent += 1
-        elif not p["has_taken"]:
-            partial_no_taken += 1
-        else:
-            partial_other += 1
+    def add(self, key, item) -> None:
+        entry = (key, -self.count, item)
+        self.count += 1
+        if self.limit is None or len(self._heap) < self.limit:
+            heapq.heappush(self._heap, entry)
+        elif self._heap and entry[:2] > self._heap[0][:2]:
+            heapq.heapreplace(self._heap, entry)
 
-    print(f"  Consistent (has taken + not-taken edges):   {partial_consistent}")
-    print(f"  All edges hits=-1 (no edge-level data):     {partial_all_minus1}")
-    print(f"  No taken edge but state=PARTIAL:            {partial_no_taken}")
-    print(f"  Other:                                      {partial_other}")
-    print()
+    def skip(self, n: int) -> None:
+        """Count ``n`` further items that are known not to make the cut."""
+        self.count += n
 
-    print(sep)
-    print("9. BRANCH TYPE DISTRIBUTION")
-    print(sep)
-    for bt, count in branch_type_counts.most_common():
-        print(f"    {bt:>15s}: {count:>5}")
-    print()
+    @property
+    def omitted(self) -> int:
+        return self.count - len(self._heap)
 
-    print(sep)
-    print("10. branchIndex VALUES PER BRANCH TYPE")
-    print(sep)
-    for bt in sorted(branch_index_by_type.keys()):
-        indices = branch_index_by_type[bt]
-        print(f"    {bt}:")
-        for idx, count in sorted(indices.items()):
-            print(f"      branchIndex={idx}: {count} occurrences")
-    print()
+    def sorted(self) -> list:
+        return [item for _, _, item in sorted(self._heap, key=lambda e: e[:2], reverse=True)]
 
-    print(sep)
-    print("11. branchIndex CONSISTENCY FOR IF_TRUE/IF_FALSE PAIRS")
-    print(sep)
-    if_true_always_0 = 0
-    if_true_not_0 = 0
-    if_false_always_1 = 0
-    if_false_not_1 = 0
-    for p in if_branch_index_patterns:
-        for idx in p["if_true_indices"]:
-            if idx == 0:
-                if_true_always_0 += 1
-            else:
-                if_true_not_0 += 1
-        for idx in p["if_false_indices"]:
-            if idx == 1:
-                if_false_always_1 += 1
-            else:
-                if_false_not_1 += 1
 
-    print(f"    IF_TRUE  with branchIndex=0: {if_true_always_0}  (expected)")
-    print(f"    IF_TRUE  with branchIndex!=0: {if_true_not_0}  (unexpected)")
-    print(f"    IF_FALSE with branchIndex=1: {if_false_always_1}  (expected)")
-    print(f"    IF_FALSE with branchIndex!=1: {if_false_not_1}  (unexpected)")
-    print()
-    if if_true_not_0 or if_false_not_1:
-        print("    WARNING: branchIndex is NOT always 0=IF_TRUE, 1=IF_FALSE!")
-    else:
-        print("    CONSISTENT: branchIndex=0 always maps to IF_TRUE, branchIndex=1 always maps to IF_FALSE.")
-    print()
+def print_omitted(sample, indent: str = "    ") -> None:
+    if sample.omitted:
+        print(f"{indent}... {sample.omitted} more not shown (raise --max-samples to see them)")
 
-    # -- What does hits=-1 mean? --
-    print(sep)
-    print("12. ANALYSIS: WHAT DOES hits=-1 MEAN?")
-    print(sep)
 
-    goto_minus1 = 0
-    if_minus1 = 0
-    normal_minus1 = 0
-    switch_minus1 = 0
-    for mm in method_maps:
-        for block in mm.get("blocks", []):
-            for edge in block.get("edges", []):
-                if edge["hits"] == -1:
-                    bt = edge["branchType"]
-                    if bt == "GOTO":
-                        goto_minus1 += 1
-                    elif bt in ("IF_TRUE", "IF_FALSE"):
-                        if_minus1 += 1
-                    elif bt == "NORMAL":
-                        normal_minus1 += 1
-                    else:
-                        switch_minus1 += 1
-
-    print(f"    hits=-1 on GOTO edges:             {goto_minus1}")
-    print(f"    hits=-1 on IF_TRUE/IF_FALSE edges: {if_minus1}")
-    print(f"    hits=-1 on NORMAL edges:           {normal_minus1}")
-    print(f"    hits=-1 on SWITCH_* edges:         {switch_minus1}")
-    print()
+# ================================================================
+# COLLECTORS
+# ================================================================
+#
+# analyze() walks the method maps exactly once. Every block is summarised
+# into a BlockFacts record (the only per-edge pass shared by all sections)
+# and handed to each selected collector; collectors keep their own counters
+# and bounded samples and print their section afterwards. Adding a section
+# means adding a collector class to COLLECTORS.
+
+SEP = "=" * 72
+
+IF_BRANCH_TYPES = ("IF_TRUE", "IF_FALSE")
+
+
+def short_method_name(method: str) -> str:
+    return method.split(".")[-1].split("(")[0] if "." in method else method
 
-    total_if_edges = branch_type_counts.get("IF_TRUE", 0) + branch_type_counts.get("IF_FALSE", 0)
-    if_zero = sum(
-        1
-        for mm in method_maps
-        for block in mm.get("blocks", [])
-        for edge in block.get("edges", [])
-        if edge["branchType"] in ("IF_TRUE", "IF_FALSE") and edge["hits"] == 0
+
+def describe_edges(edges) -> list:
+    return [f"{e['branchType']}(idx={e['branchIndex']},hits={e['hits']})" for e in edges]
+
+
+def sample_block_rows(sample: BoundedSample, rows, make_item) -> None:
+    """Add block rows (columnar engine) to ``sample``, materialising only the kept ones."""
+    room = len(rows) if sample.limit is None else max(sample.limit - len(sample.items), 0)
+    for b in rows[:room]:
+        sample.add(make_item(int(b)))
+    sample.skip(max(len(rows) - room, 0))
+
+
+def print_header(title: str) -> None:
+    print(SEP)
+    print(title)
+    print(SEP)
+
+
+class BlockFacts:
+    """Per-block values shared by every collector, computed in one edge pass."""
+
+    __slots__ = (
+        "method", "block", "block_id", "state", "edges", "edge_hits",
+        "all_minus1", "any_minus1", "any_positive", "all_positive",
     )
-    if_pos = total_if_edges - if_minus1 - if_zero
 
-    print(f"    Total IF_TRUE + IF_FALSE edges: {total_if_edges}")
-    print(f"    Of those with hits=-1:          {if_minus1}  ({if_minus1/max(total_if_edges,1)*100:.1f}%)")
-    print(f"    Of those with hits=0:           {if_zero}")
-    print(f"    Of those with hits>0:           {if_pos}")
-    print()
+    def __init__(self, method: str, block: dict):
+        self.method = method
+        self.block = block
+        self.block_id = block["id"]
+        self.state = block["coverageData"]["coverageState"]
+        self.edges = block.get("edges", [])
+        hits = [edge["hits"] for edge in self.edges]
+        self.edge_hits = hits
+        self.all_minus1 = all(h == -1 for h in hits)
+        self.any_minus1 = -1 in hits
+        self.any_positive = any(h > 0 for h in hits)
+        self.all_positive = all(h > 0 for h in hits)
+
+
+class Collector:
+    """One report section.
+
+    ``visit_block`` is called for every block (with or without edges) and
+    ``end_method`` after the last block of each method. ``consume_columnar``
+    is the vectorized alternative used by ``--engine columnar``: it fills
+    the same state from a :class:`~block_map_columnar.ColumnarBlockMap` in
+    one go. ``report`` prints the section once either path is done;
+    ``summary`` returns its headline counts for batch mode, where counts of
+    different block maps are summed.
+    """
+
+    section = 0
+    title = ""
+    # Sections that need coverage_data.json are skipped when it is missing.
+    needs_coverage_data = False
+
+    def __init__(self, max_samples=None, coverage_data=None):
+        self.max_samples = max_samples
+
+    def visit_block(self, facts: BlockFacts) -> None:
+        pass
+
+    def end_method(self, method: str) -> None:
+        pass
+
+    def consume_columnar(self, cbm) -> None:
+        raise NotImplementedError
+
+    def summary(self) -> dict:
+        return {}
+
+    def report(self) -> None:
+        raise NotImplementedError
+
+
+class OverallCollector(Collector):
+    section = 1
+    title = "OVERALL STATISTICS"
+
+    def __init__(self, max_samples=None, coverage_data=None):
+        super().__init__(max_samples, coverage_data)
+        self.total_blocks = 0
+        self.blocks_with_edges = 0
+        self.total_edges = 0
+
+    def visit_block(self, facts):
+        self.total_blocks += 1
+        if facts.edges:
+            self.blocks_with_edges += 1
+            self.total_edges += len(facts.edges)
+
+    def consume_columnar(self, cbm):
+        self.total_blocks = cbm.n_blocks
+        self.blocks_with_edges = int(np.count_nonzero(cbm.edge_counts))
+        self.total_edges = cbm.n_edges
+
+    def summary(self):
+        return {
+            "blocks": self.total_blocks,
+            "blocks_with_edges": self.blocks_with_edges,
+            "edges": self.total_edges,
+        }
+
+    def report(self):
+        print_header("1. OVERALL STATISTICS")
+        print(f"  Total blocks:         {self.total_blocks}")
+        print(f"  Blocks with edges:    {self.blocks_with_edges}")
+        print(f"  Blocks without edges: {self.total_blocks - self.blocks_with_edges}")
+        print(f"  Total edges:          {self.total_edges}")
+        print()
+
+
+class HitDistributionCollector(Collector):
+    section = 2
+    title = "EDGE HIT VALUE DISTRIBUTION"
+
+    def __init__(self, max_samples=None, coverage_data=None):
+        super().__init__(max_samples, coverage_data)
+        self.minus1 = 0
+        self.zero = 0
+        self.positive = 0
+        self.total = 0
+
+    def visit_block(self, facts):
+        for h in facts.edge_hits:
+            if h == -1:
+                self.minus1 += 1
+            elif h == 0:
+                self.zero += 1
+            elif h > 0:
+                self.positive += 1
+        self.total += len(facts.edge_hits)
+
+    def consume_columnar(self, cbm):
+        hits = cbm.edge_hits
+        self.minus1 = int(np.count_nonzero(hits == -1))
+        self.zero = int(np.count_nonzero(hits == 0))
+        self.positive = int(np.count_nonzero(hits > 0))
+        self.total = cbm.n_edges
+
+    def summary(self):
+        return {
+            "edges_minus1": self.minus1,
+            "edges_zero": self.zero,
+            "edges_positive": self.positive,
+        }
+
+    def report(self):
+        total = self.total
+        print_header("2. EDGE HIT VALUE DISTRIBUTION")
+        print(f"  hits = -1:  {self.minus1:>5}  ({self.minus1/total*100:.1f}%)")
+        print(f"  hits =  0:  {self.zero:>5}  ({self.zero/total*100:.1f}%)")
+        print(f"  hits >  0:  {self.positive:>5}  ({self.positive/total*100:.1f}%)")
+        print()
+
+
+class CoverageStateCollector(Collector):
+    section = 3
+    title = "COVERAGE STATE DISTRIBUTION"
+
+    def __init__(self, max_samples=None, coverage_data=None):
+        super().__init__(max_samples, coverage_data)
+        self.states = Counter()
+        self.total_blocks = 0
+
+    def visit_block(self, facts):
+        self.states[facts.state] += 1
+        self.total_blocks += 1
+
+    def consume_columnar(self, cbm):
+        self.states = Counter(dict(first_seen_counts(cbm.block_state, cbm.state_names)))
+        self.total_blocks = cbm.n_blocks
+
+    def summary(self):
+        return {f"blocks_{state.lower()}": count for state, count in self.states.items()}
+
+    def report(self):
+        print_header("3. COVERAGE STATE DISTRIBUTION (all blocks)")
+        for state, count in self.states.most_common():
+            print(f"  {state:>20s}: {count:>5}  ({count/self.total_blocks*100:.1f}%)")
+        print()
+
+
+class AllMinus1BlocksCollector(Collector):
+    section = 4
+    title = "BLOCKS WHERE ALL EDGES HAVE hits=-1"
+
+    def __init__(self, max_samples=None, coverage_data=None):
+        super().__init__(max_samples, coverage_data)
+        self.blocks = BoundedSample(max_samples)
+        self.states = Counter()
+
+    def visit_block(self, facts):
+        if facts.edges and facts.all_minus1:
+            self.blocks.add((facts.method, facts.block_id, facts.state, facts.edges))
+            self.states[facts.state] += 1
+
+    def consume_columnar(self, cbm):
+        rows = np.flatnonzero(cbm.block_all_minus1)
+        self.states = Counter(dict(first_seen_counts(cbm.block_state[rows], cbm.state_names)))
+        sample_block_rows(self.blocks, rows, lambda b: (
+            cbm.method_names[cbm.block_method[b]],
+            int(cbm.block_id[b]),
+            cbm.state_names[cbm.block_state[b]],
+            cbm.block_edges(b),
+        ))
+
+    def summary(self):
+        return {"all_minus1_blocks": len(self.blocks)}
+
+    def report(self):
+        print_header("4. BLOCKS WHERE ALL EDGES HAVE hits=-1")
+        print(f"  Count: {len(self.blocks)}")
+        print()
+        print("  Coverage state breakdown of these blocks:")
+        for state, count in self.states.most_common():
+            print(f"    {state:>20s}: {count}")
+        print()
+        print("  Detailed listing:")
+        for method, bid, state, edges in self.blocks:
+            edge_types = [f"{e['branchType']}(idx={e['branchIndex']})" for e in edges]
+            print(f"    Block {bid:>3} in ...{short_method_name(method)}  state={state:>20s}  edges={edge_types}")
+        print_omitted(self.blocks)
+        print()
+
+
+class MixedMinus1BlocksCollector(Collector):
+    section = 5
+    title = "BLOCKS WITH MIXED hits=-1 AND OTHER VALUES"
+
+    def __init__(self, max_samples=None, coverage_data=None):
+        super().__init__(max_samples, coverage_data)
+        self.blocks = BoundedSample(max_samples)
+
+    def visit_block(self, facts):
+        if facts.any_minus1 and not facts.all_minus1:
+            self.blocks.add((facts.method, facts.block_id, facts.state, facts.edges))
+
+    def consume_columnar(self, cbm):
+        rows = np.flatnonzero((cbm.block_minus1 > 0) & ~cbm.block_all_minus1)
+        sample_block_rows(self.blocks, rows, lambda b: (
+            cbm.method_names[cbm.block_method[b]],
+            int(cbm.block_id[b]),
+            cbm.state_names[cbm.block_state[b]],
+            cbm.block_edges(b),
+        ))
+
+    def summary(self):
+        return {"mixed_minus1_blocks": len(self.blocks)}
+
+    def report(self):
+        print_header("5. BLOCKS WITH MIXED hits=-1 AND OTHER VALUES")
+        print(f"  Count: {len(self.blocks)}")
+        if self.blocks:
+            for method, bid, state, edges in self.blocks:
+                print(f"    Block {bid:>3} in ...{short_method_name(method)}  state={state:>20s}  edges={describe_edges(edges)}")
+            print_omitted(self.blocks)
+        print()
+
+
+class CoveredWithMinus1Collector(Collector):
+    section = 6
+    title = "CONSISTENCY: COVERED BLOCKS WITH hits=-1 EDGES"
+
+    def __init__(self, max_samples=None, coverage_data=None):
+        super().__init__(max_samples, coverage_data)
+        self.blocks = BoundedSample(max_samples)
+
+    def visit_block(self, facts):
+        if facts.state == "COVERED" and facts.any_minus1:
+            self.blocks.add((facts.method, facts.block_id, facts.edges))
+
+    def consume_columnar(self, cbm):
+        covered = cbm.block_state == cbm.state_code("COVERED")
+        rows = np.flatnonzero(covered & (cbm.block_minus1 > 0))
+        sample_block_rows(self.blocks, rows, lambda b: (
+            cbm.method_names[cbm.block_method[b]],
+            int(cbm.block_id[b]),
+            cbm.block_edges(b),
+        ))
+
+    def summary(self):
+        return {"covered_with_minus1": len(self.blocks)}
+
+    def report(self):
+        print_header("6. CONSISTENCY: COVERED BLOCKS WITH hits=-1 EDGES")
+        print(f"  Count: {len(self.blocks)}")
+        print()
+        for method, bid, edges in self.blocks:
+            print(f"    Block {bid:>3} in ...{short_method_name(method)}  edges={describe_edges(edges)}")
+        print_omitted(self.blocks)
+        print()
+
+
+class NotCoveredWithPositiveCollector(Collector):
+    section = 7
+    title = "CONSISTENCY: NOT_COVERED BLOCKS WITH hits>0 EDGES"
+
+    def __init__(self, max_samples=None, coverage_data=None):
+        super().__init__(max_samples, coverage_data)
+        self.blocks = BoundedSample(max_samples)
+
+    def visit_block(self, facts):
+        if facts.state == "NOT_COVERED" and facts.any_positive:
+            self.blocks.add((facts.method, facts.block_id, facts.edges))
+
+    def consume_columnar(self, cbm):
+        not_covered = cbm.block_state == cbm.state_code("NOT_COVERED")
+        rows = np.flatnonzero(not_covered & (cbm.block_positive > 0))
+        sample_block_rows(self.blocks, rows, lambda b: (
+            cbm.method_names[cbm.block_method[b]],
+            int(cbm.block_id[b]),
+            cbm.block_edges(b),
+        ))
+
+    def summary(self):
+        return {"not_covered_with_positive": len(self.blocks)}
+
+    def report(self):
+        print_header("7. CONSISTENCY: NOT_COVERED BLOCKS WITH hits>0 EDGES (BUGS)")
+        print(f"  Count: {len(self.blocks)}")
+        if self.blocks:
+            for method, bid, edges in self.blocks:
+                print(f"    Block {bid:>3} in ...{short_method_name(method)}  edges={describe_edges(edges)}")
+            print_omitted(self.blocks)
+        else:
+            print("  None found (good).")
+        print()
+
+
+class PartiallyCoveredCollector(Collector):
+    section = 8
+    title = "PARTIALLY_COVERED BLOCKS: EDGE ANALYSIS"
+
+    def __init__(self, max_samples=None, coverage_data=None):
+        super().__init__(max_samples, coverage_data)
+        self.total = 0
+        self.consistent = 0
+        self.all_minus1 = 0
+        self.no_taken = 0
+        self.other = 0
+
+    def visit_block(self, facts):
+        if not facts.edges or facts.state != "PARTIALLY_COVERED":
+            return
+        self.total += 1
+        has_taken = facts.any_positive
+        if facts.all_minus1:
+            self.all_minus1 += 1
+        elif has_taken and (0 in facts.edge_hits or facts.any_minus1):
+            self.consistent += 1
+        elif not has_taken:
+            self.no_taken += 1
+        else:
+            self.other += 1
+
+    def consume_columnar(self, cbm):
+        partial = (cbm.block_state == cbm.state_code("PARTIALLY_COVERED")) & (cbm.edge_counts > 0)
+        has_taken = cbm.block_positive > 0
+        has_other = (cbm.block_zero > 0) | (cbm.block_minus1 > 0)
+        all_minus1 = partial & cbm.block_all_minus1
+        rest = partial & ~cbm.block_all_minus1
+        self.total = int(np.count_nonzero(partial))
+        self.all_minus1 = int(np.count_nonzero(all_minus1))
+        self.consistent = int(np.count_nonzero(rest & has_taken & has_other))
+        self.no_taken = int(np.count_nonzero(rest & ~has_taken))
+        self.other = int(np.count_nonzero(rest & has_taken & ~has_other))
+
+    def summary(self):
+        return {
+            "partial_blocks": self.total,
+            "partial_consistent": self.consistent,
+            "partial_all_minus1": self.all_minus1,
+        }
+
+    def report(self):
+        print_header("8. PARTIALLY_COVERED BLOCKS: EDGE ANALYSIS")
+        print(f"  Total PARTIALLY_COVERED blocks with edges: {self.total}")
+        print()
+        print(f"  Consistent (has taken + not-taken edges):   {self.consistent}")
+        print(f"  All edges hits=-1 (no edge-level data):     {self.all_minus1}")
+        print(f"  No taken edge but state=PARTIAL:            {self.no_taken}")
+        print(f"  Other:                                      {self.other}")
+        print()
+
+
+class BranchTypeCollector(Collector):
+    section = 9
+    title = "BRANCH TYPE DISTRIBUTION"
+
+    def __init__(self, max_samples=None, coverage_data=None):
+        super().__init__(max_samples, coverage_data)
+        self.branch_types = Counter()
+
+    def visit_block(self, facts):
+        for edge in facts.edges:
+            self.branch_types[edge["branchType"]] += 1
+
+    def consume_columnar(self, cbm):
+        self.branch_types = Counter(dict(first_seen_counts(cbm.edge_type, cbm.branch_type_names)))
+
+    def report(self):
+        print_header("9. BRANCH TYPE DISTRIBUTION")
+        for bt, count in self.branch_types.most_common():
+            print(f"    {bt:>15s}: {count:>5}")
+        print()
+
+
+class BranchIndexCollector(Collector):
+    section = 10
+    title = "branchIndex VALUES PER BRANCH TYPE"
+
+    def __init__(self, max_samples=None, coverage_data=None):
+        super().__init__(max_samples, coverage_data)
+        self.by_type = defaultdict(Counter)
+
+    def visit_block(self, facts):
+        for edge in facts.edges:
+            self.by_type[edge["branchType"]][edge["branchIndex"]] += 1
+
+    def consume_columnar(self, cbm):
+        if cbm.n_edges == 0:
+            return
+        pairs, counts = np.unique(
+            np.stack([cbm.edge_type.astype(np.int64), cbm.edge_index]),
+            axis=1,
+            return_counts=True,
+        )
+        for (code, idx), count in zip(pairs.T, counts):
+            self.by_type[cbm.branch_type_names[code]][int(idx)] = int(count)
+
+    def report(self):
+        print_header("10. branchIndex VALUES PER BRANCH TYPE")
+        for bt in sorted(self.by_type.keys()):
+            print(f"    {bt}:")
+            for idx, count in sorted(self.by_type[bt].items()):
+                print(f"      branchIndex={idx}: {count} occurrences")
+        print()
 
-    # -- Line-level analysis for COVERED blocks with hits=-1 IF edges --
-    print(sep)
-    print("13. COVERED BLOCKS WITH hits=-1 IF EDGES: LINE-LEVEL ANALYSIS")
-    print(sep)
-    print()
-    print("    These blocks have coverageState=COVERED, all lines hit,")
-    print("    but the IF edges show hits=-1 (no branch data resolved).")
-    print()
-    for mm in method_maps:
-        for block in mm.get("blocks", []):
-            state = block["coverageData"]["coverageState"]
-            edges = block.get("edges", [])
-            if_edges = [e for e in edges if e["branchType"] in ("IF_TRUE", "IF_FALSE")]
-            if state == "COVERED" and any(e["hits"] == -1 for e in if_edges):
-                lines = block["coverageData"]["lines"]
-                all_lines_hit = all(l["hits"] > 0 for l in lines)
-                has_jumps = any(len(l.get("jumps", [])) > 0 for l in lines)
-                tail_line = lines[-1]["line"] if lines else "?"
-                tail_branches = lines[-1]["branches"]["total"] if lines else "?"
-                bid = block["id"]
-                method = mm["fullName"]
-                short_method = method.split(".")[-1].split("(")[0] if "." in method else method
-                print(f"    Block {bid:>3} ...{short_method}: tail_line={tail_line}, "
-                      f"all_lines_hit={all_lines_hit}, has_jumps_in_blockmap={has_jumps}, "
-                      f"tail_branches_total={tail_branches}")
-    print()
 
-    # -- ROOT CAUSE ANALYSIS: lineToCoverageMap collisions --
-    if coverage_data:
-        print(sep)
-        print("14. ROOT CAUSE: lineToCoverageMap LINE NUMBER COLLISIONS")
-        print(sep)
+class IfBranchIndexCollector(Collector):
+    section = 11
+    title = "branchIndex CONSISTENCY FOR IF_TRUE/IF_FALSE PAIRS"
+
+    def __init__(self, max_samples=None, coverage_data=None):
+        super().__init__(max_samples, coverage_data)
+        self.if_true_0 = 0
+        self.if_true_not_0 = 0
+        self.if_false_1 = 0
+        self.if_false_not_1 = 0
+
+    def visit_block(self, facts):
+        for edge in facts.edges:
+            bt = edge["branchType"]
+            if bt == "IF_TRUE":
+                if edge["branchIndex"] == 0:
+                    self.if_true_0 += 1
+                else:
+                    self.if_true_not_0 += 1
+            elif bt == "IF_FALSE":
+                if edge["branchIndex"] == 1:
+                    self.if_false_1 += 1
+                else:
+                    self.if_false_not_1 += 1
+
+    def consume_columnar(self, cbm):
+        if_true = cbm.edge_type == cbm.type_code("IF_TRUE")
+        if_false = cbm.edge_type == cbm.type_code("IF_FALSE")
+        self.if_true_0 = int(np.count_nonzero(if_true & (cbm.edge_index == 0)))
+        self.if_true_not_0 = int(np.count_nonzero(if_true)) - self.if_true_0
+        self.if_false_1 = int(np.count_nonzero(if_false & (cbm.edge_index == 1)))
+        self.if_false_not_1 = int(np.count_nonzero(if_false)) - self.if_false_1
+
+    def summary(self):
+        return {"if_index_unexpected": self.if_true_not_0 + self.if_false_not_1}
+
+    def report(self):
+        print_header("11. branchIndex CONSISTENCY FOR IF_TRUE/IF_FALSE PAIRS")
+        print(f"    IF_TRUE  with branchIndex=0: {self.if_true_0}  (expected)")
+        print(f"    IF_TRUE  with branchIndex!=0: {self.if_true_not_0}  (unexpected)")
+        print(f"    IF_FALSE with branchIndex=1: {self.if_false_1}  (expected)")
+        print(f"    IF_FALSE with branchIndex!=1: {self.if_false_not_1}  (unexpected)")
+        print()
+        if self.if_true_not_0 or self.if_false_not_1:
+            print("    WARNING: branchIndex is NOT always 0=IF_TRUE, 1=IF_FALSE!")
+        else:
+            print("    CONSISTENT: branchIndex=0 always maps to IF_TRUE, branchIndex=1 always maps to IF_FALSE.")
+        print()
+
+
+class Minus1MeaningCollector(Collector):
+    section = 12
+    title = "ANALYSIS: WHAT DOES hits=-1 MEAN?"
+
+    def __init__(self, max_samples=None, coverage_data=None):
+        super().__init__(max_samples, coverage_data)
+        self.goto_minus1 = 0
+        self.if_minus1 = 0
+        self.normal_minus1 = 0
+        self.switch_minus1 = 0
+        self.if_zero = 0
+        self.if_total = 0
+
+    def visit_block(self, facts):
+        for edge in facts.edges:
+            bt = edge["branchType"]
+            hits = edge["hits"]
+            if bt in IF_BRANCH_TYPES:
+                self.if_total += 1
+                if hits == 0:
+                    self.if_zero += 1
+            if hits == -1:
+                if bt == "GOTO":
+                    self.goto_minus1 += 1
+                elif bt in IF_BRANCH_TYPES:
+                    self.if_minus1 += 1
+                elif bt == "NORMAL":
+                    self.normal_minus1 += 1
+                else:
+                    self.switch_minus1 += 1
+
+    def consume_columnar(self, cbm):
+        minus1 = cbm.edge_hits == -1
+        is_if = cbm.edge_is_if
+        goto = cbm.edge_type == cbm.type_code("GOTO")
+        normal = cbm.edge_type == cbm.type_code("NORMAL")
+        self.if_total = int(np.count_nonzero(is_if))
+        self.if_zero = int(np.count_nonzero(is_if & (cbm.edge_hits == 0)))
+        self.goto_minus1 = int(np.count_nonzero(minus1 & goto))
+        self.if_minus1 = int(np.count_nonzero(minus1 & is_if))
+        self.normal_minus1 = int(np.count_nonzero(minus1 & normal))
+        self.switch_minus1 = int(np.count_nonzero(minus1 & ~(goto | is_if | normal)))
+
+    def summary(self):
+        return {
+            "if_edges": self.if_total,
+            "if_minus1": self.if_minus1,
+            "switch_minus1": self.switch_minus1,
+        }
+
+    def report(self):
+        print_header("12. ANALYSIS: WHAT DOES hits=-1 MEAN?")
+        print(f"    hits=-1 on GOTO edges:             {self.goto_minus1}")
+        print(f"    hits=-1 on IF_TRUE/IF_FALSE edges: {self.if_minus1}")
+        print(f"    hits=-1 on NORMAL edges:           {self.normal_minus1}")
+        print(f"    hits=-1 on SWITCH_* edges:         {self.switch_minus1}")
+        print()
+
+        if_pos = self.if_total - self.if_minus1 - self.if_zero
+        print(f"    Total IF_TRUE + IF_FALSE edges: {self.if_total}")
+        print(f"    Of those with hits=-1:          {self.if_minus1}  ({self.if_minus1/max(self.if_total,1)*100:.1f}%)")
+        print(f"    Of those with hits=0:           {self.if_zero}")
+        print(f"    Of those with hits>0:           {if_pos}")
+        print()
+
+
+class CoveredIfLineLevelCollector(Collector):
+    section = 13
+    title = "COVERED BLOCKS WITH hits=-1 IF EDGES: LINE-LEVEL ANALYSIS"
+
+    def __init__(self, max_samples=None, coverage_data=None):
+        super().__init__(max_samples, coverage_data)
+        self.rows = BoundedSample(max_samples)
+
+    def visit_block(self, facts):
+        if facts.state != "COVERED" or not facts.any_minus1:
+            return
+        if not any(e["hits"] == -1 and e["branchType"] in IF_BRANCH_TYPES for e in facts.edges):
+            return
+        lines = facts.block["coverageData"]["lines"]
+        self.rows.add((
+            facts.block_id,
+            facts.method,
+            lines[-1]["line"] if lines else "?",
+            all(l["hits"] > 0 for l in lines),
+            any(len(l.get("jumps", [])) > 0 for l in lines),
+            lines[-1]["branches"]["total"] if lines else "?",
+        ))
+
+    def consume_columnar(self, cbm):
+        covered = cbm.block_state == cbm.state_code("COVERED")
+        if_minus1 = cbm.per_block(cbm.edge_is_if & (cbm.edge_hits == -1)) > 0
+        rows = np.flatnonzero(covered & if_minus1)
+
+        def row(b):
+            has_lines = cbm.block_line_count[b] > 0
+            return (
+                int(cbm.block_id[b]),
+                cbm.method_names[cbm.block_method[b]],
+                int(cbm.block_tail_line[b]) if has_lines else "?",
+                bool(cbm.block_all_lines_hit[b]),
+                bool(cbm.block_has_jumps[b]),
+                int(cbm.block_tail_branches[b]) if has_lines else "?",
+            )
+
+        sample_block_rows(self.rows, rows, row)
+
+    def summary(self):
+        return {"covered_if_minus1_blocks": len(self.rows)}
+
+    def report(self):
+        print_header("13. COVERED BLOCKS WITH hits=-1 IF EDGES: LINE-LEVEL ANALYSIS")
+        print()
+        print("    These blocks have coverageState=COVERED, all lines hit,")
+        print("    but the IF edges show hits=-1 (no branch data resolved).")
+        print()
+        for bid, method, tail_line, all_lines_hit, has_jumps, tail_branches in self.rows:
+            print(f"    Block {bid:>3} ...{short_method_name(method)}: tail_line={tail_line}, "
+                  f"all_lines_hit={all_lines_hit}, has_jumps_in_blockmap={has_jumps}, "
+                  f"tail_branches_total={tail_branches}")
+        print_omitted(self.rows)
+        print()
+
+
+class LineCollisionCollector(Collector):
+    section = 14
+    title = "ROOT CAUSE: lineToCoverageMap LINE NUMBER COLLISIONS"
+    needs_coverage_data = True
+
+    def __init__(self, max_samples=None, coverage_data=None):
+        super().__init__(max_samples, coverage_data)
+        self.coverage_data = coverage_data
+        self.index = None
+        self.scopes = {}
+        self.summarized = False
+        self.total_lines = 0
+        self.collision_lines = 0
+        self.jump_loss_lines = 0
+        self.if_minus1 = 0
+        self.attributions = Counter()
+
+    @property
+    def explained(self):
+        return sum(self.attributions[key] for key in COLLISION_ATTRIBUTIONS)
+
+    def _build_index(self):
+        self.index = ScopedLineIndex.from_coverage_data(self.coverage_data)
+        self.total_lines, self.collision_lines, self.jump_loss_lines = self.index.line_stats()
+        self.summarized = True
+
+    def visit_block(self, facts):
+        if self.index is None:
+            self._build_index()
+        if not facts.any_minus1:
+            return
+        lines = facts.block["coverageData"]["lines"]
+        scope = self.scopes.get(facts.method)
+        if scope is None:
+            scope = self.scopes[facts.method] = block_map_scope(facts.method)
+        for edge in facts.edges:
+            if edge["hits"] == -1 and edge["branchType"] in IF_BRANCH_TYPES:
+                self.if_minus1 += 1
+                if lines:
+                    self.attributions[self.index.attribute(scope, lines[-1]["line"])] += 1
+                else:
+                    self.attributions["block_without_lines"] += 1
+
+    def consume_columnar(self, cbm):
+        table = self.coverage_data
+        if not isinstance(table, ScopedLineTable):
+            table = build_scoped_line_table(table)
+        collision = table.line_owners > 1
+        self.total_lines = len(table.line)
+        self.collision_lines = int(np.count_nonzero(collision))
+        self.jump_loss_lines = int(np.count_nonzero(
+            collision & table.line_any_with_data & table.line_any_without_data
+        ))
+
+        if_minus1 = cbm.edge_is_if & (cbm.edge_hits == -1)
+        self.if_minus1 = int(np.count_nonzero(if_minus1))
+        edge_blocks = cbm.edge_block[if_minus1]
+        has_lines = cbm.block_line_count[edge_blocks] > 0
+        self.attributions["block_without_lines"] = int(np.count_nonzero(~has_lines))
+
+        method_scope = table.scope_ids(block_map_scope(name) for name in cbm.method_names)
+        edge_blocks = edge_blocks[has_lines]
+        codes = table.attribute(
+            method_scope[cbm.block_method[edge_blocks]],
+            cbm.block_tail_line[edge_blocks].astype(np.int64),
+        )
+        for code, count in enumerate(np.bincount(codes, minlength=len(ATTRIBUTIONS))):
+            if count:
+                self.attributions[ATTRIBUTIONS[code][0]] += int(count)
+        self.summarized = True
+
+    def summary(self):
+        if not self.summarized:
+            self._build_index()
+        summary = {
+            "coverage_lines": self.total_lines,
+            "collision_lines": self.collision_lines,
+            "jump_loss_lines": self.jump_loss_lines,
+            "if_minus1_explained": self.explained,
+        }
+        for key, _ in ATTRIBUTIONS:
+            summary[f"if_minus1_{key}"] = self.attributions[key]
+        return summary
+
+    def report(self):
+        print_header("14. ROOT CAUSE: lineToCoverageMap LINE NUMBER COLLISIONS")
         print()
         print("    pathcov's CoverageReport.buildLineToCoverageMap() uses a flat")
         print("    Map<Integer, LineDTO> keyed only by line number, without class/method")
@@ -454,30 +1042,11 @@ def analyze(data, coverage_data):
         print("    in multi-class projects), the LAST one iterated wins.")
         print()
 
-        line_owners = defaultdict(list)
-        for cls in coverage_data.get("classes", []):
-            for method in cls.get("methods", []):
-                for line in method.get("lines", []):
-                    has_jumps = len(line.get("jumps", [])) > 0
-                    has_switches = len(line.get("switches", [])) > 0
-                    line_owners[line["line"]].append({
-                        "method": f'{cls["name"]}.{method["methodSignature"].split("(")[0]}',
-                        "has_jumps": has_jumps,
-                        "has_switches": has_switches,
-                        "branches_total": line["branches"]["total"],
-                        "hits": line["hits"],
-                    })
-
-        total_lines = len(line_owners)
-        collision_lines = sum(1 for owners in line_owners.values() if len(owners) > 1)
-        jump_loss_lines = 0
-        for owners in line_owners.values():
-            if len(owners) > 1:
-                has_any_jumps = any(o["has_jumps"] or o["has_switches"] for o in owners)
-                has_any_without = any(not o["has_jumps"] and not o["has_switches"] for o in owners)
-                if has_any_jumps and has_any_without:
-                    jump_loss_lines += 1
-
+        if not self.summarized:
+            self._build_index()
+        total_lines = self.total_lines
+        collision_lines = self.collision_lines
+        jump_loss_lines = self.jump_loss_lines
         print(f"    Total unique line numbers in coverage data: {total_lines}")
         print(f"    Lines shared by >1 method:                  {collision_lines}  ({collision_lines/total_lines*100:.1f}%)")
         print(f"    Lines where jump/switch data can be lost:   {jump_loss_lines}  ({jump_loss_lines/total_lines*100:.1f}%)")
@@ -487,88 +1056,894 @@ def analyze(data, coverage_data):
         print("    This makes JDart unable to determine branch coverage at those nodes.")
         print()
 
-        # Count how many of the 112 IF hits=-1 are explained by this
-        explained = 0
-        unexplained_blocks = []
-        for mm in method_maps:
-            for block in mm.get("blocks", []):
-                edges = block.get("edges", [])
-                for edge in edges:
-                    if edge["hits"] == -1 and edge["branchType"] in ("IF_TRUE", "IF_FALSE"):
-                        # Find the tail line of this block
-                        lines = block["coverageData"]["lines"]
-                        if lines:
-                            tail_line = lines[-1]["line"]
-                            owners = line_owners.get(tail_line, [])
-                            if len(owners) > 1:
-                                explained += 1
-                            else:
-                                # Check if line just has no jump data at all
-                                if not any(o["has_jumps"] for o in owners):
-                                    pass  # Line genuinely has no jumps
-                                else:
-                                    unexplained_blocks.append(
-                                        (block["id"], mm["fullName"], tail_line)
-                                    )
-
-        print(f"    IF edges with hits=-1 explained by collision:  {explained} / {if_minus1}")
-        print(f"    IF edges with hits=-1 NOT from collision:      {if_minus1 - explained}")
-        print()
-        if if_minus1 - explained > 0:
-            print("    The remaining hits=-1 IF edges come from lines where:")
-            print("    - The block was NOT_COVERED (line.hits=0, so no jump data recorded)")
-            print("    - The jumpIndex computation failed (block not found in CFG iteration)")
-            print("    - The line genuinely has no IntelliJ jump instrumentation")
-        print()
-
-    # -- Impact assessment --
-    print(sep)
-    print("15. IMPACT ON JDART CoverageHeuristicStrategy")
-    print(sep)
-    print()
-    print("    JDart reads this block map to decide which paths to explore (uncovered)")
-    print("    and which to skip (already covered). The ignore_covered_paths=true setting")
-    print("    marks fully-covered paths as IGNORE.")
-    print()
-    print(f"    Blocks with ALL edges hits=-1:     {len(blocks_all_edges_minus1)}")
-    print(f"      Of those, COVERED:               {coverage_state_of_all_minus1.get('COVERED', 0)}")
-    print(f"      Of those, NOT_COVERED:           {coverage_state_of_all_minus1.get('NOT_COVERED', 0)}")
-    print(f"      Of those, PARTIALLY_COVERED:     {coverage_state_of_all_minus1.get('PARTIALLY_COVERED', 0)}")
-    print()
-    print(f"    COVERED blocks with IF hits=-1:    These look COVERED at block level")
-    print(f"      but JDart cannot read which branches were taken. If JDart uses")
-    print(f"      edge-level hits for heuristic decisions, -1 creates ambiguity.")
-    print()
-    print(f"    NOT_COVERED blocks with IF hits=-1: {coverage_state_of_all_minus1.get('NOT_COVERED', 0)}")
-    print(f"      These blocks were never reached. The -1 is redundant: the block's")
-    print(f"      NOT_COVERED state already tells JDart to explore them.")
+        unexplained = self.if_minus1 - self.explained
+        print(f"    IF edges with hits=-1 explained by collision:  {self.explained} / {self.if_minus1}")
+        print(f"    IF edges with hits=-1 NOT from collision:      {unexplained}")
+        print()
+        if self.if_minus1:
+            print("    Attribution by (class, method, line) of the block's tail line:")
+            for key, label in ATTRIBUTIONS:
+                count = self.attributions[key]
+                print(f"    - {label + ':':<60} {count:>6}  ({count/self.if_minus1*100:.1f}%)")
+        print()
+
+
+class ImpactCollector(Collector):
+    section = 15
+    title = "IMPACT ON JDART CoverageHeuristicStrategy"
+
+    def __init__(self, max_samples=None, coverage_data=None):
+        super().__init__(max_samples, coverage_data)
+        self.all_minus1_blocks = 0
+        self.all_minus1_states = Counter()
+
+    def visit_block(self, facts):
+        if facts.edges and facts.all_minus1:
+            self.all_minus1_blocks += 1
+            self.all_minus1_states[facts.state] += 1
+
+    def consume_columnar(self, cbm):
+        states = cbm.block_state[cbm.block_all_minus1]
+        self.all_minus1_blocks = len(states)
+        self.all_minus1_states = Counter(dict(first_seen_counts(states, cbm.state_names)))
+
+    def report(self):
+        states = self.all_minus1_states
+        print_header("15. IMPACT ON JDART CoverageHeuristicStrategy")
+        print()
+        print("    JDart reads this block map to decide which paths to explore (uncovered)")
+        print("    and which to skip (already covered). The ignore_covered_paths=true setting")
+        print("    marks fully-covered paths as IGNORE.")
+        print()
+        print(f"    Blocks with ALL edges hits=-1:     {self.all_minus1_blocks}")
+        print(f"      Of those, COVERED:               {states.get('COVERED', 0)}")
+        print(f"      Of those, NOT_COVERED:           {states.get('NOT_COVERED', 0)}")
+        print(f"      Of those, PARTIALLY_COVERED:     {states.get('PARTIALLY_COVERED', 0)}")
+        print()
+        print(f"    COVERED blocks with IF hits=-1:    These look COVERED at block level")
+        print(f"      but JDart cannot read which branches were taken. If JDart uses")
+        print(f"      edge-level hits for heuristic decisions, -1 creates ambiguity.")
+        print()
+        print(f"    NOT_COVERED blocks with IF hits=-1: {states.get('NOT_COVERED', 0)}")
+        print(f"      These blocks were never reached. The -1 is redundant: the block's")
+        print(f"      NOT_COVERED state already tells JDart to explore them.")
+        print()
+        print("    RECOMMENDATION:")
+        print("    Fix lineToCoverageMap in pathcov to be scoped per-method (not global).")
+        print("    Use a composite key like (className, methodSignature, lineNumber) to avoid")
+        print("    cross-method line number collisions. This should eliminate most hits=-1")
+        print("    on IF/SWITCH edges for COVERED blocks.")
+        print()
+
+
+class PerMethodCollector(Collector):
+    section = 16
+    title = "PER-METHOD SUMMARY"
+
+    def __init__(self, max_samples=None, coverage_data=None):
+        super().__init__(max_samples, coverage_data)
+        self.summaries = TopSample(max_samples)
+        self.blocks = 0
+        self.edges = 0
+        self.edges_minus1 = 0
+
+    def visit_block(self, facts):
+        self.blocks += 1
+        self.edges += len(facts.edges)
+        if facts.any_minus1:
+            self.edges_minus1 += facts.edge_hits.count(-1)
+
+    def end_method(self, method):
+        if self.edges:
+            self.summaries.add(
+                self.edges_minus1 / self.edges,
+                {
+                    "method": method,
+                    "blocks": self.blocks,
+                    "edges": self.edges,
+                    "edges_minus1": self.edges_minus1,
+                },
+            )
+        self.blocks = 0
+        self.edges = 0
+        self.edges_minus1 = 0
+
+    def consume_columnar(self, cbm):
+        blocks = np.bincount(cbm.block_method, minlength=cbm.n_methods)
+        edges = cbm.per_method(np.ones(cbm.n_edges, dtype=bool))
+        minus1 = cbm.per_method(cbm.edge_hits == -1)
+        methods = np.flatnonzero(edges)
+        ratio = minus1[methods] / edges[methods]
+        # Stable descending sort == TopSample order (ratio desc, then file order).
+        order = methods[np.argsort(-ratio, kind="stable")]
+        keep = order if self.summaries.limit is None else order[:self.summaries.limit]
+        for m in keep:
+            self.summaries.add(
+                float(minus1[m] / edges[m]),
+                {
+                    "method": cbm.method_names[m],
+                    "blocks": int(blocks[m]),
+                    "edges": int(edges[m]),
+                    "edges_minus1": int(minus1[m]),
+                },
+            )
+        self.summaries.skip(len(order) - len(keep))
+
+    def report(self):
+        print_header("16. PER-METHOD SUMMARY (sorted by % hits=-1)")
+        for ms in self.summaries.sorted():
+            short_method = ms["method"].split(".")[-1] if "." in ms["method"] else ms["method"]
+            if len(short_method) > 80:
+                short_method = short_method[:77] + "..."
+            pct = ms["edges_minus1"] / ms["edges"] * 100
+            print(f"    {pct:5.1f}%  ({ms['edges_minus1']:>3}/{ms['edges']:>3})  {short_method}")
+        print_omitted(self.summaries)
+        print()
+
+
+COLLECTORS = [
+    OverallCollector,
+    HitDistributionCollector,
+    CoverageStateCollector,
+    AllMinus1BlocksCollector,
+    MixedMinus1BlocksCollector,
+    CoveredWithMinus1Collector,
+    NotCoveredWithPositiveCollector,
+    PartiallyCoveredCollector,
+    BranchTypeCollector,
+    BranchIndexCollector,
+    IfBranchIndexCollector,
+    Minus1MeaningCollector,
+    CoveredIfLineLevelCollector,
+    LineCollisionCollector,
+    ImpactCollector,
+    PerMethodCollector,
+]
+
+ALL_SECTIONS = [c.section for c in COLLECTORS]
+
+
+def parse_sections(spec: str) -> list:
+    """Parse a section selection like ``"1-4,9,14"`` into section numbers."""
+    sections = set()
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        lo, sep, hi = part.partition("-")
+        try:
+            start = int(lo)
+            end = int(hi) if sep else start
+        except ValueError:
+            raise ValueError(f"invalid section selection: '{part}'") from None
+        sections.update(range(start, end + 1))
+    unknown = sections - set(ALL_SECTIONS)
+    if unknown:
+        raise ValueError(
+            f"unknown section(s) {sorted(unknown)}; available: {ALL_SECTIONS[0]}-{ALL_SECTIONS[-1]}"
+        )
+    return sorted(sections)
+
+
+def make_collectors(sections=None, coverage_data=None, max_samples=None) -> list:
+    """Instantiate the collectors for ``sections`` (all if ``None``)."""
+    wanted = set(ALL_SECTIONS if sections is None else sections)
+    collectors = []
+    for cls in COLLECTORS:
+        if cls.section not in wanted:
+            continue
+        if cls.needs_coverage_data and not coverage_data:
+            continue
+        collectors.append(cls(max_samples, coverage_data))
+    return collectors
+
+
+def run_collectors(method_maps, collectors) -> int:
+    """Feed every block of ``method_maps`` to ``collectors`` in one pass.
+
+    Returns the number of method block maps seen.
+    """
+    # Only dispatch to hooks a collector actually overrides.
+    block_hooks = [
+        c.visit_block for c in collectors
+        if type(c).visit_block is not Collector.visit_block
+    ]
+    method_hooks = [
+        c.end_method for c in collectors
+        if type(c).end_method is not Collector.end_method
+    ]
+    method_count = 0
+    for mm in method_maps:
+        method_count += 1
+        method_name = mm.get("fullName", "<unknown>")
+        for block in mm.get("blocks", []):
+            facts = BlockFacts(method_name, block)
+            for hook in block_hooks:
+                hook(facts)
+        for hook in method_hooks:
+            hook(method_name)
+    return method_count
+
+
+def collect(method_maps, coverage_data, max_samples=None, sections=None, engine="python"):
+    """Run the selected collectors over ``method_maps`` in a single traversal.
+
+    ``method_maps`` is any iterable of method block maps: the list from a
+    fully loaded block map, or a :class:`StreamedMethodMaps`. Collectors
+    keep counters plus at most ``max_samples`` entries per detailed listing
+    (``None`` keeps all of them). ``sections`` restricts the run to the
+    given section numbers.
+
+    ``engine="columnar"`` converts the traversal into NumPy tables once and
+    lets every collector compute its section with vectorized reductions.
+    In that mode ``method_maps`` may already be a ``ColumnarBlockMap`` and
+    ``coverage_data`` a ``ScopedLineTable`` (e.g. from the cache).
+
+    Returns ``(method_count, collectors)``.
+    """
+    collectors = make_collectors(sections, coverage_data, max_samples)
+    if engine == "columnar":
+        if isinstance(method_maps, ColumnarBlockMap):
+            cbm = method_maps
+        else:
+            cbm = build_columnar(method_maps)
+        method_count = cbm.n_methods
+        for collector in collectors:
+            collector.consume_columnar(cbm)
+    elif engine == "python":
+        method_count = run_collectors(method_maps, collectors)
+    else:
+        raise ValueError(f"unknown engine: {engine}")
+    return method_count, collectors
+
+
+def analyze(method_maps, coverage_data, max_samples=None, sections=None, engine="python"):
+    """Print the report for ``method_maps``; see :func:`collect` for the
+    arguments. Returns ``collect()``'s ``(method_count, collectors)``."""
+    method_count, collectors = collect(method_maps, coverage_data, max_samples, sections, engine)
+
+    print(f"Total method block maps: {method_count}")
     print()
-    print("    RECOMMENDATION:")
-    print("    Fix lineToCoverageMap in pathcov to be scoped per-method (not global).")
-    print("    Use a composite key like (className, methodSignature, lineNumber) to avoid")
-    print("    cross-method line number collisions. This should eliminate most hits=-1")
-    print("    on IF/SWITCH edges for COVERED blocks.")
+    for collector in collectors:
+        collector.report()
+    return method_count, collectors
+
+
+def summarize(method_count: int, collectors) -> dict:
+    """Flat ``{counter: value}`` summary of a :func:`collect` result."""
+    summary = {"methods": method_count}
+    for collector in collectors:
+        summary.update(collector.summary())
+    return summary
+
+
+@dataclass(frozen=True)
+class InputOptions:
+    """How to read a (block map, coverage data) pair; shared with batch workers."""
+
+    engine: str = "python"
+    stream: bool = False
+    sections: Optional[tuple] = None
+    cache_dir: Optional[Path] = None
+    no_cache: bool = False
+
+
+def open_inputs(block_map: Path, coverage_data_path: Optional[Path], options: InputOptions):
+    """Return ``(method_maps, coverage_data)`` ready to pass to :func:`collect`.
+
+    With the columnar engine both come from the content-addressed cache
+    unless ``options.no_cache`` is set. ``coverage_data`` is ``None`` when
+    section 14 is not selected or the file does not exist.
+    """
+    def load_method_maps():
+        if options.stream:
+            return StreamedMethodMaps(block_map)
+        return load_json(block_map).get("methodBlockMaps", [])
+
+    want_coverage = (
+        (options.sections is None or 14 in options.sections)
+        and coverage_data_path is not None
+        and coverage_data_path.exists()
+    )
+
+    if options.engine == "columnar" and not options.no_cache:
+        cache = BlockMapCache(options.cache_dir)
+        method_maps = cache.block_map(block_map, load_method_maps)
+        coverage_data = None
+        if want_coverage:
+            coverage_data = cache.scoped_lines(
+                coverage_data_path, lambda: load_json(coverage_data_path)
+            )
+        return method_maps, coverage_data
+
+    coverage_data = load_json(coverage_data_path) if want_coverage else None
+    return load_method_maps(), coverage_data
+
+
+# ================================================================
+# BATCH MODE
+# ================================================================
+#
+# --batch analyzes many (block map, coverage data) pairs on a process pool.
+# Each worker runs the collectors without printing (and without keeping
+# samples) and sends back only their summary() counts plus its timing; the
+# parent merges those into one cross-SUT table.
+
+BATCH_BLOCK_MAP_NAME = "icfg_block_map.json"
+
+# (summary key, column header, width) for the printed batch table.
+BATCH_COLUMNS = [
+    ("methods", "methods", 8),
+    ("blocks", "blocks", 9),
+    ("edges", "edges", 10),
+    ("edges_minus1", "hits=-1", 9),
+    ("if_minus1", "IF -1", 8),
+    ("if_minus1_explained", "explained", 9),
+    ("covered_with_minus1", "COV w/-1", 8),
+]
+
+
+def find_coverage_data(block_map: Path) -> Optional[Path]:
+    """coverage_data.json that belongs to ``block_map``, if any.
+
+    Follows the pipeline's data volume layout
+    (``<data>/blockmaps/icfg_block_map.json`` next to
+    ``<data>/coverage/coverage_data.json``), falling back to a
+    ``coverage_data.json`` in the block map's own directory.
+    """
+    candidates = [
+        block_map.parent.parent / "coverage" / "coverage_data.json",
+        block_map.with_name("coverage_data.json"),
+    ]
+    for candidate in candidates:
+        if candidate.exists():
+            return candidate
+    return None
+
+
+def discover_block_maps(patterns) -> list:
+    """Expand directories (searched recursively for ``icfg_block_map.json``)
+    and glob patterns into a sorted, de-duplicated list of block maps."""
+    found = set()
+    for pattern in patterns:
+        path = Path(pattern)
+        if path.is_dir():
+            found.update(path.rglob(BATCH_BLOCK_MAP_NAME))
+        else:
+            found.update(Path(m) for m in glob.glob(pattern, recursive=True))
+    return sorted(p for p in found if p.is_file())
+
+
+def analyze_file(job) -> dict:
+    """Batch worker: summarise one block map. Never raises."""
+    block_map, coverage_data_path, options = job
+    start = time.perf_counter()
+    result = {
+        "block_map": str(block_map),
+        "coverage_data": str(coverage_data_path) if coverage_data_path else "",
+        "summary": {},
+        "error": None,
+    }
+    try:
+        method_maps, coverage_data = open_inputs(block_map, coverage_data_path, options)
+        method_count, collectors = collect(
+            method_maps, coverage_data, 0, options.sections, options.engine
+        )
+        result["summary"] = summarize(method_count, collectors)
+    except Exception as e:  # one broken map must not abort the sweep
+        result["error"] = f"{type(e).__name__}: {e}"
+    result["seconds"] = time.perf_counter() - start
+    return result
+
+
+def run_batch(block_maps, options: InputOptions, jobs: Optional[int] = None) -> list:
+    """Analyze ``block_maps`` on a process pool; results keep input order."""
+    work = [(bm, find_coverage_data(bm), options) for bm in block_maps]
+    if jobs == 1 or len(work) <= 1:
+        return [analyze_file(job) for job in work]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(analyze_file, work))
+
+
+def merge_summaries(results) -> dict:
+    """Sum the per-file summary counts of every successful result."""
+    merged = Counter()
+    for result in results:
+        if result["error"] is None:
+            merged.update(result["summary"])
+    return dict(merged)
+
+
+def print_batch_report(results, wall_seconds: float, workers: int) -> None:
+    ok = [r for r in results if r["error"] is None]
+    failed = [r for r in results if r["error"] is not None]
+    paths = [r["block_map"] for r in results]
+    root = os.path.commonpath(paths) if len(paths) > 1 else str(Path(paths[0]).parent)
+
+    def label(path: str) -> str:
+        rel = os.path.relpath(path, root)
+        return rel if len(rel) <= 50 else "..." + rel[-47:]
+
+    def cell(summary: dict, key: str, width: int) -> str:
+        value = summary.get(key)
+        return f"{'-' if value is None else value:>{width}}"
+
+    header = f"{'block map':<50}  " + "  ".join(
+        f"{title:>{width}}" for _, title, width in BATCH_COLUMNS
+    ) + f"  {'time s':>7}"
+
+    cpu_seconds = sum(r["seconds"] for r in results)
+    print(SEP)
+    print(
+        f"BATCH SUMMARY: {len(results)} block maps under {root} "
+        f"({len(failed)} failed)"
+    )
+    if workers:
+        print(
+            f"  wall {wall_seconds:.1f} s, summed per-file {cpu_seconds:.1f} s, "
+            f"{workers} worker(s)"
+        )
+    else:  # read back from the run registry
+        print(f"  recorded analysis time {cpu_seconds:.1f} s")
+    print(SEP)
+    print(header)
+    print("-" * len(header))
+    for r in ok:
+        print(
+            f"{label(r['block_map']):<50}  "
+            + "  ".join(cell(r["summary"], key, width) for key, _, width in BATCH_COLUMNS)
+            + f"  {r['seconds']:>7.2f}"
+        )
+    print("-" * len(header))
+    merged = merge_summaries(results)
+    print(
+        f"{'TOTAL':<50}  "
+        + "  ".join(cell(merged, key, width) for key, _, width in BATCH_COLUMNS)
+        + f"  {cpu_seconds:>7.2f}"
+    )
     print()
 
-    # -- Per-method summary --
-    print(sep)
-    print("16. PER-METHOD SUMMARY (sorted by % hits=-1)")
-    print(sep)
-    method_summaries.sort(key=lambda ms: ms["edges_minus1"] / max(ms["edges"], 1), reverse=True)
-    for ms in method_summaries:
-        if ms["edges"] == 0:
-            continue
-        short_method = ms["method"].split(".")[-1] if "." in ms["method"] else ms["method"]
-        if len(short_method) > 80:
-            short_method = short_method[:77] + "..."
-        pct = ms["edges_minus1"] / ms["edges"] * 100
-        print(f"    {pct:5.1f}%  ({ms['edges_minus1']:>3}/{ms['edges']:>3})  {short_method}")
+    if merged.get("edges"):
+        print(f"  hits=-1 edges overall:  {merged.get('edges_minus1', 0) / merged['edges'] * 100:.1f}%")
+    if merged.get("if_minus1"):
+        explained = merged.get("if_minus1_explained")
+        if explained is not None:
+            print(f"  IF hits=-1 explained by line collisions: {explained / merged['if_minus1'] * 100:.1f}%")
+    slowest = sorted(ok, key=lambda r: r["seconds"], reverse=True)[:5]
+    if slowest:
+        print("  Slowest block maps:")
+        for r in slowest:
+            print(f"    {r['seconds']:7.2f} s  {label(r['block_map'])}")
     print()
 
+    if failed:
+        print("  FAILED:")
+        for r in failed:
+            print(f"    {label(r['block_map'])}: {r['error']}")
+        print()
+
+
+def write_batch_tsv(results, path: Path) -> None:
+    """One row per block map with every summary key (union across files)."""
+    keys = []
+    for result in results:
+        for key in result["summary"]:
+            if key not in keys:
+                keys.append(key)
+    columns = ["block_map", "coverage_data", "seconds", "error"] + keys
+    with path.open("w", newline="") as f:
+        writer = csv.writer(f, delimiter="\t")
+        writer.writerow(columns)
+        for r in results:
+            writer.writerow(
+                [r["block_map"], r["coverage_data"], f"{r['seconds']:.3f}", r["error"] or ""]
+                + [r["summary"].get(key, "") for key in keys]
+            )
+
+
+# ================================================================
+# DELTA MODE
+# ================================================================
+#
+# --delta NEW compares the block map argument (old) with NEW. Both files are
+# streamed with iter_method_maps() in lockstep: a method map is compared as
+# soon as its counterpart (same fullName) has been read from the other file,
+# and only methods still waiting for a counterpart are held in memory. When
+# both maps list methods in the same order — the usual case for two runs of
+# the same entry point — that is at most one method per side.
+
+def edge_keys(edges) -> list:
+    """Stable identity of each edge within its block: (branchType, branchIndex, n-th occurrence)."""
+    seen = Counter()
+    keys = []
+    for edge in edges:
+        key = (edge["branchType"], edge["branchIndex"])
+        keys.append(key + (seen[key],))
+        seen[key] += 1
+    return keys
+
+
+class BlockMapDelta:
+    """Accumulates the differences between matched method maps."""
+
+    def __init__(self, max_samples=None):
+        self.methods_matched = 0
+        self.methods_added = BoundedSample(max_samples)
+        self.methods_removed = BoundedSample(max_samples)
+        self.max_pending = 0
+
+        self.blocks_matched = 0
+        self.blocks_added = 0
+        self.blocks_removed = 0
+        self.state_transitions = Counter()
+
+        self.edges_matched = 0
+        self.edges_added = 0
+        self.edges_removed = 0
+        self.hits_changed = 0
+        self.minus1_resolved = 0
+        self.minus1_introduced = 0
+        self.newly_covered = 0
+        self.no_longer_covered = 0
+
+        self.changed_blocks = BoundedSample(max_samples)
+
+    def compare_methods(self, old, new) -> None:
+        self.methods_matched += 1
+        method = old["fullName"]
+        old_blocks = {block["id"]: block for block in old.get("blocks", [])}
+        new_ids = set()
+        for new_block in new.get("blocks", []):
+            new_ids.add(new_block["id"])
+            old_block = old_blocks.get(new_block["id"])
+            if old_block is None:
+                self.blocks_added += 1
+                self.edges_added += len(new_block.get("edges", []))
+            else:
+                self.compare_blocks(method, old_block, new_block)
+        for block_id, old_block in old_blocks.items():
+            if block_id not in new_ids:
+                self.blocks_removed += 1
+                self.edges_removed += len(old_block.get("edges", []))
+
+    def compare_blocks(self, method, old, new) -> None:
+        self.blocks_matched += 1
+        old_state = old["coverageData"]["coverageState"]
+        new_state = new["coverageData"]["coverageState"]
+        if old_state != new_state:
+            self.state_transitions[(old_state, new_state)] += 1
+
+        old_edges = dict(zip(edge_keys(old.get("edges", [])), old.get("edges", [])))
+        changes = []
+        matched = 0
+        for key, new_edge in zip(edge_keys(new.get("edges", [])), new.get("edges", [])):
+            old_edge = old_edges.get(key)
+            if old_edge is None:
+                self.edges_added += 1
+                continue
+            matched += 1
+            before, after = old_edge["hits"], new_edge["hits"]
+            if before == after:
+                continue
+            self.hits_changed += 1
+            if before == -1:
+                self.minus1_resolved += 1
+            elif after == -1:
+                self.minus1_introduced += 1
+            if before <= 0 and after > 0:
+                self.newly_covered += 1
+            elif before > 0 and after <= 0:
+                self.no_longer_covered += 1
+            changes.append(f"{key[0]}(idx={key[1]}):{before}->{after}")
+        self.edges_matched += matched
+        self.edges_removed += len(old_edges) - matched
+
+        if changes or old_state != new_state:
+            self.changed_blocks.add((method, new["id"], old_state, new_state, changes))
+
+    def report(self) -> None:
+        print_header("BLOCK MAP DELTA")
+        print()
+        print(f"    Methods matched by fullName: {self.methods_matched}")
+        print(f"    Methods only in new map:     {len(self.methods_added)}")
+        print(f"    Methods only in old map:     {len(self.methods_removed)}")
+        print(f"    (at most {self.max_pending} methods were buffered waiting for a match)")
+        print()
+        print(f"    Blocks matched by id:  {self.blocks_matched}  "
+              f"(added: {self.blocks_added}, removed: {self.blocks_removed})")
+        print(f"    Edges matched:         {self.edges_matched}  "
+              f"(added: {self.edges_added}, removed: {self.edges_removed})")
+        print()
+
+        print("    Coverage state transitions (matched blocks):")
+        if not self.state_transitions:
+            print("      none")
+        for (before, after), count in self.state_transitions.most_common():
+            print(f"      {before:>20} -> {after:<20} {count}")
+        print()
+
+        print(f"    Edge hits changed:        {self.hits_changed}")
+        print(f"      hits=-1 resolved:       {self.minus1_resolved}")
+        print(f"      hits=-1 introduced:     {self.minus1_introduced}")
+        print(f"      newly covered (>0):     {self.newly_covered}")
+        print(f"      no longer covered:      {self.no_longer_covered}")
+        print()
+
+        if len(self.changed_blocks):
+            print(f"    Changed blocks ({len(self.changed_blocks)}):")
+            for method, block_id, before, after, changes in self.changed_blocks:
+                state = before if before == after else f"{before} -> {after}"
+                print(f"      Block {block_id:>3} ...{short_method_name(method)}: {state}")
+                if changes:
+                    print(f"        {', '.join(changes)}")
+            print_omitted(self.changed_blocks, indent="      ")
+            print()
+
+        for title, sample in (("only in new map", self.methods_added),
+                              ("only in old map", self.methods_removed)):
+            if len(sample):
+                print(f"    Methods {title}:")
+                for method in sample:
+                    print(f"      {method}")
+                print_omitted(sample, indent="      ")
+                print()
+
+
+def diff_block_maps(old_path: Path, new_path: Path, max_samples=None) -> BlockMapDelta:
+    """Stream ``old_path`` and ``new_path`` in lockstep and return their delta."""
+    delta = BlockMapDelta(max_samples)
+    pending_old = {}
+    pending_new = {}
+    for old, new in zip_longest(iter_method_maps(old_path), iter_method_maps(new_path)):
+        if old is not None:
+            match = pending_new.pop(old["fullName"], None)
+            if match is None:
+                pending_old[old["fullName"]] = old
+            else:
+                delta.compare_methods(old, match)
+        if new is not None:
+            match = pending_old.pop(new["fullName"], None)
+            if match is None:
+                pending_new[new["fullName"]] = new
+            else:
+                delta.compare_methods(match, new)
+        delta.max_pending = max(delta.max_pending, len(pending_old) + len(pending_new))
+
+    for name, old in pending_old.items():
+        delta.methods_removed.add(name)
+        delta.blocks_removed += len(old.get("blocks", []))
+        delta.edges_removed += sum(len(b.get("edges", [])) for b in old.get("blocks", []))
+    for name, new in pending_new.items():
+        delta.methods_added.add(name)
+        delta.blocks_added += len(new.get("blocks", []))
+        delta.edges_added += sum(len(b.get("edges", [])) for b in new.get("blocks", []))
+    return delta
+
+
+# ================================================================
+# RUN REGISTRY
+# ================================================================
+#
+# --record stores the summary() counters of every analyzed block map in the
+# SQLite run registry (scripts/run_registry.py); --registry prints stored
+# summaries in the --batch table layout without reading any block map.
+
+def import_run_registry():
+    sys.path.insert(0, str(Path(__file__).resolve().parent / "scripts"))
+    import run_registry
+
+    return run_registry
+
+
+def block_map_sut(block_map: Path) -> str:
+    """SUT name implied by the data volume layout: the folder holding
+    ``<data>/blockmaps/icfg_block_map.json`` (or ``<data>`` itself when it
+    is not called ``data``)."""
+    data_dir = block_map.resolve().parent
+    if data_dir.name == "blockmaps":
+        data_dir = data_dir.parent
+    return data_dir.parent.name if data_dir.name == "data" else data_dir.name
+
+
+def record_results(db: Path, results, sut: Optional[str] = None) -> None:
+    run_registry = import_run_registry()
+    conn = run_registry.open_registry(db)
+    recorded = 0
+    for result in results:
+        if result["error"] is None:
+            run_registry.record_block_map(conn, sut or block_map_sut(Path(result["block_map"])), result)
+            recorded += 1
+    conn.close()
+    print(f"[registry] recorded {recorded} block map summar{'y' if recorded == 1 else 'ies'} in {db}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Analyze an ICFG block map (edge hits, coverage states, branchIndex)."
+    )
+    parser.add_argument(
+        "block_map",
+        nargs="?",
+        type=Path,
+        default=BLOCK_MAP_PATH,
+        help=f"icfg_block_map.json to analyze. Default: {BLOCK_MAP_PATH}",
+    )
+    parser.add_argument(
+        "--coverage-data",
+        type=Path,
+        default=COVERAGE_DATA_PATH,
+        help="coverage_data.json for the lineToCoverageMap collision analysis "
+        "(section 14). Skipped when the file does not exist. "
+        f"Default: {COVERAGE_DATA_PATH}",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Walk methodBlockMaps incrementally instead of loading the whole "
+        "file. Memory stays bounded by the largest method map.",
+    )
+    parser.add_argument(
+        "--sections",
+        type=str,
+        default=None,
+        help="Comma-separated section numbers or ranges to report, e.g. "
+        "'1-4,9,14'. The block map is still read only once. Default: all.",
+    )
+    parser.add_argument(
+        "--engine",
+        choices=["python", "columnar"],
+        default="python",
+        help="'python' (default) feeds dict-based collectors block by block. "
+        "'columnar' loads the map into NumPy struct-of-arrays tables and "
+        "computes every section with vectorized reductions (requires numpy).",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        default=None,
+        help="Where --engine columnar caches parsed block maps and coverage "
+        "data, keyed by file content hash. Default: $COVET_CACHE_DIR or "
+        "~/.cache/covet.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always decode the JSON inputs, bypassing the columnar cache.",
+    )
+    parser.add_argument(
+        "--max-samples",
+        type=int,
+        default=None,
+        help="Maximum entries printed per detailed listing. Default: all, or "
+        f"{DEFAULT_STREAM_MAX_SAMPLES} with --stream.",
+    )
+    parser.add_argument(
+        "--batch",
+        action="append",
+        metavar="DIR_OR_GLOB",
+        default=None,
+        help="Analyze every block map found under DIR (recursively, named "
+        f"{BATCH_BLOCK_MAP_NAME}) or matching GLOB, instead of the single "
+        "block_map argument. Repeatable. Each map is paired with the "
+        "coverage_data.json of its data directory.",
+    )
+    parser.add_argument(
+        "--delta",
+        type=Path,
+        metavar="NEW_BLOCK_MAP",
+        default=None,
+        help="Compare the block_map argument (old) with NEW_BLOCK_MAP and "
+        "report only what changed. Both files are streamed in lockstep.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Worker processes for --batch. Default: one per CPU core.",
+    )
+    parser.add_argument(
+        "--batch-output",
+        type=Path,
+        default=None,
+        help="Also write the per-file --batch summaries to this TSV.",
+    )
+    parser.add_argument(
+        "--record",
+        type=Path,
+        metavar="DB",
+        default=None,
+        help="Store the summary counters of the analyzed block map(s) in this "
+        "run registry (scripts/run_registry.py), tagged with --sut.",
+    )
+    parser.add_argument(
+        "--registry",
+        type=Path,
+        metavar="DB",
+        default=None,
+        help="Print the block map summaries stored in this run registry "
+        "(filtered by --sut / --last) instead of analyzing anything.",
+    )
+    parser.add_argument(
+        "--sut",
+        default=None,
+        help="SUT name for --record / --registry. Default for --record: the "
+        "folder holding the block map's data directory.",
+    )
+    parser.add_argument(
+        "--last",
+        type=int,
+        default=None,
+        help="With --registry, only the N most recently recorded block maps.",
+    )
+    args = parser.parse_args()
+
+    sections = None
+    if args.sections is not None:
+        try:
+            sections = parse_sections(args.sections)
+        except ValueError as e:
+            parser.error(str(e))
+
+    if args.engine == "columnar" and np is None:
+        sys.stderr.write(
+            "numpy is required for --engine columnar. Install with:\n"
+            "  pip install -r requirements.txt\n"
+            "or: pip install numpy\n"
+        )
+        sys.exit(2)
+
+    options = InputOptions(
+        engine=args.engine,
+        stream=args.stream,
+        sections=tuple(sections) if sections is not None else None,
+        cache_dir=args.cache_dir,
+        no_cache=args.no_cache,
+    )
+
+    if args.registry:
+        run_registry = import_run_registry()
+        conn = run_registry.open_registry(args.registry)
+        results = run_registry.select_block_maps(conn, args.sut, args.last)
+        if not results:
+            sys.exit(f"--registry: no block map summaries recorded in {args.registry}")
+        print_batch_report(results, 0.0, 0)
+        return
+
+    if args.batch:
+        block_maps = discover_block_maps(args.batch)
+        if not block_maps:
+            sys.exit(f"--batch: no block maps found for {args.batch}")
+        workers = min(args.jobs or os.cpu_count() or 1, len(block_maps))
+        start = time.perf_counter()
+        results = run_batch(block_maps, options, workers)
+        print_batch_report(results, time.perf_counter() - start, workers)
+        if args.batch_output:
+            write_batch_tsv(results, args.batch_output)
+            print(f"[batch] wrote {args.batch_output}")
+        if args.record:
+            record_results(args.record, results, args.sut)
+        return
+
+    max_samples = args.max_samples
+    if max_samples is None and (args.stream or args.delta):
+        max_samples = DEFAULT_STREAM_MAX_SAMPLES
+
+    if args.delta:
+        diff_block_maps(args.block_map, args.delta, max_samples).report()
+        return
+
+    start = time.perf_counter()
+    method_maps, coverage_data = open_inputs(args.block_map, args.coverage_data, options)
+    method_count, collectors = analyze(method_maps, coverage_data, max_samples, sections, args.engine)
+    if args.record:
+        record_results(args.record, [{
+            "block_map": str(args.block_map),
+            "coverage_data": str(args.coverage_data) if coverage_data is not None else "",
+            "seconds": time.perf_counter() - start,
+            "summary": summarize(method_count, collectors),
+            "error": None,
+        }], args.sut)
+
 
 if __name__ == "__main__":
-    data = load_json(BLOCK_MAP_PATH)
-    coverage_data = None
-    if COVERAGE_DATA_PATH.exists():
-        coverage_data = load_json(COVERAGE_DATA_PATH)
-    analyze(data, coverage_data)
+    main()
@@ -0,0 +1,206 @@
+# Copyright (c) 2025-2026 Yoran Mertens
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Content-addressed on-disk cache of parsed block maps and coverage data.
+
+Decoding a multi-GB ``icfg_block_map.json`` dominates every columnar run of
+``analyze_block_map.py``. This module stores the decoded
+:class:`~block_map_columnar.ColumnarBlockMap` (and the
+:class:`~block_map_columnar.ScopedLineTable` of ``coverage_data.json``)
+as plain ``.npy`` files, one per column, keyed by the SHA-256 of the source
+file. Entries are opened with ``mmap_mode="r"``, so a warm start only maps
+the columns instead of reading them.
+
+Layout under the cache root::
+
+    <root>/v1/<kind>/<digest[:2]>/<digest>/meta.json
+    <root>/v1/<kind>/<digest[:2]>/<digest>/<column>.npy
+    <root>/v1/stat/<sha1 of source path>.json
+
+Because entries are addressed by content, a changed source simply hashes to
+a new entry; nothing has to be invalidated explicitly. To avoid re-hashing
+an unchanged multi-GB file on every run, the digest of each source path is
+memoised together with its size, mtime and inode, and only recomputed when
+one of those changes.
+
+The root defaults to ``$COVET_CACHE_DIR``, then
+``$XDG_CACHE_HOME/covet``, then ``~/.cache/covet``. It is safe to delete at
+any time.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import numpy as np
+
+from block_map_columnar import (
+    ColumnarBlockMap,
+    ScopedLineTable,
+    build_columnar,
+    build_scoped_line_table,
+)
+
+# Bump when the on-disk layout or the columnar tables change shape.
+CACHE_FORMAT_VERSION = "v1"
+
+HASH_CHUNK_SIZE = 1 << 20
+
+
+def default_cache_dir() -> Path:
+    env = os.environ.get("COVET_CACHE_DIR")
+    if env:
+        return Path(env)
+    xdg = os.environ.get("XDG_CACHE_HOME")
+    base = Path(xdg) if xdg else Path.home() / ".cache"
+    return base / "covet"
+
+
+def file_digest(path: Path) -> str:
+    """SHA-256 of the file contents, as hex."""
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class BlockMapCache:
+    def __init__(self, root: Path = None):
+        self.root = (root or default_cache_dir()) / CACHE_FORMAT_VERSION
+
+    # ------------------------------------------------------------
+    # Content keys
+    # ------------------------------------------------------------
+
+    def _stat_memo_path(self, path: Path) -> Path:
+        name = hashlib.sha1(str(path.resolve()).encode()).hexdigest()
+        return self.root / "stat" / f"{name}.json"
+
+    def digest(self, path: Path) -> str:
+        """Content digest of ``path``, re-hashed only when its stat changes."""
+        st = path.stat()
+        stamp = [st.st_size, st.st_mtime_ns, st.st_ino]
+        memo_path = self._stat_memo_path(path)
+        try:
+            memo = json.loads(memo_path.read_text())
+            if memo["stat"] == stamp:
+                return memo["digest"]
+        except (OSError, ValueError, KeyError):
+            pass
+        digest = file_digest(path)
+        self._write_atomic(memo_path, json.dumps({"stat": stamp, "digest": digest}))
+        return digest
+
+    # ------------------------------------------------------------
+    # Entries
+    # ------------------------------------------------------------
+
+    def _entry_dir(self, kind: str, digest: str) -> Path:
+        return self.root / kind / digest[:2] / digest
+
+    def _load_entry(self, kind: str, digest: str):
+        entry = self._entry_dir(kind, digest)
+        try:
+            meta = json.loads((entry / "meta.json").read_text())
+            arrays = {
+                name: np.load(entry / f"{name}.npy", mmap_mode="r")
+                for name in meta["columns"]
+            }
+        except (OSError, ValueError, KeyError):
+            return None
+        return meta, arrays
+
+    def _store_entry(self, kind: str, digest: str, meta: dict, arrays: dict) -> None:
+        entry = self._entry_dir(kind, digest)
+        entry.parent.mkdir(parents=True, exist_ok=True)
+        # Build the entry next to its final location and rename it into
+        # place, so concurrent readers never see a half-written entry.
+        tmp = Path(tempfile.mkdtemp(prefix=f".{digest}.", dir=entry.parent))
+        try:
+            for name, values in arrays.items():
+                np.save(tmp / f"{name}.npy", np.ascontiguousarray(values))
+            meta = dict(meta, columns=sorted(arrays))
+            (tmp / "meta.json").write_text(json.dumps(meta))
+            try:
+                os.rename(tmp, entry)
+            except OSError:
+                # Another process stored the same content first.
+                if not (entry / "meta.json").exists():
+                    raise
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+    def _write_atomic(self, path: Path, text: str) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(prefix=f".{path.name}.", dir=path.parent)
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+        os.replace(tmp, path)
+
+    # ------------------------------------------------------------
+    # Public API
+    # ------------------------------------------------------------
+
+    def block_map(self, path: Path, method_maps_factory) -> ColumnarBlockMap:
+        """Columnar form of the block map at ``path``.
+
+        On a miss, ``method_maps_factory()`` must return the method maps to
+        convert (a loaded list or a streamed view).
+        """
+        digest = self.digest(path)
+        hit = self._load_entry("block_map", digest)
+        if hit is not None:
+            meta, arrays = hit
+            return ColumnarBlockMap(
+                method_names=meta["method_names"],
+                state_names=meta["state_names"],
+                branch_type_names=meta["branch_type_names"],
+                **arrays,
+            )
+        cbm = build_columnar(method_maps_factory())
+        meta = {
+            "source": str(path),
+            "method_names": cbm.method_names,
+            "state_names": cbm.state_names,
+            "branch_type_names": cbm.branch_type_names,
+        }
+        self._store_entry("block_map", digest, meta, cbm.arrays())
+        return cbm
+
+    def scoped_lines(self, path: Path, coverage_data_factory) -> ScopedLineTable:
+        """:class:`ScopedLineTable` of the coverage_data.json at ``path``.
+
+        On a miss, ``coverage_data_factory()`` must return the decoded JSON.
+        """
+        digest = self.digest(path)
+        hit = self._load_entry("scoped_lines", digest)
+        if hit is not None:
+            meta, arrays = hit
+            return ScopedLineTable(scope_names=meta["scope_names"], **arrays)
+        table = build_scoped_line_table(coverage_data_factory())
+        meta = {"source": str(path), "scope_names": table.scope_names}
+        self._store_entry("scoped_lines", digest, meta, table.arrays())
+        return table
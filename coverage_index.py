@@ -0,0 +1,164 @@
+# Copyright (c) 2025-2026 Yoran Mertens
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Scoped line index over ``coverage_data.json`` for exact hits=-1 attribution.
+
+pathcov's ``CoverageReport.buildLineToCoverageMap()`` keys coverage lines by
+line number only, so when two methods share a line number the entry
+iterated last wins and the other method's jump/switch data is lost.
+Section 14 of ``analyze_block_map.py`` used to approximate that with a
+line -> owners list and ``any()`` scans. This index instead keeps
+
+* every line entry under its **scope** ``(class, method name, line)``, and
+* per bare line number, the owner count and the entry that wins in the
+  flat map (the last one in coverage iteration order),
+
+so every hits=-1 IF edge can be attributed with two dict lookups, and the
+join with a block map is linear in the number of edges.
+
+A scope is written ``"<class>.<method name>"``: the block map's
+``fullName`` and the coverage data's ``methodSignature`` use different
+signature formats, but both yield the class and method name. Overloads
+of the same name only collide if they were declared on the same source
+line.
+"""
+
+import re
+
+# Attribution of a hits=-1 IF edge, in report order.
+ATTRIBUTIONS = [
+    ("collision_winner_without_data", "lost to a line collision (winner has no jump data)"),
+    ("collision_winner_other_data", "line collision (resolved against another method)"),
+    ("own_data_unresolved", "own jump data present, not resolved (jumpIndex)"),
+    ("line_not_executed", "own line never executed (hits=0, no jump data)"),
+    ("executed_without_data", "own line executed but has no jump data"),
+    ("no_scoped_entry", "no coverage entry for (class, method, line)"),
+    ("block_without_lines", "block has no lines"),
+]
+
+COLLISION_ATTRIBUTIONS = ("collision_winner_without_data", "collision_winner_other_data")
+
+_SOOT_SIGNATURE = re.compile(r"^<([^:]+):\s+\S+\s+([^(\s]+)\(")
+
+
+def block_map_scope(full_name: str) -> str:
+    """Scope of a block map ``fullName``.
+
+    Accepts both ``<pkg.Cls: int foo(int)>`` (Soot) and ``pkg.Cls.foo(int)``.
+    """
+    m = _SOOT_SIGNATURE.match(full_name)
+    if m:
+        return f"{m.group(1).replace('/', '.')}.{m.group(2)}"
+    return full_name.split("(", 1)[0].replace("/", ".")
+
+
+def coverage_scope(class_name: str, method_signature: str) -> str:
+    """Scope of a coverage_data.json method (``methodSignature`` like ``foo(I)I``)."""
+    return f"{class_name.replace('/', '.')}.{method_signature.split('(', 1)[0]}"
+
+
+class LineEntry:
+    """Coverage of one line within one scope (duplicates merged)."""
+
+    __slots__ = ("hits", "has_branch_data")
+
+    def __init__(self, hits: int, has_branch_data: bool):
+        self.hits = hits
+        self.has_branch_data = has_branch_data
+
+
+class LineOwners:
+    """Everything the flat, line-keyed map knows about one line number."""
+
+    __slots__ = ("count", "any_with_data", "any_without_data", "winner", "winner_has_data")
+
+    def __init__(self):
+        self.count = 0
+        self.any_with_data = False
+        self.any_without_data = False
+        self.winner = None
+        self.winner_has_data = False
+
+
+class ScopedLineIndex:
+    def __init__(self):
+        self.entries = {}  # (scope, line) -> LineEntry
+        self.lines = {}  # line -> LineOwners
+
+    @classmethod
+    def from_coverage_data(cls, coverage_data: dict) -> "ScopedLineIndex":
+        index = cls()
+        entries = index.entries
+        lines = index.lines
+        for klass in coverage_data.get("classes", []):
+            class_name = klass["name"]
+            for method in klass.get("methods", []):
+                scope = coverage_scope(class_name, method["methodSignature"])
+                for line in method.get("lines", []):
+                    number = line["line"]
+                    has_data = bool(line.get("jumps")) or bool(line.get("switches"))
+
+                    entry = entries.get((scope, number))
+                    if entry is None:
+                        entries[(scope, number)] = LineEntry(line["hits"], has_data)
+                    else:
+                        entry.hits = max(entry.hits, line["hits"])
+                        entry.has_branch_data = entry.has_branch_data or has_data
+
+                    owners = lines.get(number)
+                    if owners is None:
+                        owners = lines[number] = LineOwners()
+                    owners.count += 1
+                    if has_data:
+                        owners.any_with_data = True
+                    else:
+                        owners.any_without_data = True
+                    # Last one iterated wins, as in buildLineToCoverageMap().
+                    owners.winner = scope
+                    owners.winner_has_data = has_data
+        return index
+
+    def line_stats(self) -> tuple:
+        """``(unique lines, lines shared by >1 entry, lines where jump data can be lost)``."""
+        collisions = 0
+        jump_loss = 0
+        for owners in self.lines.values():
+            if owners.count > 1:
+                collisions += 1
+                if owners.any_with_data and owners.any_without_data:
+                    jump_loss += 1
+        return len(self.lines), collisions, jump_loss
+
+    def attribute(self, scope: str, line: int) -> str:
+        """Attribution key (see ``ATTRIBUTIONS``) of a hits=-1 IF edge whose
+        block belongs to ``scope`` and ends on ``line``."""
+        entry = self.entries.get((scope, line))
+        if entry is None:
+            return "no_scoped_entry"
+        if entry.has_branch_data:
+            owners = self.lines[line]
+            if owners.winner != scope:
+                if owners.winner_has_data:
+                    return "collision_winner_other_data"
+                return "collision_winner_without_data"
+            return "own_data_unresolved"
+        return "line_not_executed" if entry.hits == 0 else "executed_without_data"
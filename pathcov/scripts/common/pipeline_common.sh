@@ -59,6 +59,8 @@ readonly JUNIT_OPTIONS="${JUNIT_OPTIONS:-"--scan-classpath"}"  # This variable i
 readonly CG_CLASSES_OUTPUT_PATH="$DATA_DIR/intellij-coverage/cg_classes.txt"
 
 readonly BLOCK_MAP_PATH="$DATA_DIR/blockmaps/icfg_block_map.json"
+# Block map with hits=-1 edges re-resolved per method (read by the coverage heuristic)
+readonly REPAIRED_BLOCK_MAP_PATH="$DATA_DIR/blockmaps/icfg_block_map_repaired.json"
 
 readonly INTELLIJ_COVERAGE_AGENT_CONFIG_PATH="$DATA_DIR/intellij-coverage/intellij_coverage_agent.args"
 readonly INTELLIJ_COVERAGE_REPORT_PATH="$DATA_DIR/intellij-coverage/intellij_coverage_report.ic"
@@ -114,6 +116,23 @@ java \
   log "✅ Running test suite completed"
 }
 
+repair_block_map() {
+  log "⚙️ Repairing block map edge hits with method-scoped coverage lines"
+
+  # Older pathcov images ship without python3: fall back to the unrepaired
+  # block map so the heuristic still finds its coverage data.
+  if ! command -v python3 > /dev/null 2>&1; then
+    warn "⚠️ python3 not available in this image, using the unrepaired block map"
+    cp "$BLOCK_MAP_PATH" "$REPAIRED_BLOCK_MAP_PATH"
+    return 0
+  fi
+
+  python3 "$SCRIPTS_DIR/common/repair_block_map.py" \
+    "$BLOCK_MAP_PATH" \
+    "$COVERAGE_EXPORT_OUTPUT_PATH" \
+    "$REPAIRED_BLOCK_MAP_PATH"
+}
+
 generate_svg() {
   log "⚙️ Generating SVG visualization"
 
@@ -138,6 +157,7 @@ main_common() {
   run_junit_with_agent
   generate_coverage_data
   generate_block_map
+  repair_block_map
   generate_coverage_graph
   calculate_branch_coverage
   generate_svg
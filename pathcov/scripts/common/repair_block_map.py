@@ -0,0 +1,166 @@
+# Copyright (c) 2025-2026 Yoran Mertens
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+
+"""
+Re-resolve hits=-1 IF/SWITCH edges of a block map against coverage_data.json.
+
+pathcov's CoverageReport.buildLineToCoverageMap() keys coverage lines by
+line number only. When two methods share a source line number, the entry
+iterated last wins, and resolveIfEdgeHits() returns hits=-1 for edges whose
+own line did have jump/switch data. JDart's CoverageHeuristicStrategy then
+treats those branches as unknown and explores paths the test suite already
+covers.
+
+This stage joins every block map edge with the coverage data under a
+method-scoped key (class, method name, line). A hits=-1 edge is rewritten
+only when the scoped line resolves it unambiguously:
+
+* IF_TRUE / IF_FALSE: the line has exactly one jump; the edge gets its
+  trueHits / falseHits.
+* SWITCH_CASE / SWITCH_DEFAULT: the line has exactly one switch; the edge
+  gets hits[branchIndex] / defaultHits.
+
+Everything else is left as it was. The corrected map is written to a new
+file, so the original block map stays available for comparison.
+
+Usage:
+    python3 repair_block_map.py <icfg_block_map.json> <coverage_data.json> <output.json>
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+from collections import Counter
+
+_SOOT_SIGNATURE = re.compile(r"^<([^:]+):\s+\S+\s+([^(\s]+)\(")
+
+
+def block_map_scope(full_name):
+    """``pkg.Cls.name`` for ``<pkg.Cls: int name(int)>`` or ``pkg.Cls.name(int)``."""
+    m = _SOOT_SIGNATURE.match(full_name)
+    if m:
+        return f"{m.group(1).replace('/', '.')}.{m.group(2)}"
+    return full_name.split("(", 1)[0].replace("/", ".")
+
+
+def coverage_scope(class_name, method_signature):
+    """``pkg.Cls.name`` for a coverage_data.json method (``name(I)I``)."""
+    return f"{class_name.replace('/', '.')}.{method_signature.split('(', 1)[0]}"
+
+
+def build_scoped_lines(coverage_data):
+    """(scope, line) -> (jumps, switches), concatenated over duplicate entries."""
+    scoped = {}
+    for klass in coverage_data.get("classes", []):
+        class_name = klass["name"]
+        for method in klass.get("methods", []):
+            scope = coverage_scope(class_name, method["methodSignature"])
+            for line in method.get("lines", []):
+                jumps, switches = scoped.setdefault((scope, line["line"]), ([], []))
+                jumps.extend(line.get("jumps") or [])
+                switches.extend(line.get("switches") or [])
+    return scoped
+
+
+def resolve_edge_hits(edge, jumps, switches):
+    """Hit count for a hits=-1 edge, or None if it cannot be resolved."""
+    branch_type = edge["branchType"]
+    if branch_type in ("IF_TRUE", "IF_FALSE"):
+        if len(jumps) != 1:
+            return None
+        return jumps[0].get("trueHits" if branch_type == "IF_TRUE" else "falseHits")
+    if branch_type == "SWITCH_DEFAULT":
+        if len(switches) != 1:
+            return None
+        return switches[0].get("defaultHits")
+    if branch_type == "SWITCH_CASE":
+        if len(switches) != 1:
+            return None
+        hits = switches[0].get("hits") or []
+        index = edge["branchIndex"]
+        return hits[index] if 0 <= index < len(hits) else None
+    return None
+
+
+def repair_block_map(block_map, scoped_lines):
+    """Rewrite resolvable hits=-1 edges of ``block_map`` in place; return counts."""
+    stats = Counter()
+    for method_map in block_map.get("methodBlockMaps", []):
+        scope = block_map_scope(method_map["fullName"])
+        for block in method_map.get("blocks", []):
+            lines = block["coverageData"]["lines"]
+            for edge in block.get("edges", []):
+                if edge["hits"] != -1 or edge["branchType"] not in (
+                    "IF_TRUE", "IF_FALSE", "SWITCH_CASE", "SWITCH_DEFAULT"
+                ):
+                    continue
+                stats["unresolved"] += 1
+                if not lines:
+                    stats["no_lines"] += 1
+                    continue
+                entry = scoped_lines.get((scope, lines[-1]["line"]))
+                if entry is None:
+                    stats["no_scoped_entry"] += 1
+                    continue
+                hits = resolve_edge_hits(edge, *entry)
+                if hits is None:
+                    stats["ambiguous_or_missing"] += 1
+                    continue
+                edge["hits"] = hits
+                stats["repaired"] += 1
+    return stats
+
+
+def write_json_atomic(path, data):
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Re-resolve hits=-1 IF/SWITCH edges of a block map with method-scoped coverage lines."
+    )
+    parser.add_argument("block_map", help="icfg_block_map.json produced by GenerateBlockMap")
+    parser.add_argument("coverage_data", help="coverage_data.json produced by CoverageExportMain")
+    parser.add_argument("output", help="Where to write the corrected block map")
+    args = parser.parse_args()
+
+    with open(args.block_map, "r", encoding="utf-8") as f:
+        block_map = json.load(f)
+    with open(args.coverage_data, "r", encoding="utf-8") as f:
+        scoped_lines = build_scoped_lines(json.load(f))
+
+    stats = repair_block_map(block_map, scoped_lines)
+    write_json_atomic(args.output, block_map)
+
+    print(
+        f"Repaired {stats['repaired']} / {stats['unresolved']} hits=-1 IF/SWITCH edges "
+        f"(ambiguous or missing data: {stats['ambiguous_or_missing']}, "
+        f"no scoped entry: {stats['no_scoped_entry']}, block without lines: {stats['no_lines']})"
+    )
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -47,8 +47,18 @@ COVET_JPF_CONFIG="${CONTAINER_CONFIGS_DIR}/sut.jpf"
 DATA_DIR="${CONTAINER_DATA_DIR}"
 
 OUTPUT_DIR="./output"
+COVERAGE_CURVE_PATH="$OUTPUT_DIR/coverage-curve.tsv"
+PLATEAU_REASON_PATH="$OUTPUT_DIR/plateau-stop.txt"
 DEV_DATA_DIR="./development/data"
 
+# Optional early stop (scripts/plateau_controller.py): rules such as
+# "--max-idle 120 --min-slope 0.1 --slope-window 300". When set, the
+# covet-engine stage is interrupted once branch coverage plateaus.
+# --max-paths is rejected: the live curve gets one row per coverage
+# change, not per path.
+PLATEAU_ARGS="${PLATEAU_ARGS:-}"
+COVET_GENERATED_JPF_CONFIG="covet-engine/configs/sut_gen.jpf"
+
 # ============================================================
 # LOGGING
 # ============================================================
@@ -80,7 +90,7 @@ clear_directory() {
 # Compose file stack builder
 # ============================================================
 
-compose_up() {
+compose_files() {
   FILES="-f docker-compose.yml"
 
   if [[ "$ENVIRONMENT" == "dev" && -f docker-compose.override.yml ]]; then
@@ -90,20 +100,56 @@ compose_up() {
   [[ -f docker-compose.sut.yml ]] && FILES="$FILES -f docker-compose.sut.yml"
   [[ -f docker-compose.deps.yml ]] && FILES="$FILES -f docker-compose.deps.yml"
 
-  docker compose --env-file container.env $FILES up -d
+  echo "$FILES"
+}
+
+compose_up() {
+  docker compose --env-file container.env $(compose_files) up -d
 }
 
 compose_exec() {
-  FILES="-f docker-compose.yml"
+  docker compose --env-file container.env $(compose_files) exec "$@"
+}
 
-  if [[ "$ENVIRONMENT" == "dev" && -f docker-compose.override.yml ]]; then
-    FILES="$FILES -f docker-compose.override.yml"
-  fi
+# ============================================================
+# Plateau controller (optional early stop of the JPF stage)
+# ============================================================
 
-  [[ -f docker-compose.sut.yml ]] && FILES="$FILES -f docker-compose.sut.yml"
-  [[ -f docker-compose.deps.yml ]] && FILES="$FILES -f docker-compose.deps.yml"
+start_plateau_controller() {
+  rm -f "$PLATEAU_REASON_PATH"
+  # SIGINT lets the JVM run its shutdown hooks instead of being killed outright.
+  python3 scripts/plateau_controller.py "$COVERAGE_CURVE_PATH" $PLATEAU_ARGS \
+    --reason-file "$PLATEAU_REASON_PATH" \
+    --stop-command "docker compose --env-file container.env $(compose_files) exec -T $COVET_SERVICE pkill -INT -f RunJPF" &
+  PLATEAU_PID=$!
+}
+
+stop_plateau_controller() {
+  kill "$PLATEAU_PID" 2>/dev/null || true
+  wait "$PLATEAU_PID" 2>/dev/null || true
+}
+
+check_plateau_args() {
+  # extract_coverage_curve.py writes a row per jdart.evaluation line, which
+  # JDart only logs when coverage changes: the paths in between are never
+  # counted, so --max-paths would never fire.
+  if [[ " $PLATEAU_ARGS " == *" --max-paths"[\ =]* ]]; then
+    echo "[ERROR] PLATEAU_ARGS: --max-paths needs one curve row per path, the live" \
+      "coverage curve only has one per coverage change; use --max-idle or --min-slope" >&2
+    exit 1
+  fi
+}
 
-  docker compose --env-file container.env $FILES exec "$@"
+check_generated_tests() {
+  # JDart writes its tests from a shutdown hook; if the interrupted JVM
+  # did not get that far, the early stop threw the run's tests away.
+  local tests_dir
+  tests_dir="$(sed -n 's/^jdart\.tests\.dir=//p' "$COVET_GENERATED_JPF_CONFIG" | tail -n 1)"
+  if ! compose_exec -T "$COVET_SERVICE" \
+      sh -c '[ -d "$1" ] && [ -n "$(ls -A "$1")" ]' sh "$tests_dir"; then
+    echo "[ERROR] covet-engine was stopped early but wrote no tests to $tests_dir (jdart.tests.dir)" >&2
+    exit 1
+  fi
 }
 
 
@@ -114,6 +160,10 @@ compose_exec() {
 main() {
   log "⚙️ Environment: $ENVIRONMENT"
 
+  if [[ -n "$PLATEAU_ARGS" ]]; then
+    check_plateau_args
+  fi
+
   # Ensure directories exist
   mkdir -p "$OUTPUT_DIR"
 
@@ -142,7 +192,25 @@ main() {
   compose_exec "$PATHCOV_SERVICE" "$PATHCOV_SCRIPT" "$SUT_CONFIG" "$DATA_DIR"
 
   log "⚙️ Running covet-engine / JPF stage"
-  compose_exec "$COVET_SERVICE" /covet-engine-project/jpf-core/bin/jpf "$COVET_JPF_CONFIG"
+  if [[ -n "$PLATEAU_ARGS" ]]; then
+    log "⚙️ Plateau controller enabled: $PLATEAU_ARGS"
+    start_plateau_controller
+  fi
+  # -T: no TTY, so the output can be piped. The extractor passes every line
+  # through and writes the jdart.evaluation samples to the coverage curve.
+  local jpf_status=0
+  compose_exec -T "$COVET_SERVICE" /covet-engine-project/jpf-core/bin/jpf "$COVET_JPF_CONFIG" 2>&1 \
+    | python3 scripts/extract_coverage_curve.py - -o "$COVERAGE_CURVE_PATH" --passthrough \
+    || jpf_status=$?
+  if [[ -n "$PLATEAU_ARGS" ]]; then
+    stop_plateau_controller
+  fi
+  if [[ -f "$PLATEAU_REASON_PATH" ]]; then
+    log "⏹️ covet-engine stopped early: $(cat "$PLATEAU_REASON_PATH")"
+    check_generated_tests
+  elif (( jpf_status != 0 )); then
+    exit "$jpf_status"
+  fi
 
   log "✅ Pipeline completed successfully"
 }
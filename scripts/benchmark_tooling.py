@@ -0,0 +1,278 @@
+# Copyright (c) 2025-2026 Yoran Mertens
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+#!/usr/bin/env python3
+
+"""
+Scaling benchmark for ``analyze_block_map.py`` and ``plot_coverage_curve.py``.
+
+For every requested size this generates synthetic inputs with
+``generate_synthetic_data.py`` (cached in the work directory, so repeated
+runs only pay for the measurements), runs each tool configuration in a fresh
+subprocess and records:
+
+* ``wall_s`` — wall-clock time of the whole process (best of ``--repeat``),
+* ``peak_rss_mb`` — the child's own peak RSS, read from ``wait4()``,
+* ``per_s`` — throughput in edges (block maps) or samples (curves) per second.
+
+Results are printed as a table and optionally written as TSV (``--output``)
+so runs can be diffed to spot regressions. A configuration that fails (e.g.
+``columnar`` without NumPy, ``render`` without matplotlib) is recorded with
+its exit status instead of aborting the whole benchmark.
+
+Usage::
+
+    python3 scripts/benchmark_tooling.py [--edges 1e3,1e4,1e5,1e6] \\
+        [--samples 1e3,1e4,1e5] [--cases analyze-python,curve-auc,...] \\
+        [--repeat N] [--work-dir DIR] [--output results.tsv]
+
+Sizes up to 10^7 edges are supported; the generated block map is roughly
+170 bytes per edge, so plan for ~2 GB of disk at that size. Keep CI runs at
+10^5 or below.
+"""
+from __future__ import annotations
+
+import argparse
+import csv
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+from generate_synthetic_data import BlockMapSpec, write_coverage_curve, write_sut  # noqa: E402
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+ANALYZER = REPO_ROOT / "analyze_block_map.py"
+PLOTTER = REPO_ROOT / "scripts" / "plot_coverage_curve.py"
+
+DEFAULT_EDGES = "1e3,1e4,1e5,1e6"
+DEFAULT_SAMPLES = "1e3,1e4,1e5"
+
+
+@dataclass
+class Inputs:
+    block_map: Optional[Path] = None
+    coverage_data: Optional[Path] = None
+    curve: Optional[Path] = None
+    work_dir: Optional[Path] = None
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    unit: str  # "edges" or "samples"
+    command: Callable[[Inputs], List[str]]
+    # Run once before measuring (e.g. to warm a cache); not timed.
+    warmup: bool = False
+
+
+def _analyze(*extra: str) -> Callable[[Inputs], List[str]]:
+    def command(inputs: Inputs) -> List[str]:
+        return [
+            sys.executable, str(ANALYZER), str(inputs.block_map),
+            "--coverage-data", str(inputs.coverage_data), *extra,
+        ]
+    return command
+
+
+def _columnar_cached(inputs: Inputs) -> List[str]:
+    return _analyze(
+        "--engine", "columnar", "--cache-dir", str(inputs.work_dir / "cache")
+    )(inputs)
+
+
+def _plot(*extra: str) -> Callable[[Inputs], List[str]]:
+    def command(inputs: Inputs) -> List[str]:
+        return [sys.executable, str(PLOTTER), str(inputs.curve), *extra]
+    return command
+
+
+CASES: Dict[str, Case] = {
+    case.name: case
+    for case in [
+        Case("analyze-python", "edges", _analyze()),
+        Case("analyze-stream", "edges", _analyze("--stream")),
+        Case("analyze-columnar", "edges", _analyze("--engine", "columnar", "--no-cache")),
+        Case("analyze-columnar-warm", "edges", _columnar_cached, warmup=True),
+        Case("curve-auc", "samples", _plot("--no-plot")),
+        Case("curve-render", "samples", lambda inputs: _plot(
+            "-o", str(inputs.curve.with_suffix(".png"))
+        )(inputs)),
+    ]
+}
+
+
+def parse_sizes(spec: str) -> List[int]:
+    """Parse ``"1e3,1e4,250000"`` into ints."""
+    return [int(float(part)) for part in spec.split(",") if part.strip()]
+
+
+def measure(command: List[str]) -> tuple:
+    """Run ``command`` with output discarded; return ``(wall_s, peak_rss_mb, status)``."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    _, status, usage = os.wait4(proc.pid, 0)
+    wall = time.perf_counter() - start
+    if os.WIFEXITED(status):
+        proc.returncode = os.WEXITSTATUS(status)
+    else:
+        proc.returncode = -os.WTERMSIG(status)
+    # ru_maxrss is in KiB on Linux and in bytes on macOS.
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return wall, usage.ru_maxrss / scale, proc.returncode
+
+
+def block_map_inputs(work_dir: Path, edges: int, seed: int) -> Inputs:
+    out_dir = work_dir / f"edges-{edges}-seed{seed}"
+    spec = BlockMapSpec.for_edges(edges, seed=seed)
+    block_map = out_dir / "blockmaps" / "icfg_block_map.json"
+    coverage_data = out_dir / "coverage" / "coverage_data.json"
+    if not (block_map.exists() and coverage_data.exists()):
+        print(f"  generating ~{edges} edges ({spec.methods} methods) ...", file=sys.stderr)
+        write_sut(out_dir, spec)
+    return Inputs(block_map=block_map, coverage_data=coverage_data, work_dir=work_dir)
+
+
+def curve_inputs(work_dir: Path, samples: int, seed: int) -> Inputs:
+    curve = work_dir / f"curve-{samples}-seed{seed}" / "coverage-curve.tsv"
+    if not curve.exists():
+        print(f"  generating {samples} curve samples ...", file=sys.stderr)
+        write_coverage_curve(curve, samples, seed=seed)
+    return Inputs(curve=curve, work_dir=work_dir)
+
+
+def run_benchmark(cases: List[Case], edge_sizes: List[int], sample_sizes: List[int],
+                  work_dir: Path, repeat: int, seed: int) -> List[dict]:
+    results = []
+    for case in cases:
+        sizes = edge_sizes if case.unit == "edges" else sample_sizes
+        for size in sizes:
+            if case.unit == "edges":
+                inputs = block_map_inputs(work_dir, size, seed)
+            else:
+                inputs = curve_inputs(work_dir, size, seed)
+            command = case.command(inputs)
+            if case.warmup:
+                measure(command)
+
+            best = None
+            for _ in range(repeat):
+                wall, rss, status = measure(command)
+                if best is None or wall < best[0]:
+                    best = (wall, rss, status)
+                if status != 0:
+                    break
+            wall, rss, status = best
+            row = {
+                "case": case.name,
+                "unit": case.unit,
+                "size": size,
+                "wall_s": f"{wall:.3f}",
+                "peak_rss_mb": f"{rss:.1f}",
+                "per_s": f"{size / wall:.0f}" if status == 0 and wall > 0 else "",
+                "status": status,
+            }
+            results.append(row)
+            print(
+                f"{row['case']:<24} {size:>10} {case.unit:<7} {row['wall_s']:>9} s "
+                f"{row['peak_rss_mb']:>9} MB {row['per_s']:>12}/s"
+                + ("" if status == 0 else f"  FAILED (exit {status})")
+            )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Measure wall time, peak RSS and throughput of the analysis tooling."
+    )
+    parser.add_argument(
+        "--edges",
+        default=DEFAULT_EDGES,
+        help=f"Comma-separated block map sizes in edges. Default: {DEFAULT_EDGES}.",
+    )
+    parser.add_argument(
+        "--samples",
+        default=DEFAULT_SAMPLES,
+        help=f"Comma-separated coverage-curve sizes in samples. Default: {DEFAULT_SAMPLES}.",
+    )
+    parser.add_argument(
+        "--cases",
+        default=",".join(CASES),
+        help=f"Comma-separated cases to run. Default: all ({', '.join(CASES)}).",
+    )
+    parser.add_argument(
+        "--repeat",
+        type=int,
+        default=1,
+        help="Runs per measurement; the fastest is reported. Default: 1.",
+    )
+    parser.add_argument(
+        "--work-dir",
+        type=Path,
+        default=None,
+        help="Where generated inputs (and the columnar cache) are kept between "
+        "runs. Default: a temporary directory removed afterwards.",
+    )
+    parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="Also write the results as TSV to this path.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    unknown = [name for name in args.cases.split(",") if name not in CASES]
+    if unknown:
+        parser.error(f"unknown case(s) {unknown}; choose from {list(CASES)}")
+    cases = [CASES[name] for name in args.cases.split(",")]
+
+    tmp = None
+    work_dir = args.work_dir
+    if work_dir is None:
+        tmp = tempfile.TemporaryDirectory(prefix="covet-bench-")
+        work_dir = Path(tmp.name)
+    work_dir.mkdir(parents=True, exist_ok=True)
+
+    try:
+        results = run_benchmark(
+            cases, parse_sizes(args.edges), parse_sizes(args.samples),
+            work_dir, max(args.repeat, 1), args.seed,
+        )
+    finally:
+        if tmp is not None:
+            tmp.cleanup()
+
+    if args.output is not None:
+        with args.output.open("w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(results[0]), delimiter="\t")
+            writer.writeheader()
+            writer.writerows(results)
+        print(f"\nWrote {len(results)} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
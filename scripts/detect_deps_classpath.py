@@ -20,8 +20,17 @@
 
 #!/usr/bin/env python3
 
+import hashlib
+import json
+import os
+import re
+import shutil
 import subprocess
 import sys
+import xml.etree.ElementTree as ET
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 
 
@@ -85,142 +94,1221 @@ def deps_dir_from_build_tool(build_tool: str, project_dir: Path) -> Path:
 # ============================================================
 # MAVEN
 # ============================================================
+# One `dependency:list` run over the widest scope reports every artifact
+# together with its scope, so both classpaths come out of a single Maven
+# start-up instead of one `dependency:build-classpath` per scope.
 
-def maven_classpath_with_scope(project_dir: Path, scope: str):
-    tmp_file = project_dir / f".classpath.{scope}.tmp"
-    cmd = [
+SCOPES = ("runtime", "test")
+
+# Maven scopes that end up on each of our classpaths (`-DincludeScope`
+# semantics of the dependency plugin).
+MAVEN_SCOPE_MEMBERS = {
+    "runtime": {"compile", "runtime"},
+    "test": {"compile", "provided", "runtime", "test", "system"},
+}
+
+# "   g:a:jar[:classifier]:1.0:compile:/abs/a-1.0.jar (optional) -- module a"
+# The scope is the field right before the absolute file name: a groupId or
+# artifactId may itself be "test" or "runtime" (org.foo:test:jar:1.0:...).
+MAVEN_LIST_LINE = re.compile(
+    r":(compile|provided|runtime|test|system):((?:/|[A-Za-z]:[\\/]).+?)"
+    r"(?: \(optional\))?(?: -- module .*)?$"
+)
+
+
+def parse_maven_dependency_list(text: str):
+    cps = {scope: [] for scope in SCOPES}
+    for line in text.splitlines():
+        m = MAVEN_LIST_LINE.search(line.strip())
+        if not m:
+            continue  # header, "none", blank lines
+        maven_scope, path = m.groups()
+        for scope in SCOPES:
+            if maven_scope in MAVEN_SCOPE_MEMBERS[scope] and path not in cps[scope]:
+                cps[scope].append(path)
+    return {scope: ":".join(paths) for scope, paths in cps.items()}
+
+
+MVN_LIST_FILE = ".classpath.deps.tmp"
+
+
+def mvn_dependency_list_cmd(output_file, extra_args=()):
+    return [
         "mvn", "-q",
-        "-Dmdep.outputAbsoluteArtifactFilename=true",
-        "-Dmdep.pathSeparator=:",
-        f"-Dmdep.outputFile={tmp_file}",
-        f"-DincludeScope={scope}",
-        "dependency:build-classpath"
+        *extra_args,
+        "-DoutputAbsoluteArtifactFilename=true",
+        "-DoutputScope=true",
+        f"-DoutputFile={output_file}",
+        "-DincludeScope=test",
+        "dependency:list"
     ]
-    run(cmd, project_dir)
-    cp = tmp_file.read_text().strip() if tmp_file.exists() else ""
+
+
+def mvn_deps_classpaths(project_dir: Path):
+    tmp_file = project_dir / MVN_LIST_FILE
+    run(mvn_dependency_list_cmd(tmp_file), project_dir)
+    text = tmp_file.read_text() if tmp_file.exists() else ""
     tmp_file.unlink(missing_ok=True)
-    return cp
+    return parse_maven_dependency_list(text)
+
+
+def mvn_reactor_deps_classpaths(project_dir: Path, module_dirs):
+    """``{module dir: {scope: classpath}}`` from a single reactor run at the
+    build root. Maven resolves the relative output file against each
+    module's basedir, and resolving inside the reactor lets modules depend
+    on siblings that were never installed."""
+    projects = ",".join(str(d.relative_to(project_dir)) for d in module_dirs)
+    try:
+        run(mvn_dependency_list_cmd(MVN_LIST_FILE, ["-pl", projects, "-am"]), project_dir)
+        results = {}
+        for module_dir in module_dirs:
+            tmp_file = module_dir / MVN_LIST_FILE
+            text = tmp_file.read_text() if tmp_file.exists() else ""
+            results[module_dir] = parse_maven_dependency_list(text)
+        return results
+    finally:
+        for module_dir in _maven_module_dirs(project_dir):
+            (module_dir / MVN_LIST_FILE).unlink(missing_ok=True)
+
+
+# ============================================================
+# MAVEN (NATIVE)
+# ============================================================
+# For the common case -- a single-module project whose dependencies are
+# all in the local repository -- the classpath is resolved without Maven.
+# pom.xml and its parent chain are merged and interpolated, BOMs imported
+# with <scope>import</scope> are folded into dependencyManagement, and the
+# graph is walked breadth-first applying Maven's rules:
+#   * nearest wins: the first version reached at the lowest depth is used
+#     (ties go to the first declaration);
+#   * transitive test/provided/system and optional dependencies are
+#     dropped, compile/runtime ones inherit the narrower of both scopes;
+#     a farther path can widen the scope of a transitive winner, never of a
+#     direct dependency;
+#   * exclusions (including `*` wildcards) apply to the whole subtree;
+#   * the project's dependencyManagement overrides versions and scopes of
+#     transitive dependencies.
+# The classpath is emitted in pre-order over the resolved tree, like
+# Maven 3 does. Anything the resolver does not model (profiles that change
+# dependencies, build extensions, reactor modules, version ranges,
+# relocations, artifacts missing from the local repository, ...) raises
+# UnsupportedMavenModel and `mvn` resolves the project instead. Set
+# CLASSPATH_NATIVE_MAVEN=0 to always use `mvn`.
+
+class UnsupportedMavenModel(Exception):
+    """The project needs a feature the native resolver does not model."""
+
+
+@dataclass
+class MavenDependency:
+    group_id: str
+    artifact_id: str
+    version: str = None
+    type: str = "jar"
+    classifier: str = ""
+    scope: str = None
+    optional: bool = False
+    exclusions: frozenset = frozenset()  # of (groupId, artifactId)
+    system_path: str = None
+
+    @property
+    def key(self):
+        return (self.group_id, self.artifact_id, self.type, self.classifier)
+
+    @property
+    def coords(self):
+        return ":".join(filter(None, (self.group_id, self.artifact_id, self.type,
+                                      self.classifier, self.version)))
+
+
+@dataclass
+class RawPom:
+    path: Path
+    group_id: str
+    artifact_id: str
+    version: str
+    packaging: str
+    parent: tuple  # (groupId, artifactId, version, relativePath) or None
+    properties: dict
+    dependencies: list
+    managed: list
+    modules: list
+
+
+@dataclass
+class MavenModel:
+    """Effective (inherited, interpolated, BOM-expanded) model of one POM."""
+    dependencies: list
+    managed: dict  # dependency key -> MavenDependency
+
+
+# Artifact types that put a jar on the classpath: type -> (extension, classifier)
+MAVEN_JAR_TYPES = {
+    "jar": ("jar", ""),
+    "bundle": ("jar", ""),
+    "maven-plugin": ("jar", ""),
+    "ejb": ("jar", ""),
+    "test-jar": ("jar", "tests"),
+    "ejb-client": ("jar", "client"),
+}
+MAVEN_SCOPE_PRECEDENCE = ["compile", "runtime", "provided", "system", "test"]
+PROPERTY_REF = re.compile(r"\$\{([^}]+)\}")
+
+
+def native_maven_enabled() -> bool:
+    return os.getenv("CLASSPATH_NATIVE_MAVEN", "1").lower() not in ("0", "false", "no", "off")
+
+
+def _child_text(element, name, default=None):
+    child = element.find(name) if element is not None else None
+    if child is None or child.text is None:
+        return default
+    return child.text.strip()
+
+
+def _parse_dependency(element) -> MavenDependency:
+    exclusions = frozenset(
+        (_child_text(e, "groupId", "*"), _child_text(e, "artifactId", "*"))
+        for e in element.findall("exclusions/exclusion")
+    )
+    return MavenDependency(
+        group_id=_child_text(element, "groupId"),
+        artifact_id=_child_text(element, "artifactId"),
+        version=_child_text(element, "version"),
+        type=_child_text(element, "type", "jar"),
+        classifier=_child_text(element, "classifier", ""),
+        scope=_child_text(element, "scope"),
+        optional=_child_text(element, "optional", "false") == "true",
+        exclusions=exclusions,
+        system_path=_child_text(element, "systemPath"),
+    )
+
+
+def _check_supported(root, path: Path):
+    for profile in root.findall("profiles/profile"):
+        affects_dependencies = (profile.find("dependencies") is not None
+                                or profile.find("dependencyManagement") is not None)
+        active_properties = (_child_text(profile, "activation/activeByDefault") == "true"
+                             and profile.find("properties") is not None)
+        if affects_dependencies or active_properties:
+            raise UnsupportedMavenModel(
+                f"profile '{_child_text(profile, 'id', '?')}' in {path} changes dependencies")
+    if root.find("distributionManagement/relocation") is not None:
+        raise UnsupportedMavenModel(f"{path} is relocated")
+    if root.find("build/extensions") is not None:
+        raise UnsupportedMavenModel(f"{path} declares build extensions")
+    for plugin in root.findall("build/plugins/plugin"):
+        if _child_text(plugin, "extensions") == "true":
+            raise UnsupportedMavenModel(
+                f"plugin {_child_text(plugin, 'artifactId')} in {path} is a build extension")
+
+
+def parse_pom(path: Path) -> RawPom:
+    try:
+        root = ET.parse(path).getroot()
+    except (OSError, ET.ParseError) as e:
+        raise UnsupportedMavenModel(f"cannot read {path}: {e}")
+    for element in root.iter():
+        if isinstance(element.tag, str):
+            element.tag = element.tag.rsplit("}", 1)[-1]
+    _check_supported(root, path)
+
+    parent_el = root.find("parent")
+    parent = None
+    if parent_el is not None:
+        parent = (
+            _child_text(parent_el, "groupId"),
+            _child_text(parent_el, "artifactId"),
+            _child_text(parent_el, "version"),
+            _child_text(parent_el, "relativePath", "../pom.xml"),
+        )
+    properties_el = root.find("properties")
+    properties = {}
+    if properties_el is not None:
+        properties = {p.tag: (p.text or "").strip() for p in properties_el if isinstance(p.tag, str)}
+    return RawPom(
+        path=path,
+        group_id=_child_text(root, "groupId"),
+        artifact_id=_child_text(root, "artifactId"),
+        version=_child_text(root, "version"),
+        packaging=_child_text(root, "packaging", "jar"),
+        parent=parent,
+        properties=properties,
+        dependencies=[_parse_dependency(d) for d in root.findall("dependencies/dependency")],
+        managed=[_parse_dependency(d)
+                 for d in root.findall("dependencyManagement/dependencies/dependency")],
+        modules=[m.text.strip() for m in root.findall("modules/module") if m.text],
+    )
+
+
+def _interpolate(value, properties, where):
+    if value is None or "${" not in value:
+        return value
+
+    def lookup(m):
+        name = m.group(1)
+        if name.startswith("env."):
+            return os.environ.get(name[4:], m.group(0))
+        return properties.get(name, m.group(0))
 
+    for _ in range(10):  # properties may refer to other properties
+        expanded = PROPERTY_REF.sub(lookup, value)
+        if expanded == value:
+            break
+        value = expanded
+    if "${" in value:
+        raise UnsupportedMavenModel(f"cannot interpolate '{value}' in {where}")
+    return value
 
-def maven_test_deps_classpath(project_dir: Path):
-    return maven_classpath_with_scope(project_dir, "test")
 
+def _merge_by_key(chain_lists):
+    """Concatenate dependency lists from child to ancestors; the first
+    declaration of a key wins."""
+    merged = {}
+    for deps in chain_lists:
+        for dep in deps:
+            merged.setdefault(dep.key, dep)
+    return list(merged.values())
 
-def maven_runtime_deps_classpath(project_dir: Path):
-    return maven_classpath_with_scope(project_dir, "runtime")
+
+def _is_excluded(dep: MavenDependency, exclusions) -> bool:
+    return any(g in ("*", dep.group_id) and a in ("*", dep.artifact_id) for g, a in exclusions)
+
+
+def _transitive_scope(parent_scope: str, scope: str) -> str:
+    if parent_scope == "compile":
+        return scope
+    if parent_scope in ("provided", "test"):
+        return parent_scope
+    return "runtime"
+
+
+@dataclass
+class _Node:
+    dep: MavenDependency
+    scope: str
+    exclusions: frozenset
+    direct: bool
+    children: list = field(default_factory=list)
+
+
+class MavenLocalResolver:
+    """Resolve a project's dependency classpaths from a local repository."""
+
+    def __init__(self, repository: Path, reactor=None, inputs=None):
+        self.repository = repository
+        # Every POM read is added to ``inputs`` (when given), so a cached
+        # result can be invalidated when a parent or BOM changes.
+        self.inputs = inputs
+        # (groupId, artifactId) -> module directory of a multi-module build;
+        # siblings resolve to their pom.xml and compiled classes.
+        self.reactor = reactor or {}
+        self._raw = {}
+        self._models = {}
+
+    def pom_path(self, group_id, artifact_id, version) -> Path:
+        if (group_id, artifact_id) in self.reactor:
+            return self.reactor[(group_id, artifact_id)] / "pom.xml"
+        return (self.repository / group_id.replace(".", "/") / artifact_id / version
+                / f"{artifact_id}-{version}.pom")
+
+    def artifact_path(self, dep: MavenDependency) -> Path:
+        if dep.type not in MAVEN_JAR_TYPES:
+            raise UnsupportedMavenModel(f"dependency type '{dep.type}' of {dep.coords}")
+        extension, implied_classifier = MAVEN_JAR_TYPES[dep.type]
+        classifier = dep.classifier or implied_classifier
+        module_dir = self.reactor.get((dep.group_id, dep.artifact_id))
+        if module_dir is not None:
+            return module_dir / "target" / ("test-classes" if classifier == "tests" else "classes")
+        name = f"{dep.artifact_id}-{dep.version}{f'-{classifier}' if classifier else ''}.{extension}"
+        return self.repository / dep.group_id.replace(".", "/") / dep.artifact_id / dep.version / name
+
+    def raw(self, path: Path) -> RawPom:
+        if path not in self._raw:
+            if not path.exists():
+                raise UnsupportedMavenModel(f"{path} is not in the local repository")
+            self._raw[path] = parse_pom(path)
+            if self.inputs is not None:
+                self.inputs.add(path)
+        return self._raw[path]
+
+    def _parent_pom(self, pom: RawPom) -> RawPom:
+        group_id, artifact_id, version, relative_path = pom.parent
+        if relative_path:
+            local = pom.path.parent / relative_path
+            if local.is_dir():
+                local = local / "pom.xml"
+            if local.exists():
+                candidate = self.raw(local.resolve())
+                candidate_group = candidate.group_id or (candidate.parent or (None,))[0]
+                candidate_version = candidate.version or (candidate.parent or (None, None, None))[2]
+                if (candidate_group, candidate.artifact_id, candidate_version) == (group_id, artifact_id, version):
+                    return candidate
+        return self.raw(self.pom_path(group_id, artifact_id, version))
+
+    def model(self, pom_path: Path) -> MavenModel:
+        if pom_path in self._models:
+            if self._models[pom_path] is None:
+                raise UnsupportedMavenModel(f"cyclic parent or BOM import through {pom_path}")
+            return self._models[pom_path]
+        self._models[pom_path] = None
+
+        chain = [self.raw(pom_path)]
+        while chain[-1].parent is not None:
+            if len(chain) > 50:
+                raise UnsupportedMavenModel(f"parent chain of {pom_path} is too deep")
+            chain.append(self._parent_pom(chain[-1]))
+        pom = chain[0]
+
+        properties = {}
+        for ancestor in reversed(chain):
+            properties.update(ancestor.properties)
+        group_id = pom.group_id or pom.parent[0]
+        version = pom.version or pom.parent[2]
+        basedir = str(pom.path.parent)
+        for prefix in ("project.", "pom."):
+            properties[prefix + "groupId"] = group_id
+            properties[prefix + "artifactId"] = pom.artifact_id
+            properties[prefix + "version"] = version
+            properties[prefix + "basedir"] = basedir
+            if pom.parent is not None:
+                properties[prefix + "parent.groupId"] = pom.parent[0]
+                properties[prefix + "parent.artifactId"] = pom.parent[1]
+                properties[prefix + "parent.version"] = pom.parent[2]
+        properties["basedir"] = basedir
+
+        def interpolated(dep):
+            return MavenDependency(
+                group_id=_interpolate(dep.group_id, properties, pom.path),
+                artifact_id=_interpolate(dep.artifact_id, properties, pom.path),
+                version=_interpolate(dep.version, properties, pom.path),
+                type=_interpolate(dep.type, properties, pom.path),
+                classifier=_interpolate(dep.classifier, properties, pom.path),
+                scope=_interpolate(dep.scope, properties, pom.path),
+                optional=dep.optional,
+                exclusions=dep.exclusions,
+                system_path=_interpolate(dep.system_path, properties, pom.path),
+            )
+
+        managed = {}
+        imports = []
+        for dep in map(interpolated, _merge_by_key(a.managed for a in chain)):
+            if dep.scope == "import" and dep.type == "pom":
+                imports.append(dep)
+            else:
+                managed.setdefault(dep.key, dep)
+        for bom in imports:
+            self._check_version(bom)
+            bom_model = self.model(self.pom_path(bom.group_id, bom.artifact_id, bom.version))
+            for key, dep in bom_model.managed.items():
+                managed.setdefault(key, dep)
+
+        dependencies = []
+        for dep in map(interpolated, _merge_by_key(a.dependencies for a in chain)):
+            m = managed.get(dep.key)
+            if m is not None:
+                dep.version = dep.version or m.version
+                dep.scope = dep.scope or m.scope
+                dep.exclusions = dep.exclusions | m.exclusions
+                dep.system_path = dep.system_path or m.system_path
+            dep.scope = dep.scope or "compile"
+            dependencies.append(dep)
+
+        self._models[pom_path] = MavenModel(dependencies=dependencies, managed=managed)
+        return self._models[pom_path]
+
+    @staticmethod
+    def _check_version(dep: MavenDependency):
+        if not dep.version:
+            raise UnsupportedMavenModel(f"no version for {dep.coords}")
+        if dep.version[0] in "[(" or "," in dep.version:
+            raise UnsupportedMavenModel(f"version range {dep.version} for {dep.coords}")
+
+    def resolve(self, project_dir: Path):
+        """``{"runtime": cp, "test": cp}`` for the project in ``project_dir``."""
+        root_pom = self.raw(project_dir / "pom.xml")
+        if root_pom.modules:
+            raise UnsupportedMavenModel("multi-module (reactor) build")
+        root = self.model(root_pom.path)
+
+        nodes = {}
+        top = []
+        queue = deque((dep, dep.scope, dep.exclusions, None) for dep in root.dependencies)
+        while queue:
+            dep, scope, exclusions, parent = queue.popleft()
+            node = nodes.get(dep.key)
+            if node is None:
+                self._check_version(dep)
+                node = _Node(dep, scope, exclusions, parent is None)
+                nodes[dep.key] = node
+                (top if parent is None else nodes[parent].children).append(dep.key)
+            elif (node.direct or MAVEN_SCOPE_PRECEDENCE.index(scope)
+                    >= MAVEN_SCOPE_PRECEDENCE.index(node.scope)):
+                continue  # the nearer declaration wins
+            else:
+                node.scope = scope  # a farther path needs it in a wider scope
+            if node.scope == "system":
+                continue
+
+            model = self.model(self.pom_path(node.dep.group_id, node.dep.artifact_id, node.dep.version))
+            for child in model.dependencies:
+                if child.optional or child.scope in ("test", "provided", "system"):
+                    continue
+                if _is_excluded(child, node.exclusions):
+                    continue
+                managed = root.managed.get(child.key)
+                child_scope = child.scope
+                if managed is not None:
+                    child = MavenDependency(**{**vars(child), "version": managed.version or child.version,
+                                               "exclusions": child.exclusions | managed.exclusions})
+                    child_scope = managed.scope or child_scope
+                if child_scope not in ("test", "provided"):
+                    child_scope = _transitive_scope(node.scope, child_scope)
+                queue.append((child, child_scope, node.exclusions | child.exclusions, dep.key))
+
+        cps = {scope: [] for scope in SCOPES}
+        stack = list(reversed(top))
+        while stack:
+            node = nodes[stack.pop()]
+            stack.extend(reversed(node.children))
+            if node.dep.type == "pom":
+                continue  # only its dependencies end up on the classpath
+            if node.scope == "system":
+                if not node.dep.system_path or not Path(node.dep.system_path).exists():
+                    raise UnsupportedMavenModel(f"missing systemPath for {node.dep.coords}")
+                path = node.dep.system_path
+            else:
+                path = self.artifact_path(node.dep)
+                if not path.exists():
+                    raise UnsupportedMavenModel(f"{node.dep.coords} is not in the local repository")
+            for scope in SCOPES:
+                if node.scope in MAVEN_SCOPE_MEMBERS[scope]:
+                    cps[scope].append(str(path))
+        return {scope: ":".join(paths) for scope, paths in cps.items()}
+
+
+def native_maven_deps_classpaths(project_dir: Path, build_root: Path = None, reactor=None, inputs=None):
+    build_root = build_root or project_dir
+    if (build_root / ".mvn" / "extensions.xml").exists():
+        raise UnsupportedMavenModel("core extensions in .mvn/extensions.xml")
+    settings = Path.home() / ".m2" / "settings.xml"
+    if settings.exists() and "<localRepository>" in settings.read_text(errors="replace"):
+        raise UnsupportedMavenModel(f"custom localRepository in {settings}")
+    repository = deps_dir_from_build_tool("maven", project_dir)
+    return MavenLocalResolver(repository, reactor, inputs).resolve(project_dir)
+
+
+def try_native_maven_deps_classpaths(module_dir: Path, build_root: Path = None, reactor=None, inputs=None):
+    """Natively resolved classpaths, or None if `mvn` has to resolve them."""
+    if not native_maven_enabled():
+        return None
+    try:
+        return native_maven_deps_classpaths(module_dir, build_root, reactor, inputs)
+    except UnsupportedMavenModel as e:
+        print(f"[classpath] native Maven resolver: {e}; running mvn", file=sys.stderr)
+        return None
+
+
+def maven_deps_classpaths(project_dir: Path, target_class: str = None, inputs=None):
+    reactor, modules = maven_reactor(project_dir)
+    if len(reactor) <= 1:
+        cps = try_native_maven_deps_classpaths(project_dir, inputs=inputs)
+        return cps if cps is not None else mvn_deps_classpaths(project_dir)
+
+    selected = find_target_modules(project_dir, modules, target_class)
+    results = dict(run_per_module(
+        selected, lambda d: try_native_maven_deps_classpaths(d, project_dir, reactor, inputs)))
+    unresolved = [d for d in selected if results[d] is None]
+    if unresolved:
+        results.update(mvn_reactor_deps_classpaths(project_dir, unresolved))
+    return merge_module_classpaths(project_dir, [(d, results[d]) for d in selected])
 
 
 # ============================================================
 # GRADLE
 # ============================================================
 
-def gradle_test_deps_classpath(project_dir: Path):
-    init_script = project_dir / ".print_classpath.gradle"
-    init_script.write_text("""
+GRADLE_INIT_SCRIPT = """
 allprojects {
     afterEvaluate { project ->
         if (project.plugins.hasPlugin('java')) {
-            project.tasks.register("printAllDepsClasspath") {
+            project.tasks.register("printDepsClasspaths") {
                 doLast {
-                    def cp = []
+                    def runtimeCp = []
+                    def testCp = []
                     if (project.sourceSets.findByName("main")) {
-                        cp += project.sourceSets.main.runtimeClasspath.files
+                        runtimeCp += project.sourceSets.main.runtimeClasspath.files
                     }
+                    testCp += runtimeCp
                     if (project.sourceSets.findByName("test")) {
-                        cp += project.sourceSets.test.runtimeClasspath.files
+                        testCp += project.sourceSets.test.runtimeClasspath.files
                     }
-                    println cp.collect { it.absolutePath }.unique().join(":")
+                    def dir = project.projectDir.absolutePath
+                    println dir + "\\truntime=" + runtimeCp.collect { it.absolutePath }.unique().join(":")
+                    println dir + "\\ttest=" + testCp.collect { it.absolutePath }.unique().join(":")
                 }
             }
         }
     }
 }
-""")
-    cmd = ["gradle", "-q", "--init-script", str(init_script), "printAllDepsClasspath"]
-    cp = run(cmd, project_dir)
-    init_script.unlink(missing_ok=True)
-    return cp
+"""
 
 
-def gradle_runtime_deps_classpath(project_dir: Path):
-    init_script = project_dir / ".print_runtime_classpath.gradle"
-    init_script.write_text("""
-allprojects {
-    afterEvaluate { project ->
-        if (project.plugins.hasPlugin('java')) {
-            project.tasks.register("printRuntimeDepsClasspath") {
-                doLast {
-                    def runtimeCp = project.sourceSets.main.runtimeClasspath.files
-                        .collect { it.absolutePath }
-                        .unique()
-                        .join(":")
-                    println runtimeCp
-                }
-            }
-        }
-    }
-}
-""")
+def parse_gradle_classpaths(output: str):
+    """``{project dir: {scope: classpath}}`` from the init script's
+    ``<projectDir>\\t<scope>=<classpath>`` lines."""
+    modules = {}
+    for line in output.splitlines():
+        module_dir, tab, rest = line.strip().partition("\t")
+        scope, sep, cp = rest.partition("=")
+        if not tab or not sep or scope not in SCOPES:
+            continue
+        modules.setdefault(Path(module_dir), {s: "" for s in SCOPES})[scope] = cp
+    return modules
 
-    runtime_cp = run(
-        ["gradle", "-q", "--init-script", str(init_script), "printRuntimeDepsClasspath"],
-        project_dir
-    )
 
-    init_script.unlink(missing_ok=True)
-    return runtime_cp.strip()
+def gradle_deps_classpaths(project_dir: Path, target_class: str = None, inputs=None):
+    # Gradle configures every project in one run anyway, so all modules come
+    # out of a single invocation instead of one per module.
+    init_script = project_dir / ".print_deps_classpaths.gradle"
+    init_script.write_text(GRADLE_INIT_SCRIPT)
+    try:
+        output = run(
+            ["gradle", "-q", "--init-script", str(init_script), "printDepsClasspaths"],
+            project_dir
+        )
+    finally:
+        init_script.unlink(missing_ok=True)
+    modules = parse_gradle_classpaths(output)
+    selected = find_target_modules(project_dir, list(modules), target_class)
+    return merge_module_classpaths(project_dir, [(d, modules[d]) for d in selected])
 
 
 # ============================================================
 # IVY / ANT
 # ============================================================
+# `ivy:resolve` writes a report per conf into the resolution cache
+# (<cache>/<organisation>-<module>-<conf>.xml) listing the exact artifacts
+# it picked, with their cache locations and evicted revisions marked. The
+# classpath for a conf is read from that report; only when there is none
+# (custom resolution cache, conf not declared, ...) do we fall back to the
+# jars `ivy:retrieve` copied for that conf, located through the retrieve
+# pattern. That pattern has to separate confs ([conf]): both confs are
+# retrieved in the same run, so a shared lib/ would mix test jars (and
+# anything vendored there) into the runtime classpath. Either way the cost is O(dependencies) rather than a walk over
+# the whole project, and unrelated jars (build output, vendored tools)
+# stay off the classpath. Results are cached through the build fingerprint,
+# which covers ivy.xml / ivysettings.xml.
+
+IVY_DEFAULT_RETRIEVE_PATTERN = "lib/[artifact]-[revision](-[classifier]).[ext]"
+IVY_RETRIEVE_PATTERN = re.compile(r"""<ivy:retrieve\b[^>]*\bpattern\s*=\s*["']([^"']+)["']""")
+IVY_SKIPPED_TYPES = {"source", "sources", "src", "javadoc", "javadocs", "doc"}
+
+
+def ivy_module_id(project_dir: Path):
+    try:
+        root = ET.parse(project_dir / "ivy.xml").getroot()
+    except (OSError, ET.ParseError):
+        return None
+    info = root.find("info")
+    if info is None:
+        return None
+    return info.get("organisation"), info.get("module")
+
+
+def parse_ivy_report(report: Path):
+    """Jar locations of the non-evicted revisions in an Ivy resolve report,
+    in resolution order."""
+    root = ET.parse(report).getroot()
+    revisions = []
+    for module in root.findall("dependencies/module"):
+        for revision in module.findall("revision"):
+            if revision.get("evicted"):
+                continue
+            revisions.append((int(revision.get("position", "0")), revision))
+    revisions.sort(key=lambda r: r[0])
+
+    jars = []
+    for _, revision in revisions:
+        for artifact in revision.findall("artifacts/artifact"):
+            location = artifact.get("location")
+            if (location and artifact.get("ext") == "jar"
+                    and artifact.get("type") not in IVY_SKIPPED_TYPES and location not in jars):
+                jars.append(location)
+    return jars
 
-def ivy_resolve(project_dir: Path, conf: str):
-    cmd = ["ant", "-q", f"-Divy.conf={conf}", "resolve", "retrieve"]
+
+def ivy_retrieved_jars(project_dir: Path, conf: str):
+    """Jars `ivy:retrieve` copied for ``conf``, or None if there is no
+    retrieve directory for it (including patterns without ``[conf]``)."""
+    pattern = IVY_DEFAULT_RETRIEVE_PATTERN
+    build_xml = project_dir / "build.xml"
+    if build_xml.exists():
+        m = IVY_RETRIEVE_PATTERN.search(build_xml.read_text(errors="replace"))
+        if m:
+            pattern = m.group(1)
+    pattern = pattern.replace("${basedir}/", "").replace("${ivy.lib.dir}", "lib")
+    if "${" in pattern or "[conf]" not in pattern:
+        return None
+    glob = re.sub(r"\([^)]*\)", "*", pattern.replace("[conf]", conf))
+    glob = re.sub(r"\*+", "*", re.sub(r"\[[^\]]+\]", "*", glob))
+    directory = project_dir / Path(glob).parent
+    if "*" in str(Path(glob).parent) or not directory.is_dir():
+        return None
+    return sorted(str(j.resolve()) for j in directory.glob(Path(glob).name) if j.suffix == ".jar")
+
+
+def ivy_deps_classpaths(project_dir: Path, target_class: str = None, inputs=None):
+    # Ivy/Ant projects are resolved as one module.
+    cmd = ["ant", "-q", f"-Divy.conf={','.join(SCOPES)}", "resolve", "retrieve"]
     run(cmd, project_dir)
 
-    jars = list(project_dir.rglob("*.jar"))
-    return ":".join(str(j.resolve()) for j in jars)
+    cache = deps_dir_from_build_tool("ivy", project_dir)
+    module_id = ivy_module_id(project_dir)
+    cps = {}
+    for scope in SCOPES:
+        report = cache / f"{module_id[0]}-{module_id[1]}-{scope}.xml" if module_id else None
+        if report is not None and report.exists():
+            jars = parse_ivy_report(report)
+        else:
+            jars = ivy_retrieved_jars(project_dir, scope)
+            if jars is None:
+                raise RuntimeError(
+                    f"No Ivy resolve report or per-conf retrieve directory ([conf] in the "
+                    f"retrieve pattern) for conf '{scope}' in {project_dir}, "
+                    "please set deps_class_path and DEPS_DIR manually")
+        cps[scope] = ":".join(jars)
+    return cps
+
+
+# ============================================================
+# MULTI-MODULE
+# ============================================================
+# In a multi-module build every module has its own classpath. Maven
+# modules are resolved natively and concurrently; the modules the native
+# resolver cannot handle share one root-level `mvn` reactor run (never one
+# JVM per module). Gradle reports all projects from its single run. Only the
+# modules that contain `target.class` are kept -- their classpaths
+# already include the sibling modules they depend on -- and their
+# classpaths are merged in module order, dropping duplicates. When two
+# modules pull different versions of the same artifact, the first one
+# is kept (it wins on the JVM classpath anyway) and the conflict is
+# reported. Set CLASSPATH_JOBS to bound the number of modules resolved
+# natively at the same time.
+
+# Where a module keeps the source or class file of the target class.
+TARGET_CLASS_LOCATIONS = [
+    "src/main/java/{}.java", "src/main/kotlin/{}.kt", "src/test/java/{}.java",
+    "target/classes/{}.class", "target/test-classes/{}.class",
+    "build/classes/java/main/{}.class", "build/classes/java/test/{}.class",
+    "build/classes/kotlin/main/{}.class",
+]
+
+
+def _pom_identity(pom: Path):
+    """(groupId, artifactId, packaging) of a module POM, without resolving it."""
+    root = ET.parse(pom).getroot()
+    for element in root.iter():
+        if isinstance(element.tag, str):
+            element.tag = element.tag.rsplit("}", 1)[-1]
+    return (_child_text(root, "groupId") or _child_text(root, "parent/groupId"),
+            _child_text(root, "artifactId"),
+            _child_text(root, "packaging", "jar"))
+
+
+def maven_reactor(project_dir: Path):
+    """``{(groupId, artifactId): module dir}`` for every module of the build,
+    and the directories of the modules that have a classpath (packaging
+    other than pom), in reactor declaration order."""
+    reactor = {}
+    modules = []
+    for module_dir in _maven_module_dirs(project_dir):
+        try:
+            group_id, artifact_id, packaging = _pom_identity(module_dir / "pom.xml")
+        except (OSError, ET.ParseError):
+            continue
+        reactor[(group_id, artifact_id)] = module_dir
+        if packaging != "pom":
+            modules.append(module_dir)
+    return reactor, modules
 
 
-def ivy_test_deps_classpath(project_dir: Path):
-    return ivy_resolve(project_dir, "test")
+def find_target_modules(project_dir: Path, module_dirs, target_class: str = None):
+    """The modules containing ``target_class``; all of them if the class
+    cannot be located (or none is given)."""
+    if not target_class or len(module_dirs) <= 1:
+        return module_dirs
+    relative = target_class.split("$")[0].replace(".", "/")
+    found = [d for d in module_dirs
+             if any((d / location.format(relative)).exists() for location in TARGET_CLASS_LOCATIONS)]
+    if not found:
+        print(f"[classpath] {target_class} not found in any of {len(module_dirs)} modules; "
+              "merging all of them", file=sys.stderr)
+        return module_dirs
+    names = ", ".join(str(d.relative_to(project_dir)) if d != project_dir else "." for d in found)
+    print(f"[classpath] {target_class} lives in {names}", file=sys.stderr)
+    return found
 
 
-def ivy_runtime_deps_classpath(project_dir: Path):
-    return ivy_resolve(project_dir, "runtime")
+def run_per_module(module_dirs, resolve):
+    """``[(module dir, resolve(module dir))]``, resolving modules concurrently."""
+    if len(module_dirs) <= 1:
+        return [(d, resolve(d)) for d in module_dirs]
+    jobs = int(os.getenv("CLASSPATH_JOBS", "0")) or None  # None: ThreadPoolExecutor default
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        return list(zip(module_dirs, pool.map(resolve, module_dirs)))
+
+
+def artifact_coordinates(entry: str):
+    """``((artifact dir, classifier), version)`` for a jar in a Maven, Gradle
+    or Ivy cache layout; ``None`` for anything else (class directories,
+    project-local jars)."""
+    path = Path(entry)
+    if path.suffix != ".jar":
+        return None
+    parents = path.parents
+    layouts = [
+        (parents[1], parents[0].name) if len(parents) > 1 else None,  # Maven: <a>/<v>/<a>-<v>.jar
+        (parents[2], parents[1].name) if len(parents) > 2 else None,  # Gradle: <a>/<v>/<sha1>/<a>-<v>.jar
+    ]
+    for artifact_dir, version in filter(None, layouts):
+        prefix = f"{artifact_dir.name}-{version}"
+        if path.stem == prefix or path.stem.startswith(prefix + "-"):
+            return (str(artifact_dir), path.stem[len(prefix) + 1:]), version
+    if path.parent.name in ("jars", "bundles") and len(parents) > 1:  # Ivy: <module>/jars/<module>-<rev>.jar
+        module = parents[1].name
+        if path.stem.startswith(module + "-"):
+            return (str(parents[1]), ""), path.stem[len(module) + 1:]
+    return None
+
+
+def merge_module_classpaths(project_dir: Path, results):
+    """Merge ``[(module dir, {scope: classpath})]`` in order, keeping the first
+    version of every artifact and reporting version conflicts."""
+    if len(results) == 1:
+        return results[0][1]
+
+    def name(module_dir):
+        return str(module_dir.relative_to(project_dir)) if module_dir != project_dir else "."
+
+    merged = {}
+    conflicts = {}
+    for scope in SCOPES:
+        entries = []
+        seen = set()
+        chosen = {}  # artifact key -> (version, module dir)
+        for module_dir, cps in results:
+            for entry in filter(None, cps[scope].split(":")):
+                if entry in seen:
+                    continue
+                coordinates = artifact_coordinates(entry)
+                if coordinates is not None:
+                    key, version = coordinates
+                    if key in chosen:
+                        if chosen[key][0] != version:
+                            conflicts.setdefault(key, {chosen[key][0]: chosen[key][1]}).setdefault(version, module_dir)
+                        continue
+                    chosen[key] = (version, module_dir)
+                seen.add(entry)
+                entries.append(entry)
+        merged[scope] = ":".join(entries)
+
+    for (artifact_dir, classifier), versions in conflicts.items():
+        artifact = Path(artifact_dir).name + (f":{classifier}" if classifier else "")
+        described = ", ".join(f"{v} ({name(d)})" for v, d in versions.items())
+        print(f"[classpath] version conflict for {artifact}: {described}; "
+              f"using {next(iter(versions))}", file=sys.stderr)
+    return merged
 
 
 # ============================================================
-# PUBLIC API
+# CACHE
 # ============================================================
+# Resolving a classpath costs a JVM / build tool start-up (20-90 s) even
+# when nothing changed, so resolved classpaths are cached per project and
+# scope. An entry is reused only while
+#   1) the fingerprint of the build still matches: the build files below
+#      (including those of Maven <modules>; for Gradle also `include`d
+#      subprojects, `apply from:` scripts, buildSrc/ and `includeBuild`s),
+#      the resolved build tool executable and the JVM / tool options from
+#      the environment, and
+#   2) every file on the cached classpath still has the size and mtime it
+#      had when the entry was written (directories only have to exist), and
+#   3) every POM the native Maven resolver read (relativePath parents,
+#      parents and BOMs from the local repository) still has the same
+#      content. The relativePath parent chain above the project is also
+#      part of the fingerprint, for the `mvn` path.
+# Gradle builds whose settings or applied scripts are computed (loops over
+# directories, interpolated paths, remote scripts) are never cached.
+# Set CLASSPATH_CACHE=0 to always run the build tool, CLASSPATH_CACHE_DIR
+# to move the cache.
 
-def detect_test_deps_classpath(project_dir_str: str):
-    project_dir = Path(project_dir_str).resolve()
-    tool = detect_build_tool(project_dir)
+FINGERPRINT_FILES = {
+    "maven": [".mvn/maven.config", ".mvn/extensions.xml", ".mvn/jvm.config",
+              ".mvn/wrapper/maven-wrapper.properties"],
+    "gradle": ["settings.gradle", "settings.gradle.kts", "gradle.properties",
+               "gradle/libs.versions.toml", "gradle/wrapper/gradle-wrapper.properties",
+               "gradle.lockfile", "settings-gradle.lockfile"],
+    "ivy": ["ivy.xml", "ivysettings.xml", "build.xml", "build.properties"],
+    "ant": ["ivy.xml", "ivysettings.xml", "build.xml", "build.properties"],
+}
+MODULE_BUILD_FILES = {
+    "maven": ["pom.xml"],
+    "gradle": ["build.gradle", "build.gradle.kts", "gradle.lockfile"],
+}
+FINGERPRINT_ENV = ["JAVA_HOME", "MAVEN_OPTS", "MAVEN_ARGS", "GRADLE_OPTS", "GRADLE_USER_HOME"]
+TOOL_EXECUTABLES = {"maven": "mvn", "gradle": "gradle", "ivy": "ant", "ant": "ant"}
+CACHE_VERSION = 1
 
-    if tool == "maven":
-        return maven_test_deps_classpath(project_dir)
-    elif tool == "gradle":
-        return gradle_test_deps_classpath(project_dir)
-    elif tool in ("ivy", "ant"):
-        return ivy_test_deps_classpath(project_dir)
+
+def cache_enabled() -> bool:
+    return os.getenv("CLASSPATH_CACHE", "1").lower() not in ("0", "false", "no", "off")
+
+
+def cache_dir() -> Path:
+    override = os.getenv("CLASSPATH_CACHE_DIR")
+    if override:
+        return Path(override)
+    base = os.getenv("XDG_CACHE_HOME") or str(Path.home() / ".cache")
+    return Path(base) / "coverage-guided-concolic-pipeline" / "classpath"
+
+
+def cache_path(project_dir: Path, scope: str, target_class: str = None) -> Path:
+    # Multi-module builds resolve only the target's modules, so the target
+    # is part of the key.
+    key = hashlib.sha256(f"{project_dir}\0{target_class or ''}".encode()).hexdigest()[:16]
+    return cache_dir() / f"{project_dir.name}-{key}.{scope}.json"
+
+
+def _maven_module_dirs(project_dir: Path):
+    """The project directory plus every directory reachable through <modules>,
+    in declaration order."""
+    seen = []
+    stack = [project_dir]
+    while stack:
+        module_dir = stack.pop()
+        if module_dir in seen or not (module_dir / "pom.xml").exists():
+            continue
+        seen.append(module_dir)
+        try:
+            root = ET.parse(module_dir / "pom.xml").getroot()
+        except ET.ParseError:
+            continue  # the fingerprint still covers the file's bytes
+        children = [(module_dir / element.text.strip()).resolve() for element in root.iter()
+                    if element.tag.rsplit("}", 1)[-1] == "module" and element.text]
+        stack.extend(reversed(children))
+    return seen
+
+
+class UnfingerprintableBuild(Exception):
+    """The build reads inputs that cannot be enumerated statically."""
+
+
+GRADLE_SCRIPT_SUFFIXES = (".gradle", ".gradle.kts")
+# Directories under buildSrc/ that hold outputs, not inputs.
+GRADLE_OUTPUT_DIRS = {"build", ".gradle", "out", ".idea"}
+GRADLE_STRING = re.compile(r"""["']([^"']*)["']""")
+# include ':a', ':b:c'  /  include(":a",\n    ":b")  /  includeFlat 'sibling'
+GRADLE_INCLUDE = re.compile(
+    r"""(?<![\w.\-'"])(include|includeFlat)(?![\w\-])\s*\(?((?:\s*["'][^"']*["']\s*,?)*)""")
+# project(':x').projectDir = file('dir')  /  ... = new File(settingsDir, 'dir')
+GRADLE_PROJECT_DIR = re.compile(
+    r"""project\(\s*["']:?([^"'$]+)["']\s*\)\.projectDir\s*=\s*"""
+    r"""(?:file\s*\(|new\s+File\s*\(\s*(?:settingsDir|rootDir)\s*,)\s*["']([^"'$]+)["']\s*\)""")
+GRADLE_INCLUDE_BUILD = re.compile(r"""\bincludeBuild\s*\(?\s*["']([^"'$]+)["']""")
+# apply from: 'gradle/x.gradle'  /  apply(from = "$rootDir/gradle/x.gradle.kts")
+GRADLE_APPLY_FROM = re.compile(
+    r"""\bapply\s*\(?\s*from\s*[:=]\s*(?:(?:rootProject\.)?file\s*\(\s*)?["']([^"']+)["']""")
+GRADLE_ROOT_DIR_PREFIX = re.compile(r"^\$\{?(?:rootDir|rootProject\.projectDir)\}?/")
+
+
+def _strip_gradle_comments(text: str) -> str:
+    text = re.sub(r"/\*.*?\*/", "", text, flags=re.S)
+    return re.sub(r"(?m)(^|\s)//.*$", r"\1", text)
+
+
+def _tree_files(root: Path):
+    files = []
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames[:] = sorted(d for d in dirnames if d not in GRADLE_OUTPUT_DIRS)
+        files += [Path(dirpath) / name for name in sorted(filenames)]
+    return files
+
+
+def _gradle_settings(build_dir: Path):
+    """Subproject directories and included builds declared by the settings
+    script of ``build_dir``."""
+    module_dirs, included = [build_dir], []
+    for name in ("settings.gradle", "settings.gradle.kts"):
+        settings = build_dir / name
+        if not settings.exists():
+            continue
+        text = _strip_gradle_comments(settings.read_text(errors="replace"))
+
+        project_dirs = {path.replace(":", "/"): build_dir / directory
+                        for path, directory in GRADLE_PROJECT_DIR.findall(text)}
+        if len(project_dirs) != len(re.findall(r"\.projectDir\s*=", text)):
+            raise UnfingerprintableBuild(f"computed projectDir in {settings}")
+
+        for kind, args in GRADLE_INCLUDE.findall(text):
+            paths = GRADLE_STRING.findall(args)
+            if not paths or any("$" in path for path in paths):
+                raise UnfingerprintableBuild(f"computed {kind} in {settings}")
+            for path in paths:
+                path = path.lstrip(":").replace(":", "/")
+                if path in project_dirs:
+                    module_dirs.append(project_dirs[path])
+                elif kind == "includeFlat":
+                    module_dirs.append(build_dir.parent / path)
+                else:
+                    module_dirs.append(build_dir / path)
+
+        builds = GRADLE_INCLUDE_BUILD.findall(text)
+        if len(builds) != len(re.findall(r"\bincludeBuild\b", text)):
+            raise UnfingerprintableBuild(f"computed includeBuild in {settings}")
+        included += [(build_dir / path).resolve() for path in builds]
+    return module_dirs, included
+
+
+def _gradle_applied_scripts(script: Path, build_dir: Path):
+    text = _strip_gradle_comments(script.read_text(errors="replace"))
+    targets = GRADLE_APPLY_FROM.findall(text)
+    if len(targets) != len(re.findall(r"\bapply\s*\(?\s*from\b", text)):
+        raise UnfingerprintableBuild(f"computed apply from in {script}")
+    applied = []
+    for target in targets:
+        target, rooted = GRADLE_ROOT_DIR_PREFIX.subn("", target)
+        target = re.sub(r"^\$\{?projectDir\}?/", "", target)
+        if "$" in target or "://" in target:
+            raise UnfingerprintableBuild(f"apply from '{target}' in {script}")
+        applied.append(((build_dir if rooted else script.parent) / target).resolve())
+    return applied
+
+
+def _gradle_build_files(project_dir: Path):
+    """Every file the configuration phase of a Gradle build reads, as far as
+    it can be told without running Gradle: settings and properties, the
+    build scripts of `include`d subprojects (honouring projectDir
+    overrides), scripts pulled in with `apply from:`, everything under
+    buildSrc/, and the same for each `includeBuild`. Raises
+    UnfingerprintableBuild when any of these is computed at configuration
+    time."""
+    files = []
+    builds, seen_builds = deque([project_dir.resolve()]), set()
+    while builds:
+        build_dir = builds.popleft()
+        if build_dir in seen_builds:
+            continue
+        seen_builds.add(build_dir)
+        files += [build_dir / name for name in FINGERPRINT_FILES["gradle"]]
+        files += sorted((build_dir / "gradle" / "dependency-locks").glob("*.lockfile"))
+        files += _tree_files(build_dir / "buildSrc")
+
+        module_dirs, included = _gradle_settings(build_dir)
+        builds.extend(included)
+        scripts = deque(build_dir / name for name in ("settings.gradle", "settings.gradle.kts"))
+        for module_dir in module_dirs:
+            files += [module_dir / name for name in MODULE_BUILD_FILES["gradle"]]
+            scripts += [module_dir / name for name in MODULE_BUILD_FILES["gradle"]
+                        if name.endswith(GRADLE_SCRIPT_SUFFIXES)]
+        seen_scripts = set()
+        while scripts:
+            script = scripts.popleft()
+            if script in seen_scripts or not script.is_file():
+                continue
+            seen_scripts.add(script)
+            applied = _gradle_applied_scripts(script, build_dir)
+            files += applied
+            scripts += applied
+    return files
+
+
+def _maven_parent_poms(project_dir: Path):
+    """POMs of the <relativePath> parent chain above ``project_dir`` (the SUT
+    may be one module of a larger build)."""
+    parents = []
+    pom = project_dir / "pom.xml"
+    while len(parents) < 50:
+        try:
+            root = ET.parse(pom).getroot()
+        except (OSError, ET.ParseError):
+            break
+        parent = next((e for e in root if isinstance(e.tag, str) and e.tag.rsplit("}", 1)[-1] == "parent"), None)
+        if parent is None:
+            break
+        relative = next((e.text for e in parent
+                         if isinstance(e.tag, str) and e.tag.rsplit("}", 1)[-1] == "relativePath"), None)
+        candidate = pom.parent / (relative.strip() if relative is not None else "../pom.xml")
+        if candidate.is_dir():
+            candidate = candidate / "pom.xml"
+        candidate = candidate.resolve()
+        if not candidate.is_file() or candidate in parents:
+            break
+        parents.append(candidate)
+        pom = candidate
+    return parents
+
+
+def _file_digests(paths):
+    digests = {}
+    for path in paths:
+        try:
+            digests[str(path)] = hashlib.sha256(Path(path).read_bytes()).hexdigest()
+        except OSError:
+            continue
+    return digests
+
+
+def _inputs_unchanged(digests) -> bool:
+    return _file_digests(digests) == digests
+
+
+def build_fingerprint(project_dir: Path, tool: str) -> str:
+    h = hashlib.sha256()
+    h.update(f"v{CACHE_VERSION}:{tool}\0".encode())
+
+    if tool == "gradle":
+        files = _gradle_build_files(project_dir)
     else:
-        raise RuntimeError("Unsupported build tool")
+        files = [project_dir / name for name in FINGERPRINT_FILES.get(tool, [])]
+    if tool == "maven":
+        for module_dir in _maven_module_dirs(project_dir):
+            files += [module_dir / name for name in MODULE_BUILD_FILES[tool]]
+        files += _maven_parent_poms(project_dir)
+        files.append(Path.home() / ".m2" / "settings.xml")
 
+    for path in files:
+        try:
+            data = path.read_bytes()
+        except OSError:
+            continue
+        h.update(f"{path}\0".encode())
+        h.update(hashlib.sha256(data).digest())
 
-def detect_runtime_deps_classpath(project_dir_str: str):
+    # The resolved executable stands in for the tool version: version
+    # managers and package managers install each version under its own path.
+    executable = shutil.which(TOOL_EXECUTABLES.get(tool, tool))
+    if executable:
+        real = os.path.realpath(executable)
+        st = os.stat(real)
+        h.update(f"{real}\0{st.st_size}\0{st.st_mtime_ns}\0".encode())
+    for var in FINGERPRINT_ENV:
+        h.update(f"{var}={os.getenv(var, '')}\0".encode())
+    return h.hexdigest()
+
+
+def _classpath_stats(classpath: str):
+    stats = {}
+    for entry in filter(None, classpath.split(":")):
+        try:
+            st = os.stat(entry)
+        except OSError:
+            continue  # the build tool reported it; don't make it a permanent miss
+        stats[entry] = None if os.path.isdir(entry) else [st.st_size, st.st_mtime_ns]
+    return stats
+
+
+def _classpath_still_valid(stats) -> bool:
+    for entry, expected in stats.items():
+        try:
+            st = os.stat(entry)
+        except OSError:
+            return False
+        if expected is not None and [st.st_size, st.st_mtime_ns] != expected:
+            return False
+    return True
+
+
+def read_cached_classpath(project_dir: Path, scope: str, fingerprint: str, target_class: str = None):
+    try:
+        entry = json.loads(cache_path(project_dir, scope, target_class).read_text())
+    except (OSError, ValueError):
+        return None
+    if entry.get("version") != CACHE_VERSION or entry.get("fingerprint") != fingerprint:
+        return None
+    if not _classpath_still_valid(entry.get("stats", {})):
+        return None
+    if not _inputs_unchanged(entry.get("inputs", {})):
+        return None  # a parent/BOM POM read during resolution changed
+    return entry.get("classpath")
+
+
+def write_cached_classpath(project_dir: Path, scope: str, fingerprint: str, classpath: str,
+                           target_class: str = None, inputs=()):
+    path = cache_path(project_dir, scope, target_class)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    entry = {
+        "version": CACHE_VERSION,
+        "project_dir": str(project_dir),
+        "scope": scope,
+        "target_class": target_class,
+        "fingerprint": fingerprint,
+        "classpath": classpath,
+        "stats": _classpath_stats(classpath),
+        "inputs": _file_digests(sorted(inputs)),
+    }
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp.write_text(json.dumps(entry))
+        os.replace(tmp, path)
+    except OSError:  # read-only home: resolve again next time
+        tmp.unlink(missing_ok=True)
+
+
+def cached_classpaths(project_dir: Path, tool: str, resolve, target_class: str = None):
+    """``resolve(project_dir, target_class, inputs)`` (a ``{scope: classpath}``
+    dict) unless every scope has a still-valid cached result. Resolvers add
+    the build files they read beyond the fingerprint (parent and BOM POMs
+    from the local repository) to ``inputs``; they are re-checked by content
+    hash on every hit."""
+    if not cache_enabled():
+        return resolve(project_dir, target_class, None)
+    try:
+        fingerprint = build_fingerprint(project_dir, tool)
+    except UnfingerprintableBuild as e:
+        print(f"[classpath] not caching: {e}", file=sys.stderr)
+        return resolve(project_dir, target_class, None)
+    cps = {scope: read_cached_classpath(project_dir, scope, fingerprint, target_class)
+           for scope in SCOPES}
+    if all(cp is not None for cp in cps.values()):
+        print(f"[classpath] cached ({tool} build unchanged)", file=sys.stderr)
+        return cps
+    inputs = set()
+    cps = resolve(project_dir, target_class, inputs)
+    for scope, cp in cps.items():
+        write_cached_classpath(project_dir, scope, fingerprint, cp, target_class, inputs)
+    return cps
+
+
+# ============================================================
+# PUBLIC API
+# ============================================================
+
+RESOLVERS = {
+    "maven": maven_deps_classpaths,
+    "gradle": gradle_deps_classpaths,
+    "ivy": ivy_deps_classpaths,
+    "ant": ivy_deps_classpaths,
+}
+
+
+def detect_deps_classpaths(project_dir_str: str, target_class: str = None):
+    """Runtime and test dependency classpaths from one build tool run:
+    ``{"runtime": cp, "test": cp}``. In a multi-module build, only the
+    modules containing ``target_class`` (all modules without one)."""
     project_dir = Path(project_dir_str).resolve()
     tool = detect_build_tool(project_dir)
-
-    if tool == "maven":
-        return maven_runtime_deps_classpath(project_dir)
-    elif tool == "gradle":
-        return gradle_runtime_deps_classpath(project_dir)
-    elif tool in ("ivy", "ant"):
-        return ivy_runtime_deps_classpath(project_dir)
-    else:
+    if tool not in RESOLVERS:
         raise RuntimeError("Unsupported build tool")
+    return cached_classpaths(project_dir, tool, RESOLVERS[tool], target_class)
+
+
+def detect_test_deps_classpath(project_dir_str: str):
+    return detect_deps_classpaths(project_dir_str)["test"]
+
+
+def detect_runtime_deps_classpath(project_dir_str: str):
+    return detect_deps_classpaths(project_dir_str)["runtime"]
 
 
 # ============================================================
@@ -230,14 +1318,14 @@ def detect_runtime_deps_classpath(project_dir_str: str):
 if __name__ == "__main__":
     if len(sys.argv) < 2:
         print("Usage:")
-        print("  detect_classpath.py <project_dir>")
+        print("  detect_classpath.py <project_dir> [<target_class>]")
         sys.exit(1)
 
     project_dir = sys.argv[1]
+    target_class = sys.argv[2] if len(sys.argv) > 2 else None
 
-    runtime_cp = detect_runtime_deps_classpath(project_dir)
-    test_cp = detect_test_deps_classpath(project_dir)
+    cps = detect_deps_classpaths(project_dir, target_class)
     print("=== RUNTIME DEPENDENCIES ===")
-    print(runtime_cp)
+    print(cps["runtime"])
     print("\n=== TEST DEPENDENCIES ===")
-    print(test_cp)
+    print(cps["test"])
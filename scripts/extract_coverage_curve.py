@@ -0,0 +1,172 @@
+# Copyright (c) 2025-2026 Yoran Mertens
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+#!/usr/bin/env python3
+
+"""
+Extract a ``coverage-curve.tsv`` from JPF / covet-engine output.
+
+With a coverage tracker, covet-engine logs one line on the ``jdart.evaluation``
+logger every time branch coverage changes::
+
+    [INFO] jdart.evaluation - elapsed=1234ms branch_coverage=56.7%
+
+This script streams JPF stdout or saved log files, which may be several GB
+and gzip- or zstd-compressed, and writes every such line as one TSV row::
+
+    path_index  elapsed_ms  branch_coverage  path_type
+
+which is the input of ``plot_coverage_curve.py``. Memory use is constant:
+input is read line by line and each row is written as soon as it is parsed.
+Lines are matched on bytes; the regex only runs on lines that contain
+``branch_coverage=``, so non-evaluation output costs a substring search.
+
+``path_type`` is taken from a ``path_type=...`` field when the line has one
+and is ``OK`` otherwise (the logger only fires on new coverage).
+
+Usage::
+
+    python3 scripts/extract_coverage_curve.py <log> [<log2> ...] [-o coverage-curve.tsv]
+    <jpf command> 2>&1 | python3 scripts/extract_coverage_curve.py - \\
+        -o coverage-curve.tsv --passthrough
+
+``-`` (or no input) reads stdin. ``--passthrough`` copies every input line to
+stdout, so the extractor can sit in a pipe without hiding the JPF output.
+Files ending in ``.gz`` are decompressed with ``gzip``, ``.zst`` with the
+optional ``zstandard`` package.
+"""
+
+import argparse
+import gzip
+import io
+import re
+import sys
+from pathlib import Path
+
+TSV_HEADER = "path_index\telapsed_ms\tbranch_coverage\tpath_type\n"
+
+_MARKER = b"branch_coverage="
+EVALUATION_LINE = re.compile(
+    rb"elapsed=(?P<elapsed>\d+)ms\s+branch_coverage=(?P<coverage>[0-9.]+)%"
+    rb"(?:.*?\bpath_type=(?P<path_type>\w+))?"
+)
+
+
+def parse_evaluation_line(line: bytes):
+    """``(elapsed_ms, branch_coverage, path_type)`` for a jdart.evaluation
+    line, ``None`` for any other line."""
+    if _MARKER not in line:
+        return None
+    m = EVALUATION_LINE.search(line)
+    if m is None:
+        return None
+    path_type = m["path_type"]
+    return int(m["elapsed"]), float(m["coverage"]), path_type.decode() if path_type else "OK"
+
+
+def open_input(name: str):
+    """Binary stream for ``name``: stdin for ``-``, decompressed by suffix."""
+    if name == "-":
+        return sys.stdin.buffer
+    path = Path(name)
+    if path.suffix == ".gz":
+        return gzip.open(path, "rb")
+    if path.suffix == ".zst":
+        try:
+            import zstandard
+        except ImportError:
+            sys.stderr.write(
+                "zstandard is required to read .zst logs. Install with:\n"
+                "  pip install zstandard\n"
+                "or decompress first: zstd -dc LOG | extract_coverage_curve.py -\n"
+            )
+            sys.exit(2)
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(path.open("rb")))
+    return path.open("rb")
+
+
+def extract(streams, out, passthrough=None) -> int:
+    """Write a TSV row to ``out`` for every evaluation line in ``streams``.
+
+    ``path_index`` continues across streams. Returns the number of rows.
+    """
+    out.write(TSV_HEADER)
+    out.flush()
+    rows = 0
+    for stream in streams:
+        for line in stream:
+            if passthrough is not None:
+                passthrough.write(line)
+                # A piped stdout is block-buffered; flush so the JPF log
+                # stays live in the terminal / docker logs.
+                passthrough.flush()
+            sample = parse_evaluation_line(line)
+            if sample is None:
+                continue
+            rows += 1
+            elapsed, coverage, path_type = sample
+            out.write(f"{rows}\t{elapsed}\t{coverage}\t{path_type}\n")
+            # Flushed per row so plot_coverage_curve.py --follow sees it live
+            # (the passthrough copy above is flushed per line likewise).
+            out.flush()
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Extract coverage-curve.tsv from jdart.evaluation log lines."
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="*",
+        default=["-"],
+        help="JPF logs (.gz / .zst are decompressed). '-' or nothing reads stdin.",
+    )
+    parser.add_argument(
+        "-o",
+        "--output",
+        type=Path,
+        default=None,
+        help="TSV to write. Default: stdout (not allowed with --passthrough).",
+    )
+    parser.add_argument(
+        "--passthrough",
+        action="store_true",
+        help="Copy every input line to stdout, e.g. to keep JPF output visible "
+        "when piping it through this script.",
+    )
+    args = parser.parse_args()
+
+    if args.passthrough and args.output is None:
+        parser.error("--passthrough needs -o/--output (stdout carries the log)")
+
+    out = sys.stdout if args.output is None else args.output.open("w", encoding="utf-8")
+    passthrough = sys.stdout.buffer if args.passthrough else None
+    try:
+        rows = extract((open_input(name) for name in args.inputs), out, passthrough)
+    finally:
+        if args.output is not None:
+            out.close()
+    if args.output is not None:
+        sys.stderr.write(f"[extract] wrote {rows} samples to {args.output}\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -25,7 +25,7 @@ import os
 from pathlib import Path
 import yaml
 
-from detect_deps_classpath import detect_build_tool, detect_runtime_deps_classpath, detect_test_deps_classpath, deps_dir_from_build_tool
+from detect_deps_classpath import detect_build_tool, detect_deps_classpaths, deps_dir_from_build_tool
 from rewrite_classpath import rewrite_classpath
 from generate_deps_compose import generate_deps_compose
 from covet_format_classpath import covet_format_classpath
@@ -113,11 +113,35 @@ if has_potentially_runtime_deps or has_potentially_test_deps:
     generate_deps_compose(deps_dir, container_deps_dir)
 
 
+container_sut_dir = os.getenv("CONTAINER_SUT_DIR")
+if not container_sut_dir:
+    raise RuntimeError("CONTAINER_SUT_DIR not set in container.env")
+
+
+def rewrite_detected_classpath(classpath):
+    # Multi-module builds also put sibling modules' class directories on the
+    # classpath; those live in the SUT mount rather than the deps mount.
+    sut_root = str(Path(sut_dir).resolve())
+    entries = []
+    for entry in filter(None, classpath.split(":")):
+        in_deps_dir = entry == deps_dir or entry.startswith(deps_dir.rstrip("/") + "/")
+        if not in_deps_dir and entry.startswith(sut_root + "/"):
+            entries.append(rewrite_classpath(sut_root, container_sut_dir, entry))
+        else:
+            entries.append(rewrite_classpath(deps_dir, container_deps_dir, entry))
+    return ":".join(entries)
+
+
+# Auto-detect the classpaths; one build tool run yields both scopes, and
+# multi-module builds are narrowed to the target class' modules.
+detected_cps = {}
+if test_deps_classpath is None:
+    detected_cps = detect_deps_classpaths(sut_dir, target_class=cls)
+
 runtime_deps_cp = None
 # Auto-detect classpath
 if test_deps_classpath is None:
-    raw_runtime_cp = detect_runtime_deps_classpath(sut_dir) if test_deps_classpath is None else test_deps_classpath
-    runtime_deps_cp = rewrite_classpath(deps_dir, container_deps_dir, raw_runtime_cp)
+    runtime_deps_cp = rewrite_detected_classpath(detected_cps["runtime"])
 # test_deps_classpath override, and it's not empty
 elif test_deps_classpath != "":
     runtime_deps_cp = rewrite_classpath(deps_dir, container_deps_dir, test_deps_classpath)
@@ -127,8 +151,7 @@ has_runtime_deps = runtime_deps_cp is not None
 test_deps_cp = None
 # Auto-detect classpath
 if test_deps_classpath is None:
-    raw_test_cp = detect_test_deps_classpath(sut_dir) if test_deps_classpath is None else test_deps_classpath
-    test_deps_cp = rewrite_classpath(deps_dir, container_deps_dir, raw_test_cp)
+    test_deps_cp = rewrite_detected_classpath(detected_cps["test"])
 # test_deps_classpath override, and it's not empty
 elif test_deps_classpath != "":
     test_deps_cp = rewrite_classpath(deps_dir, container_deps_dir, test_deps_classpath)
@@ -138,10 +161,6 @@ has_test_deps = test_deps_cp is not None
 # -------------------------------
 # Set the compiled (test) root to absolute paths in container
 # -------------------------------
-container_sut_dir = os.getenv("CONTAINER_SUT_DIR")
-if not container_sut_dir:
-    raise RuntimeError("CONTAINER_SUT_DIR not set in container.env")
-
 
 compiled_root = f"{container_sut_dir}/{compiled_root}"
 test_root = f"{container_sut_dir}/{test_root}"
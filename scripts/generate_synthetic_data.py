@@ -0,0 +1,360 @@
+# Copyright (c) 2025-2026 Yoran Mertens
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+#!/usr/bin/env python3
+
+"""
+Generate synthetic, schema-valid pipeline artifacts at configurable sizes.
+
+Real SUTs big enough to stress the analysis tooling are rare, so this writes
+the three inputs it consumes:
+
+* ``<out>/blockmaps/icfg_block_map.json`` — the ``GenerateBlockMap`` schema
+  (``methodBlockMaps`` -> ``blocks`` -> ``coverageData`` / ``edges``),
+* ``<out>/coverage/coverage_data.json`` — the ``CoverageExportMain`` schema
+  (``classes`` -> ``methods`` -> ``lines`` with ``jumps`` / ``switches``),
+  consistent with the block map's lines,
+* ``coverage-curve.tsv`` — ``path_index  elapsed_ms  branch_coverage
+  path_type``, as read by ``plot_coverage_curve.py``.
+
+The block map layout matches what ``analyze_block_map.py --batch`` expects
+(``find_coverage_data``). Both JSON files are written one method at a time:
+every method is generated from its own seeded RNG, so the coverage data can
+regenerate the same lines without keeping the block map in memory, and
+10^7-edge maps need no more RAM than 10^3-edge ones.
+
+Line numbers restart per class, as they do per source file, so methods of
+different classes share line numbers and reproduce the ``lineToCoverageMap``
+collisions analyzed in section 14.
+
+Usage::
+
+    python3 scripts/generate_synthetic_data.py block-map <out_dir> \\
+        [--methods N] [--blocks-per-method N] [--classes N] \\
+        [--edge-mix if=5,switch=1,goto=2,none=2] [--minus1-ratio R] [--seed S]
+
+    python3 scripts/generate_synthetic_data.py curve <out.tsv> \\
+        [--samples N] [--duration-ms MS] [--seed S]
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+EDGE_KINDS = ("if", "switch", "goto", "none")
+
+# Edges produced per block of each kind (switch: SWITCH_CASE x3 + SWITCH_DEFAULT).
+EDGES_PER_KIND = {"if": 2, "switch": 4, "goto": 1, "none": 0}
+
+SWITCH_CASES = 3
+
+
+def parse_edge_mix(spec: str) -> Dict[str, float]:
+    """Parse ``"if=5,switch=1,goto=2,none=2"`` into normalised weights."""
+    weights = {kind: 0.0 for kind in EDGE_KINDS}
+    for part in spec.split(","):
+        kind, _, weight = part.partition("=")
+        kind = kind.strip()
+        if kind not in weights:
+            raise ValueError(f"unknown edge kind {kind!r}; expected one of {EDGE_KINDS}")
+        weights[kind] = float(weight)
+    total = sum(weights.values())
+    if total <= 0:
+        raise ValueError(f"edge mix {spec!r} has no positive weight")
+    return {kind: w / total for kind, w in weights.items()}
+
+
+@dataclass(frozen=True)
+class BlockMapSpec:
+    methods: int = 1000
+    blocks_per_method: int = 8
+    classes: int = 50
+    edge_mix: Tuple[Tuple[str, float], ...] = tuple(parse_edge_mix("if=5,switch=1,goto=2,none=2").items())
+    minus1_ratio: float = 0.2
+    max_lines_per_block: int = 3
+    seed: int = 0
+
+    @property
+    def edges_per_block(self) -> float:
+        """Expected number of edges per block under ``edge_mix``."""
+        return sum(EDGES_PER_KIND[kind] * w for kind, w in self.edge_mix)
+
+    @classmethod
+    def for_edges(cls, edges: int, **kwargs) -> "BlockMapSpec":
+        """Spec whose block map has approximately ``edges`` edges."""
+        spec = cls(**kwargs)
+        per_method = spec.blocks_per_method * spec.edges_per_block
+        methods = max(1, round(edges / per_method))
+        return cls(**{**kwargs, "methods": methods})
+
+    def class_name(self, method: int) -> str:
+        return f"synthetic.pkg{method % self.classes % 10}.C{method % self.classes}"
+
+    def method_name(self, method: int) -> str:
+        return f"m{method}"
+
+
+def generate_method(spec: BlockMapSpec, method: int) -> Tuple[dict, List[dict]]:
+    """Return ``(method block map, coverage lines)`` for method number ``method``."""
+    rng = random.Random(spec.seed * 1_000_003 + method)
+    kinds = [kind for kind, _ in spec.edge_mix]
+    weights = [w for _, w in spec.edge_mix]
+
+    # Methods of one class are laid out one after the other in its source file.
+    line = 10 + (method // spec.classes) * spec.blocks_per_method * (spec.max_lines_per_block + 1)
+
+    blocks = []
+    coverage_lines = []
+    for block_id in range(spec.blocks_per_method):
+        executed = rng.random() < 0.7
+        lines = []
+        for _ in range(rng.randint(0, spec.max_lines_per_block)):
+            line += 1
+            lines.append({
+                "line": line,
+                "hits": rng.randint(1, 20) if executed else 0,
+                "branches": {"total": 0, "covered": 0},
+            })
+
+        kind = rng.choices(kinds, weights)[0]
+        edges = []
+        if kind == "if":
+            true_hits = rng.randint(0, 10) if executed else 0
+            false_hits = rng.randint(0, 10) if executed else 0
+            if lines:
+                lines[-1]["jumps"] = [{"index": 0, "trueHits": true_hits, "falseHits": false_hits}]
+                lines[-1]["branches"] = {
+                    "total": 2,
+                    "covered": (true_hits > 0) + (false_hits > 0),
+                }
+            for branch_type, branch_index, hits in (
+                ("IF_TRUE", 0, true_hits), ("IF_FALSE", 1, false_hits)
+            ):
+                edges.append({
+                    "branchType": branch_type,
+                    "branchIndex": branch_index,
+                    "hits": -1 if rng.random() < spec.minus1_ratio else hits,
+                    "targetBlockId": min(block_id + 1 + branch_index, spec.blocks_per_method - 1),
+                })
+        elif kind == "switch":
+            case_hits = [rng.randint(0, 5) if executed else 0 for _ in range(SWITCH_CASES)]
+            default_hits = rng.randint(0, 5) if executed else 0
+            if lines:
+                lines[-1]["switches"] = [{
+                    "index": 0,
+                    "keys": list(range(SWITCH_CASES)),
+                    "hits": case_hits,
+                    "defaultHits": default_hits,
+                }]
+                lines[-1]["branches"] = {
+                    "total": SWITCH_CASES + 1,
+                    "covered": sum(h > 0 for h in case_hits) + (default_hits > 0),
+                }
+            for index, hits in enumerate(case_hits + [default_hits]):
+                edges.append({
+                    "branchType": "SWITCH_CASE" if index < SWITCH_CASES else "SWITCH_DEFAULT",
+                    "branchIndex": index,
+                    "hits": -1 if rng.random() < spec.minus1_ratio else hits,
+                    "targetBlockId": min(block_id + 1 + index, spec.blocks_per_method - 1),
+                })
+        elif kind == "goto":
+            edges.append({
+                "branchType": "GOTO",
+                "branchIndex": -1,
+                "hits": rng.randint(1, 10) if executed else 0,
+                "targetBlockId": min(block_id + 1, spec.blocks_per_method - 1),
+            })
+
+        hit_lines = sum(1 for entry in lines if entry["hits"] > 0)
+        if not lines or hit_lines == 0:
+            state = "NOT_COVERED"
+        elif hit_lines == len(lines) and all(e["hits"] != 0 for e in edges):
+            state = "COVERED"
+        else:
+            state = "PARTIALLY_COVERED"
+
+        blocks.append({
+            "id": block_id,
+            "coverageData": {"coverageState": state, "lines": lines},
+            "edges": edges,
+        })
+        coverage_lines.extend(lines)
+
+    method_map = {
+        "fullName": f"<{spec.class_name(method)}: int {spec.method_name(method)}(int)>",
+        "blocks": blocks,
+    }
+    return method_map, coverage_lines
+
+
+def write_block_map(path: Path, spec: BlockMapSpec) -> int:
+    """Write the block map for ``spec`` to ``path``; return its edge count."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    edges = 0
+    with path.open("w", encoding="utf-8") as f:
+        f.write('{\n  "entryMethod": ')
+        f.write(json.dumps(f"<{spec.class_name(0)}: int {spec.method_name(0)}(int)>"))
+        f.write(',\n  "methodBlockMaps": [')
+        for method in range(spec.methods):
+            method_map, _ = generate_method(spec, method)
+            edges += sum(len(block["edges"]) for block in method_map["blocks"])
+            f.write("\n    " if method == 0 else ",\n    ")
+            f.write(json.dumps(method_map))
+        f.write("\n  ]\n}\n")
+    return edges
+
+
+def write_coverage_data(path: Path, spec: BlockMapSpec) -> None:
+    """Write the coverage_data.json matching :func:`write_block_map`'s lines."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open("w", encoding="utf-8") as f:
+        f.write('{\n  "classes": [')
+        for index in range(min(spec.classes, spec.methods)):
+            f.write("\n    " if index == 0 else ",\n    ")
+            f.write('{"name": ')
+            f.write(json.dumps(spec.class_name(index)))
+            f.write(', "methods": [')
+            for n, method in enumerate(range(index, spec.methods, spec.classes)):
+                _, lines = generate_method(spec, method)
+                if n:
+                    f.write(", ")
+                f.write(json.dumps({
+                    "methodSignature": f"{spec.method_name(method)}(I)I",
+                    "lines": lines,
+                }))
+            f.write("]}")
+        f.write("\n  ]\n}\n")
+
+
+def write_sut(out_dir: Path, spec: BlockMapSpec) -> Tuple[Path, Path, int]:
+    """Write block map + coverage data under ``out_dir`` in the pipeline layout.
+
+    Returns ``(block map path, coverage data path, edge count)``.
+    """
+    block_map = out_dir / "blockmaps" / "icfg_block_map.json"
+    coverage_data = out_dir / "coverage" / "coverage_data.json"
+    edges = write_block_map(block_map, spec)
+    write_coverage_data(coverage_data, spec)
+    return block_map, coverage_data, edges
+
+
+def write_coverage_curve(path: Path, samples: int, duration_ms: int = 60_000, seed: int = 0) -> None:
+    """Write a ``coverage-curve.tsv`` with ``samples`` rows.
+
+    Coverage climbs quickly and plateaus, like a real run: a path is ``OK``
+    (new coverage) with a probability that decays over time; otherwise it is
+    mostly ``IGNORE``, with occasional ``DONT_KNOW`` / ``ERROR``.
+    """
+    rng = random.Random(seed)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    coverage = rng.uniform(20.0, 50.0)
+    ceiling = rng.uniform(max(coverage, 70.0), 100.0)
+    start_ms = rng.randint(500, 3000)
+    with path.open("w", encoding="utf-8") as f:
+        f.write("path_index\telapsed_ms\tbranch_coverage\tpath_type\n")
+        for i in range(samples):
+            progress = i / max(samples - 1, 1)
+            elapsed = start_ms + round(progress * (duration_ms - start_ms))
+            if rng.random() < 0.5 * (1.0 - progress) ** 3 and coverage < ceiling:
+                coverage = min(ceiling, coverage + rng.uniform(0.05, 2.0))
+                path_type = "OK"
+            else:
+                path_type = rng.choices(["IGNORE", "DONT_KNOW", "ERROR"], [90, 7, 3])[0]
+            f.write(f"{i + 1}\t{elapsed}\t{coverage:.2f}\t{path_type}\n")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Generate synthetic block maps, coverage data and coverage curves."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    bm = sub.add_parser("block-map", help="Write <out>/blockmaps and <out>/coverage.")
+    bm.add_argument("out_dir", type=Path)
+    bm.add_argument("--methods", type=int, default=BlockMapSpec.methods)
+    bm.add_argument(
+        "--edges",
+        type=int,
+        default=None,
+        help="Target edge count; overrides --methods.",
+    )
+    bm.add_argument("--blocks-per-method", type=int, default=BlockMapSpec.blocks_per_method)
+    bm.add_argument(
+        "--classes",
+        type=int,
+        default=BlockMapSpec.classes,
+        help="Number of classes; methods of different classes share line numbers. "
+        f"Default: {BlockMapSpec.classes}.",
+    )
+    bm.add_argument(
+        "--edge-mix",
+        default="if=5,switch=1,goto=2,none=2",
+        help="Relative weights of block kinds (if, switch, goto, none). "
+        "Default: if=5,switch=1,goto=2,none=2.",
+    )
+    bm.add_argument(
+        "--minus1-ratio",
+        type=float,
+        default=BlockMapSpec.minus1_ratio,
+        help="Fraction of IF/SWITCH edges written with hits=-1. "
+        f"Default: {BlockMapSpec.minus1_ratio}.",
+    )
+    bm.add_argument("--seed", type=int, default=0)
+
+    curve = sub.add_parser("curve", help="Write a coverage-curve.tsv.")
+    curve.add_argument("output", type=Path)
+    curve.add_argument("--samples", type=int, default=1000)
+    curve.add_argument("--duration-ms", type=int, default=60_000)
+    curve.add_argument("--seed", type=int, default=0)
+
+    args = parser.parse_args()
+
+    if args.command == "curve":
+        write_coverage_curve(args.output, args.samples, args.duration_ms, args.seed)
+        print(f"Wrote {args.samples} samples to {args.output}")
+        return
+
+    try:
+        edge_mix = tuple(parse_edge_mix(args.edge_mix).items())
+    except ValueError as e:
+        parser.error(str(e))
+    kwargs = dict(
+        blocks_per_method=args.blocks_per_method,
+        classes=args.classes,
+        edge_mix=edge_mix,
+        minus1_ratio=args.minus1_ratio,
+        seed=args.seed,
+    )
+    if args.edges is not None:
+        spec = BlockMapSpec.for_edges(args.edges, **kwargs)
+    else:
+        spec = BlockMapSpec(methods=args.methods, **kwargs)
+    block_map, coverage_data, edges = write_sut(args.out_dir, spec)
+    print(f"Wrote {spec.methods} methods / {edges} edges to {block_map}")
+    print(f"Wrote coverage data to {coverage_data}")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,314 @@
+# Copyright (c) 2025-2026 Yoran Mertens
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+#!/usr/bin/env python3
+
+"""
+Stop a covet-engine run once its branch coverage has plateaued.
+
+Many runs reach their final coverage within minutes and then spend the rest
+of the ``TimedOrBranchCoverageTermination`` budget on IGNORE paths. This
+sidecar tails the live ``coverage-curve.tsv`` (or a raw JPF log with
+``jdart.evaluation`` lines) while JDart runs, feeds every new sample to a
+:class:`PlateauDetector` and, when a plateau is detected, runs
+``--stop-command`` (``run_pipeline.sh`` uses it to interrupt the JPF
+process) and exits with status 0.
+
+A plateau is declared once the run is past ``--min-elapsed`` and any of
+the configured rules fires:
+
+* ``--max-paths N``: N consecutive paths without a coverage gain. Needs
+  one line per path (TSV rows or log lines with ``path_type=``); logs that
+  only report coverage changes only support the time-based rules;
+* ``--max-idle S``: S seconds of JDart time without a coverage gain. Live,
+  the time since the last sample is estimated from the wall clock, so a
+  run stuck in the solver still counts as idle;
+* ``--min-slope P --slope-window S``: coverage grew by less than P
+  percentage points per minute over the last S seconds (the marginal gain
+  of the AUC).
+
+Usage::
+
+    python3 scripts/plateau_controller.py output/coverage-curve.tsv \\
+        [--max-paths N] [--max-idle S] [--min-slope P --slope-window S] \\
+        [--min-elapsed S] [--interval S] [--stop-command CMD] [--reason-file F]
+    python3 scripts/plateau_controller.py --replay <tsv> [<tsv> ...] [rules...]
+
+``--replay`` runs the detector over finished curves instead and reports
+where each run would have stopped, the coverage it would have given up
+and the time it would have saved; use it to tune the rules on an archive
+before enabling them in the pipeline (``PLATEAU_ARGS`` in
+``run_pipeline.sh``).
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import time
+from collections import deque
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+
+from plot_coverage_curve import CurveTail, load_curve
+
+
+@dataclass(frozen=True)
+class PlateauRules:
+    max_paths: Optional[int] = None
+    max_idle_ms: Optional[int] = None
+    min_slope: Optional[float] = None  # percentage points per minute
+    slope_window_ms: Optional[int] = None
+    min_elapsed_ms: int = 0
+
+    @property
+    def empty(self) -> bool:
+        return self.max_paths is None and self.max_idle_ms is None and self.min_slope is None
+
+
+class PlateauDetector:
+    """Incremental plateau detection over (elapsed_ms, coverage) samples.
+
+    Only coverage *gains* are remembered (for the slope rule, just the ones
+    inside the trailing window), so memory stays constant however long the
+    run is.
+    """
+
+    def __init__(self, rules: PlateauRules):
+        self.rules = rules
+        self.best = 0.0
+        self.best_ms = 0
+        self.last_ms = 0
+        self.paths_since_gain = 0
+        # (elapsed_ms, best coverage from then on); the first entry is the
+        # coverage in force at the start of the trailing slope window.
+        self.gains = deque([(0, 0.0)])
+
+    def add(self, elapsed_ms: int, coverage: float) -> None:
+        self.last_ms = max(self.last_ms, elapsed_ms)
+        if coverage > self.best:
+            self.best = coverage
+            self.best_ms = elapsed_ms
+            self.paths_since_gain = 0
+            self.gains.append((elapsed_ms, coverage))
+        else:
+            self.paths_since_gain += 1
+
+    def idle_deadline_ms(self) -> Optional[int]:
+        """JDart time at which ``--max-idle`` fires unless coverage grows."""
+        if self.rules.max_idle_ms is None:
+            return None
+        return max(self.best_ms + self.rules.max_idle_ms, self.rules.min_elapsed_ms)
+
+    def slope(self, now_ms: int) -> Optional[float]:
+        """Coverage gain over the trailing window, in points per minute;
+        ``None`` until a full window has elapsed."""
+        window = self.rules.slope_window_ms
+        if window is None or now_ms < window:
+            return None
+        start = now_ms - window
+        while len(self.gains) > 1 and self.gains[1][0] <= start:
+            self.gains.popleft()
+        return (self.best - self.gains[0][1]) / (window / 60_000)
+
+    def check(self, now_ms: Optional[int] = None) -> Optional[str]:
+        """Reason string if the run has plateaued at ``now_ms`` (default: the
+        last sample), ``None`` otherwise."""
+        rules = self.rules
+        now = self.last_ms if now_ms is None else max(now_ms, self.last_ms)
+        if now < rules.min_elapsed_ms:
+            return None
+        if rules.max_paths is not None and self.paths_since_gain >= rules.max_paths:
+            return f"{self.paths_since_gain} paths without a coverage gain"
+        if rules.max_idle_ms is not None and now - self.best_ms >= rules.max_idle_ms:
+            return f"no coverage gain for {(now - self.best_ms) / 1000:.0f} s"
+        if rules.min_slope is not None:
+            slope = self.slope(now)
+            if slope is not None and slope < rules.min_slope:
+                return (f"coverage slope {slope:.3f} %/min over the last "
+                        f"{rules.slope_window_ms / 1000:.0f} s")
+        return None
+
+
+# ================================================================
+# REPLAY
+# ================================================================
+
+@dataclass
+class ReplayResult:
+    label: str
+    stop_ms: Optional[int]
+    reason: Optional[str]
+    coverage_at_stop: float
+    final_coverage: float
+    end_ms: int
+
+
+def replay(times_ms, coverage, rules: PlateauRules, label: str) -> ReplayResult:
+    """Where the detector would have stopped a finished run. Rules are
+    evaluated at every sample, and the idle rule also between samples."""
+    detector = PlateauDetector(rules)
+    end_ms = int(times_ms[-1])
+    for t, c in zip(times_ms[1:].tolist(), coverage[1:].tolist()):
+        deadline = detector.idle_deadline_ms()
+        if deadline is not None and deadline < t:
+            return ReplayResult(label, deadline, detector.check(deadline), detector.best,
+                                float(coverage[-1]), end_ms)
+        detector.add(t, c)
+        reason = detector.check(t)
+        if reason is not None:
+            return ReplayResult(label, t, reason, detector.best, float(coverage[-1]), end_ms)
+    deadline = detector.idle_deadline_ms()
+    if deadline is not None and deadline <= end_ms:
+        return ReplayResult(label, deadline, detector.check(deadline), detector.best,
+                            float(coverage[-1]), end_ms)
+    return ReplayResult(label, None, None, detector.best, float(coverage[-1]), end_ms)
+
+
+def print_replay(results: List[ReplayResult]) -> None:
+    header = (
+        f"{'label':<30}  {'stop (ms)':>10}  {'end (ms)':>10}  {'saved %':>8}  "
+        f"{'cov@stop':>8}  {'final %':>8}  {'lost':>6}  reason"
+    )
+    print(header)
+    print("-" * len(header))
+    saved = lost = 0.0
+    for r in results:
+        if r.stop_ms is None:
+            print(f"{r.label:<30}  {'-':>10}  {r.end_ms:>10d}  {0.0:>8.1f}  "
+                  f"{r.final_coverage:>8.2f}  {r.final_coverage:>8.2f}  {0.0:>6.2f}  (no plateau)")
+            continue
+        run_saved = (r.end_ms - r.stop_ms) / r.end_ms * 100 if r.end_ms else 0.0
+        run_lost = r.final_coverage - r.coverage_at_stop
+        saved += run_saved
+        lost += run_lost
+        print(f"{r.label:<30}  {r.stop_ms:>10d}  {r.end_ms:>10d}  {run_saved:>8.1f}  "
+              f"{r.coverage_at_stop:>8.2f}  {r.final_coverage:>8.2f}  {run_lost:>6.2f}  {r.reason}")
+    if len(results) > 1:
+        print(f"\nmean time saved {saved / len(results):.1f} %, "
+              f"mean coverage lost {lost / len(results):.2f} points over {len(results)} runs")
+
+
+# ================================================================
+# LIVE
+# ================================================================
+
+def watch(tail: CurveTail, rules: PlateauRules, interval: float) -> str:
+    """Poll ``tail`` until the detector fires; return its reason."""
+    detector = PlateauDetector(rules)
+    seen = 0
+    read_at = None  # wall clock of the newest sample
+    while True:
+        if tail.poll():
+            for t, c in zip(tail.times[seen + 1:], tail.coverage[seen + 1:]):
+                detector.add(t, c)
+            seen = tail.samples
+            read_at = time.monotonic()
+        if read_at is not None:
+            # JDart time keeps running between samples (solver calls, IGNORE
+            # paths on logs without per-path lines).
+            now_ms = detector.last_ms + int((time.monotonic() - read_at) * 1000)
+            reason = detector.check(now_ms)
+            if reason is not None:
+                return f"{reason} (at ~{now_ms / 1000:.0f} s, coverage {detector.best:.2f}%)"
+        time.sleep(interval)
+
+
+def seconds_to_ms(value: Optional[float]) -> Optional[int]:
+    return None if value is None else int(value * 1000)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Stop covet-engine once branch coverage plateaus (or replay the rules)."
+    )
+    parser.add_argument(
+        "inputs",
+        nargs="+",
+        type=Path,
+        help="Live coverage-curve.tsv (or JPF log) to watch; with --replay, "
+        "finished TSVs to evaluate.",
+    )
+    parser.add_argument("--max-paths", type=int, default=None,
+                        help="Stop after N consecutive paths without a coverage gain.")
+    parser.add_argument("--max-idle", type=float, default=None, metavar="S",
+                        help="Stop after S seconds without a coverage gain.")
+    parser.add_argument("--min-slope", type=float, default=None, metavar="P",
+                        help="Stop when coverage grows by less than P percentage "
+                        "points per minute over --slope-window.")
+    parser.add_argument("--slope-window", type=float, default=300.0, metavar="S",
+                        help="Trailing window of --min-slope in seconds. Default: 300.")
+    parser.add_argument("--min-elapsed", type=float, default=30.0, metavar="S",
+                        help="Never stop before S seconds of JDart time. Default: 30.")
+    parser.add_argument("--interval", type=float, default=2.0,
+                        help="Seconds between polls of the live input. Default: 2.")
+    parser.add_argument("--stop-command", default=None,
+                        help="Shell command run once a plateau is detected, e.g. "
+                        "one that interrupts the JPF process.")
+    parser.add_argument("--reason-file", type=Path, default=None,
+                        help="Write the plateau reason here before running --stop-command.")
+    parser.add_argument("--replay", action="store_true",
+                        help="Evaluate the rules on finished curves and report "
+                        "where each run would have stopped.")
+    args = parser.parse_args()
+
+    rules = PlateauRules(
+        max_paths=args.max_paths,
+        max_idle_ms=seconds_to_ms(args.max_idle),
+        min_slope=args.min_slope,
+        slope_window_ms=seconds_to_ms(args.slope_window) if args.min_slope is not None else None,
+        min_elapsed_ms=seconds_to_ms(args.min_elapsed),
+    )
+    if rules.empty:
+        parser.error("give at least one of --max-paths, --max-idle, --min-slope")
+
+    if args.replay:
+        results = []
+        for path in args.inputs:
+            try:
+                curve = load_curve(path, None, None, True)
+            except (OSError, ValueError) as e:
+                sys.exit(f"[plateau] {e}")
+            results.append(replay(curve.times_ms, curve.coverage, rules, curve.label))
+        print_replay(results)
+        return
+
+    if len(args.inputs) != 1:
+        parser.error("watch exactly one live input (or use --replay)")
+    tail = CurveTail(args.inputs[0], None)
+    try:
+        reason = watch(tail, rules, args.interval)
+    except KeyboardInterrupt:
+        sys.exit(130)
+    except ValueError as e:
+        sys.exit(f"[plateau] {e}")
+
+    print(f"[plateau] stopping: {reason}", file=sys.stderr, flush=True)
+    if args.reason_file is not None:
+        args.reason_file.write_text(reason + "\n")
+    if args.stop_command:
+        result = subprocess.run(args.stop_command, shell=True)
+        if result.returncode != 0:
+            sys.exit(f"[plateau] stop command exited with {result.returncode}")
+
+
+if __name__ == "__main__":
+    main()
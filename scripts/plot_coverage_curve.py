@@ -63,49 +63,130 @@ Usage::
 
     python3 scripts/plot_coverage_curve.py <tsv> [<tsv2> ...] \\
         [-o output.{png,svg,pdf}] [--end-time MS] [--title TITLE] \\
-        [--labels LABEL1,LABEL2,...] [--no-shade] [--dpi N]
+        [--labels LABEL1,LABEL2,...] [--no-shade] [--dpi N] \\
+        [--time-to PCT,PCT,... [--time-to-csv out.csv]] \\
+        [--follow [--interval S] [--idle-exit S]] \\
+        [--aggregate [--group-level N] [--band LOW,HIGH] [--jobs N]] \\
+        [--batch [--jobs N]]
+    python3 scripts/plot_coverage_curve.py --registry runs.db --sut NAME \\
+        [--strategy A,B] [--last N] [--since DATE] [--aggregate] ...
 
 With multiple TSVs, curves are overlaid so different strategies can be
 compared on the same axes. ``--labels`` overrides the legend entries; by
 default the parent directory name of each TSV is used (which matches the
 ``dynamic-coverage-guided`` / ``dfs`` / ``bfs`` folder layout produced by the
 evaluation workflow).
+
+``--follow`` keeps running while JDart does: it tails the TSVs (or raw logs
+with ``jdart.evaluation`` lines) as they grow, updates each AUC from the
+newly appended samples only and refreshes the summary (and plot) every
+``--interval`` seconds.
+
+``--aggregate`` is for repeated runs (``<strategy>/<run>/coverage-curve.tsv``):
+runs are loaded in parallel, resampled onto one time grid and drawn as a
+mean line with a percentile band per strategy; the table reports each
+strategy's per-run AUC distribution.
+
+``--time-to 50,75,90,95`` adds a time-to-threshold table: how long each
+curve took to first reach every threshold, found by binary search over the
+curve's running-maximum envelope (in ``--aggregate`` mode, the median over
+the runs that reached it). ``--time-to-csv`` writes the same values as CSV
+for sizing ``TimedOrBranchCoverageTermination`` budgets.
+
+``--batch`` takes archive roots instead of TSVs and renders every
+``<experiment>/<strategy>/coverage-curve.tsv`` group below them on a process
+pool (one warm matplotlib per worker), writing each experiment's figure and
+``coverage-summary.txt`` next to it and a combined ``coverage-index.tsv`` /
+``coverage-index.md`` into each root.
+
+``--registry runs.db --sut NAME [--strategy A,B] [--last N]`` loads the
+curves from the SQLite run registry (``run_registry.py``) instead of TSVs;
+``--record runs.db`` registers the input TSVs.
+
+Parsed TSVs are cached in a ``<name>.tsv.npz`` sidecar (int64 times, float64
+coverage, int8 path-type codes) that is reused while the TSV's mtime and
+size are unchanged; ``--no-cache`` bypasses it. Sidecars that cannot be
+written (read-only archives) are skipped silently.
 """
 from __future__ import annotations
 
 import argparse
+import contextlib
 import csv
+import io
+import os
 import sys
-from dataclasses import dataclass
+import time
+from array import array
+from bisect import bisect_right
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List, Sequence
 
+from extract_coverage_curve import parse_evaluation_line
+
+try:
+    import numpy as np
+except ImportError:
+    sys.stderr.write(
+        "numpy is required. Install with:\n"
+        "  pip install -r requirements.txt\n"
+        "or: pip install numpy\n"
+    )
+    sys.exit(2)
+
+
+def step_integral(times_ms: np.ndarray, coverage: np.ndarray, start: int, end: int) -> float:
+    """Right-continuous step-function integral of one curve over ``[start, end]``.
+
+    Sample ``i`` holds ``coverage[i]`` on ``[times_ms[i], times_ms[i+1])``;
+    the last sample is held until ``end``. Intervals are clipped to the
+    window, so samples before ``start`` or after ``end`` contribute nothing.
+    """
+    if end <= start:
+        return 0.0
+    left = np.maximum(times_ms[:-1], start)
+    right = np.minimum(np.maximum(times_ms[1:], start), end)
+    total = float(np.dot(coverage[:-1], np.clip(right - left, 0, None)))
+    # Plateau extension past the last sample, if requested.
+    total += float(coverage[-1]) * max(end - max(int(times_ms[-1]), start), 0)
+    return total
+
 
 @dataclass
 class Curve:
     label: str
-    times_ms: List[int]  # includes leading 0
-    coverage: List[float]  # includes leading 0.0
-    path_types: List[str]  # length == len(times_ms) - 1 (no type for the synthetic 0-point)
+    times_ms: np.ndarray  # int64, includes leading 0
+    coverage: np.ndarray  # float64, includes leading 0.0
+    # int8 codes into path_type_names; length == len(times_ms) - 1 (no type
+    # for the synthetic 0-point)
+    path_types: np.ndarray
+    path_type_names: List[str]
     end_time_ms: int
     include_startup: bool = False
     # Where the AUC integration actually ends. Defaults to end_time_ms but can
     # be extended past the last sample (extending at final coverage) or
     # truncated below it (ignoring trailing samples) by the window-mode logic.
     effective_end_ms: int | None = None
+    # (start, end) -> auc_raw; the window changes when effective_end_ms does.
+    _auc_memo: dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    _envelope: np.ndarray | None = field(default=None, init=False, repr=False, compare=False)
 
     def __post_init__(self) -> None:
+        self.times_ms = np.asarray(self.times_ms, dtype=np.int64)
+        self.coverage = np.asarray(self.coverage, dtype=np.float64)
         if self.effective_end_ms is None:
             self.effective_end_ms = self.end_time_ms
 
     @property
     def final_coverage(self) -> float:
-        return self.coverage[-1]
+        return float(self.coverage[-1])
 
     @property
     def first_path_ms(self) -> int:
         """Elapsed time of the first path sample (t_1). 0 if there are no samples."""
-        return self.times_ms[1] if len(self.times_ms) > 1 else 0
+        return int(self.times_ms[1]) if len(self.times_ms) > 1 else 0
 
     @property
     def auc_start_ms(self) -> int:
@@ -135,22 +216,13 @@ class Curve:
         ``cov_{i-1}``. If ``auc_end_ms`` exceeds the last sample, coverage
         is extended at ``coverage[-1]`` until ``auc_end_ms``. If
         ``auc_end_ms`` precedes the last sample, samples beyond the window
-        are clipped.
+        are clipped. Memoised per window.
         """
-        start = self.auc_start_ms
-        end = self.auc_end_ms
-        if end <= start:
-            return 0.0
-        total = 0.0
-        for i in range(1, len(self.times_ms)):
-            t_prev, t_cur = self.times_ms[i - 1], self.times_ms[i]
-            left = max(t_prev, start)
-            right = min(max(t_cur, start), end)
-            if right > left:
-                total += self.coverage[i - 1] * (right - left)
-        # Plateau extension past the last sample, if requested.
-        total += self.coverage[-1] * max(end - max(self.times_ms[-1], start), 0)
-        return total
+        key = (self.auc_start_ms, self.auc_end_ms)
+        auc = self._auc_memo.get(key)
+        if auc is None:
+            auc = self._auc_memo[key] = step_integral(self.times_ms, self.coverage, *key)
+        return auc
 
     @property
     def auc_avg(self) -> float:
@@ -158,13 +230,237 @@ class Curve:
         window = self.auc_window_ms
         return self.auc_raw / window if window > 0 else 0.0
 
+    @property
+    def envelope(self) -> np.ndarray:
+        """Running maximum of ``coverage``: the best coverage reached by each
+        sample. Monotone, so it can be binary-searched."""
+        if self._envelope is None:
+            self._envelope = np.maximum.accumulate(self.coverage)
+        return self._envelope
+
+    def time_to_coverage(self, thresholds: Sequence[float]) -> np.ndarray:
+        """Time from ``auc_start_ms`` until coverage first reaches each of
+        ``thresholds`` (in %), as float ms; NaN where the threshold is not
+        reached within ``auc_end_ms``. One binary search per threshold.
+        """
+        idx = np.searchsorted(self.envelope, np.asarray(thresholds, dtype=np.float64), side="left")
+        reached = idx < len(self.times_ms)
+        hit_ms = self.times_ms[np.minimum(idx, len(self.times_ms) - 1)]
+        reached &= hit_ms <= self.auc_end_ms
+        return np.where(reached, np.maximum(hit_ms - self.auc_start_ms, 0), np.nan)
 
-def load_curve(
-    tsv_path: Path,
-    label: str | None,
-    end_time_ms: int | None,
-    include_startup: bool,
-) -> Curve:
+
+@dataclass
+class CurveStats:
+    """Per-curve summary values for many curves, one array element per curve."""
+
+    first_path_ms: np.ndarray
+    end_time_ms: np.ndarray
+    own_window_ms: np.ndarray
+    auc_window_ms: np.ndarray
+    final_coverage: np.ndarray
+    auc_raw: np.ndarray
+    auc_avg: np.ndarray
+
+
+# Samples integrated per vectorized block in curve_stats(). Keeping the
+# temporaries cache-resident is several times faster than one huge block.
+CURVE_STATS_BLOCK = 1 << 16
+# Curves with at least this many samples are integrated one at a time.
+CURVE_STATS_LONG = 512
+
+
+def _segment_auc(times: np.ndarray, coverage: np.ndarray, lengths: np.ndarray,
+                 start: np.ndarray, end: np.ndarray) -> np.ndarray:
+    """AUC of each concatenated curve segment (see :func:`curve_stats`)."""
+    offsets = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    last = offsets + lengths - 1
+    # Interval [t_i, t_{i+1}) of every sample, clipped to its curve's window.
+    # The last sample of each curve gets the plateau extension instead.
+    row_start = np.repeat(start, lengths)
+    row_end = np.repeat(end, lengths)
+    next_times = np.empty_like(times)
+    next_times[:-1] = times[1:]
+    next_times[last] = np.maximum(times[last], end)
+    left = np.maximum(times, row_start)
+    right = np.minimum(np.maximum(next_times, row_start), row_end)
+    width = right - left
+    np.maximum(width, 0, out=width)
+    auc = np.add.reduceat(coverage * width, offsets)
+    return np.where(end > start, auc, 0.0)
+
+
+def curve_stats(curves: Sequence[Curve]) -> CurveStats:
+    """Compute AUC, final coverage and window lengths for all ``curves`` at once.
+
+    The samples of consecutive short curves are concatenated (in blocks of
+    about ``CURVE_STATS_BLOCK`` samples) and integrated with one clipped
+    step-function expression per block; ``np.add.reduceat`` then sums each
+    curve's segment. Long curves go through :func:`step_integral`
+    directly. Equivalent to reading the properties of each curve, without
+    a Python-level loop over samples.
+    """
+    n = len(curves)
+    lengths = np.fromiter((len(c.times_ms) for c in curves), dtype=np.int64, count=n)
+    first_path = np.fromiter((c.first_path_ms for c in curves), dtype=np.int64, count=n)
+    include_startup = np.fromiter((c.include_startup for c in curves), dtype=bool, count=n)
+    start = np.where(include_startup, 0, first_path)
+    end = np.fromiter((c.auc_end_ms for c in curves), dtype=np.int64, count=n)
+    end_time = np.fromiter((c.end_time_ms for c in curves), dtype=np.int64, count=n)
+    final = np.fromiter((c.final_coverage for c in curves), dtype=np.float64, count=n)
+
+    auc = np.zeros(n)
+    i = 0
+    while i < n:
+        if lengths[i] >= CURVE_STATS_LONG:
+            # Long curves are already vectorized on their own.
+            auc[i] = curves[i].auc_raw
+            i += 1
+            continue
+        j = i + 1
+        size = lengths[i]
+        while j < n and lengths[j] < CURVE_STATS_LONG and size + lengths[j] <= CURVE_STATS_BLOCK:
+            size += lengths[j]
+            j += 1
+        block = curves[i:j]
+        auc[i:j] = _segment_auc(
+            np.concatenate([c.times_ms for c in block]),
+            np.concatenate([c.coverage for c in block]),
+            lengths[i:j], start[i:j], end[i:j],
+        )
+        i = j
+
+    window = np.maximum(end - start, 0)
+    return CurveStats(
+        first_path_ms=first_path,
+        end_time_ms=end_time,
+        own_window_ms=np.maximum(end_time - start, 0),
+        auc_window_ms=window,
+        final_coverage=final,
+        auc_raw=auc,
+        auc_avg=np.divide(auc, window, out=np.zeros(n), where=window > 0),
+    )
+
+
+# ================================================================
+# TIME TO COVERAGE
+# ================================================================
+#
+# "How long until 50/75/90/95% branch coverage" per run: the number used to
+# size TimedOrBranchCoverageTermination budgets. Times are measured on the
+# same axis as the AUC (from t_1 unless --include-startup).
+
+DEFAULT_TIME_TO = (50.0, 75.0, 90.0, 95.0)
+
+
+def time_to_thresholds(curves: Sequence[Curve], thresholds: Sequence[float]) -> np.ndarray:
+    """``(len(curves), len(thresholds))`` array of :meth:`Curve.time_to_coverage`."""
+    out = np.full((len(curves), len(thresholds)), np.nan)
+    for i, curve in enumerate(curves):
+        out[i] = curve.time_to_coverage(thresholds)
+    return out
+
+
+def parse_thresholds(spec: str) -> tuple:
+    try:
+        thresholds = tuple(float(part) for part in spec.split(",") if part.strip())
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated percentages, got {spec!r}")
+    if not thresholds or not all(0 <= t <= 100 for t in thresholds):
+        raise argparse.ArgumentTypeError(f"need percentages in [0, 100], got {spec!r}")
+    return thresholds
+
+
+def _format_ms(value: float) -> str:
+    return "-" if np.isnan(value) else f"{value:.0f}"
+
+
+def print_time_to_table(labels: Sequence[str], times: np.ndarray, thresholds: Sequence[float],
+                        out=None) -> None:
+    """One row per curve, one column per threshold; ``-`` = never reached."""
+    header = f"{'label':<30}" + "".join(f"  {f't→{t:g}% (ms)':>13}" for t in thresholds)
+    print(header, file=out)
+    print("-" * len(header), file=out)
+    for label, row in zip(labels, times):
+        print(f"{label:<30}" + "".join(f"  {_format_ms(v):>13}" for v in row), file=out)
+
+
+def print_time_to_summary(bands: Sequence[CurveBand], thresholds: Sequence[float]) -> None:
+    """Per strategy: median time to each threshold over the runs that reached
+    it, and how many runs did."""
+    header = f"{'label':<30}" + "".join(f"  {f't→{t:g}% median (n)':>22}" for t in thresholds)
+    print(header)
+    print("-" * len(header))
+    for b in bands:
+        cells = []
+        for column in b.time_to.T:
+            reached = column[~np.isnan(column)]
+            median = _format_ms(np.median(reached)) if len(reached) else "-"
+            cells.append(f"{median} ({len(reached)}/{b.runs})")
+        print(f"{b.label:<30}" + "".join(f"  {cell:>22}" for cell in cells))
+
+
+def write_time_to_csv(out_path: Path, rows, thresholds: Sequence[float]) -> None:
+    """Long-format CSV: ``label,input,threshold_pct,time_ms`` with an empty
+    ``time_ms`` when the threshold was not reached. ``rows`` yields
+    ``(label, input path, times row)``."""
+    with out_path.open("w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["label", "input", "threshold_pct", "time_ms"])
+        for label, source, times in rows:
+            for threshold, value in zip(thresholds, times):
+                writer.writerow([label, source, f"{threshold:g}",
+                                 "" if np.isnan(value) else f"{value:.0f}"])
+    print(f"[time-to] saved {out_path}")
+
+
+def encode_path_types(path_types: Sequence[str]) -> tuple:
+    """``(int8 codes, names)`` for a sequence of path type strings."""
+    names: dict = {}
+    codes = np.fromiter(
+        (names.setdefault(ptype, len(names)) for ptype in path_types),
+        dtype=np.int8,
+        count=len(path_types),
+    )
+    return codes, list(names)
+
+
+def curve_cache_path(tsv_path: Path) -> Path:
+    """Sidecar holding the parsed columns of ``tsv_path``."""
+    return tsv_path.with_name(tsv_path.name + ".npz")
+
+
+def _read_curve_cache(tsv_path: Path, stat: os.stat_result):
+    try:
+        with np.load(curve_cache_path(tsv_path), allow_pickle=False) as npz:
+            if (int(npz["source_mtime_ns"]) != stat.st_mtime_ns
+                    or int(npz["source_size"]) != stat.st_size):
+                return None
+            return (npz["times_ms"], npz["coverage"], npz["path_types"],
+                    [str(name) for name in npz["path_type_names"]])
+    except (OSError, KeyError, ValueError):
+        return None
+
+
+def _write_curve_cache(tsv_path: Path, stat: os.stat_result, times, coverage, codes, names) -> None:
+    cache = curve_cache_path(tsv_path)
+    tmp = cache.with_name(f".{cache.name}.{os.getpid()}.tmp.npz")
+    try:
+        np.savez(
+            tmp,
+            source_mtime_ns=np.int64(stat.st_mtime_ns),
+            source_size=np.int64(stat.st_size),
+            times_ms=times,
+            coverage=coverage,
+            path_types=codes,
+            path_type_names=np.array(names, dtype=str),
+        )
+        os.replace(tmp, cache)
+    except OSError:  # read-only archive: just parse again next time
+        tmp.unlink(missing_ok=True)
+
+
+def _parse_curve_tsv(tsv_path: Path) -> tuple:
     times: List[int] = [0]
     coverage: List[float] = [0.0]
     path_types: List[str] = []
@@ -183,20 +479,43 @@ def load_curve(
             coverage.append(float(row["branch_coverage"]))
             path_types.append(row["path_type"])
 
+    codes, names = encode_path_types(path_types)
+    return np.array(times, dtype=np.int64), np.array(coverage, dtype=np.float64), codes, names
+
+
+def load_curve(
+    tsv_path: Path,
+    label: str | None,
+    end_time_ms: int | None,
+    include_startup: bool,
+    use_cache: bool = True,
+) -> Curve:
+    """Load ``tsv_path``, reusing its ``.npz`` sidecar when the TSV's mtime
+    and size are unchanged (and refreshing it otherwise)."""
+    stat = tsv_path.stat()
+    columns = _read_curve_cache(tsv_path, stat) if use_cache else None
+    if columns is None:
+        columns = _parse_curve_tsv(tsv_path)
+        if use_cache:
+            _write_curve_cache(tsv_path, stat, *columns)
+    times, coverage, codes, names = columns
+
     if len(times) == 1:
         raise ValueError(f"{tsv_path}: no data rows found")
 
-    end = end_time_ms if end_time_ms is not None else times[-1]
-    if end < times[-1]:
+    last = int(times[-1])
+    end = end_time_ms if end_time_ms is not None else last
+    if end < last:
         raise ValueError(
-            f"{tsv_path}: --end-time {end} ms precedes last sample at {times[-1]} ms"
+            f"{tsv_path}: --end-time {end} ms precedes last sample at {last} ms"
         )
 
     return Curve(
         label=label or tsv_path.parent.name or tsv_path.stem,
         times_ms=times,
         coverage=coverage,
-        path_types=path_types,
+        path_types=codes,
+        path_type_names=names,
         end_time_ms=end,
         include_startup=include_startup,
     )
@@ -238,6 +557,44 @@ PATH_TYPE_MARKER = {
 }
 
 
+def decimate_steps(xs: np.ndarray, ys: np.ndarray, x_max: float, pixels: int):
+    """Drop step-plot vertices that cannot change the rendered image.
+
+    ``xs`` (sorted, in ``[0, x_max]``) is bucketed into ``pixels`` columns.
+    Per column, the first and last vertex (which fix the horizontal levels
+    entering and leaving it) and the lowest and highest one (its vertical
+    extent) are kept. With ``where="post"`` that draws the same pixels.
+    """
+    if len(xs) <= 4 * pixels or x_max <= 0:
+        return xs, ys
+    column = np.minimum((xs / x_max * pixels).astype(np.int64), pixels - 1)
+    # Stable sort by (column, y): per column, first row = min y, last = max y.
+    by_y = np.lexsort((ys, column))
+    starts = np.flatnonzero(np.diff(column[by_y], prepend=-1))
+    ends = np.append(starts[1:], len(xs)) - 1
+    first = np.flatnonzero(np.diff(column, prepend=-1))
+    last = np.append(first[1:], len(xs)) - 1
+    keep = np.unique(np.concatenate((first, last, by_y[starts], by_y[ends])))
+    return xs[keep], ys[keep]
+
+
+def decimate_markers(xs: np.ndarray, ys: np.ndarray, x_max: float,
+                     px_width: int, px_height: int) -> np.ndarray:
+    """Indices of the markers to draw: the first marker per output pixel.
+
+    This is not lossless: IGNORE markers are semi-transparent, so markers
+    stacked on one pixel render darker than a single one. After decimation
+    a dense streak is drawn at single-marker intensity; positions are kept.
+    """
+    if len(xs) <= px_width or x_max <= 0:
+        return np.arange(len(xs))
+    col = np.clip((xs / x_max * px_width).astype(np.int64), 0, px_width - 1)
+    row = np.clip((ys / 100.0 * px_height).astype(np.int64), 0, px_height - 1)
+    _, keep = np.unique(col * px_height + row, return_index=True)
+    keep.sort()
+    return keep
+
+
 def plot_curves(curves: Sequence[Curve], args: argparse.Namespace) -> None:
     try:
         import matplotlib
@@ -268,7 +625,17 @@ def plot_curves(curves: Sequence[Curve], args: argparse.Namespace) -> None:
     time_div = 1000.0 if use_seconds else 1.0
     time_unit = "s" if use_seconds else "ms"
 
-    fig, ax = plt.subplots(figsize=(9.5, 5.5))
+    figsize = (9.5, 5.5)
+    fig, ax = plt.subplots(figsize=figsize)
+
+    # Pixel grid of the output, used to decimate dense curves: the step line
+    # covers the same pixels, IGNORE markers keep one per pixel (see
+    # decimate_markers for how that changes stacked markers). The whole
+    # figure is an upper bound on the axes area, so the grid is never
+    # coarser than what ends up on screen.
+    decimate = not args.no_decimate
+    px_width = int(figsize[0] * args.dpi)
+    px_height = int(figsize[1] * args.dpi)
 
     # Track whether any curve ended up being plateau-extended — used later
     # to add a legend entry explaining the dashed tail.
@@ -284,17 +651,17 @@ def plot_curves(curves: Sequence[Curve], args: argparse.Namespace) -> None:
         # window truncates (common mode), we clip; if it extends, the
         # natural segment ends at end_time_ms and an extension line follows.
         natural_end_ms = min(curve.end_time_ms, curve.auc_end_ms)
-        natural_samples = [
-            (t, c) for t, c in zip(curve.times_ms[start_idx:], curve.coverage[start_idx:])
-            if t <= natural_end_ms
-        ]
-        xs = [(t - offset) / time_div for t, _ in natural_samples]
-        ys = [c for _, c in natural_samples]
+        in_window = curve.times_ms[start_idx:] <= natural_end_ms
+        times = curve.times_ms[start_idx:][in_window]
+        ys = curve.coverage[start_idx:][in_window]
+        xs = (times - offset) / time_div
         # Cap the natural segment at natural_end_ms so step plotting ends
         # precisely at that x.
-        if not xs or xs[-1] * time_div + offset < natural_end_ms:
-            xs.append((natural_end_ms - offset) / time_div)
-            ys.append(ys[-1] if ys else 0.0)
+        if not len(times) or times[-1] < natural_end_ms:
+            xs = np.append(xs, (natural_end_ms - offset) / time_div)
+            ys = np.append(ys, ys[-1] if len(ys) else 0.0)
+        if decimate:
+            xs, ys = decimate_steps(xs, ys, x_max_ms / time_div, px_width)
         # Right-continuous step: value in [t_{i-1}, t_i) is coverage[i-1], so
         # drawstyle="steps-post" (hold value until next x) matches exactly.
         line, = ax.step(
@@ -337,11 +704,17 @@ def plot_curves(curves: Sequence[Curve], args: argparse.Namespace) -> None:
         # line colour so the improvements stay associated with the strategy,
         # but IGNORE/ERROR/DONT_KNOW use their own colour to pop out. Skip
         # samples that fall outside the window (common-mode truncation).
-        for t_ms, cov, ptype in zip(
-            curve.times_ms[1:], curve.coverage[1:], curve.path_types
-        ):
-            if t_ms > natural_end_ms:
-                continue
+        # One scatter call (one artist) per path type.
+        sample_times = curve.times_ms[1:]
+        sample_cov = curve.coverage[1:]
+        visible = sample_times <= natural_end_ms
+        for code, ptype in enumerate(curve.path_type_names):
+            selected = visible & (curve.path_types == code)
+            mx = (sample_times[selected] - offset) / time_div
+            my = sample_cov[selected]
+            if decimate and ptype == "IGNORE":
+                keep = decimate_markers(mx, my, x_max_ms / time_div, px_width, px_height)
+                mx, my = mx[keep], my[keep]
             marker, marker_colour = PATH_TYPE_MARKER.get(ptype, ("o", plot_colour))
             face = plot_colour if ptype == "OK" else marker_colour
             # matplotlib warns when edgecolor is given to an unfilled marker
@@ -356,7 +729,7 @@ def plot_curves(curves: Sequence[Curve], args: argparse.Namespace) -> None:
                 kwargs.update(s=8, alpha=0.55, linewidths=0.6)
             else:
                 kwargs.update(s=16)
-            ax.scatter((t_ms - offset) / time_div, cov, marker=marker, **kwargs)
+            ax.scatter(mx, my, marker=marker, **kwargs)
 
     # Threshold guide if everything looks like a TimedOrBranchCoverageTermination run.
     if args.threshold is not None:
@@ -432,6 +805,61 @@ def plot_curves(curves: Sequence[Curve], args: argparse.Namespace) -> None:
     print(f"[plot] saved {out_path}")
 
 
+def print_summary(curves: Sequence[Curve], args: argparse.Namespace, out=None) -> tuple:
+    """Print the AUC table (and the --time-to table) for ``curves``, whose
+    window mode has already been applied. Returns ``(CurveStats, time_to)``;
+    ``time_to`` is ``None`` without --time-to."""
+    # The table shows each curve's NATURAL characteristics (raw T_end from
+    # telemetry, window = T_end - t_1). The shared AUC integration window
+    # (which may differ from the per-curve natural window under extended /
+    # common modes) is called out in the trailing note.
+    header = (
+        f"{'label':<30}  {'t_1 (ms)':>8}  {'T_end (ms)':>10}  "
+        f"{'window (ms)':>11}  {'final %':>8}  {'AUC (%·ms)':>12}  {'AUC avg %':>10}"
+    )
+    print(header, file=out)
+    print("-" * len(header), file=out)
+    stats = curve_stats(curves)
+    for i, c in enumerate(curves):
+        print(
+            f"{c.label:<30}  {stats.first_path_ms[i]:>8d}  {stats.end_time_ms[i]:>10d}  "
+            f"{stats.own_window_ms[i]:>11d}  {stats.final_coverage[i]:>8.2f}  "
+            f"{stats.auc_raw[i]:>12.1f}  {stats.auc_avg[i]:>10.2f}",
+            file=out,
+        )
+
+    startup_note = (
+        "from t=0" if args.include_startup else "from t_1 (startup excluded)"
+    )
+    if args.window_mode == "extended":
+        auc_window = int(stats.own_window_ms.max())
+        print(
+            f"\nAUC integrated {startup_note} over {auc_window} ms (longest "
+            "natural window; curves that terminated earlier are extended at "
+            "their final coverage)",
+            file=out,
+        )
+    elif args.window_mode == "common":
+        auc_window = int(stats.own_window_ms.min())
+        print(
+            f"\nAUC integrated {startup_note} over {auc_window} ms (shortest "
+            "natural window; curves that ran longer are truncated)",
+            file=out,
+        )
+    else:
+        print(
+            f"\nAUC integrated {startup_note} over each curve's own window",
+            file=out,
+        )
+
+    time_to = None
+    if args.time_to:
+        time_to = time_to_thresholds(curves, args.time_to)
+        print(file=out)
+        print_time_to_table([c.label for c in curves], time_to, args.time_to, out)
+    return stats, time_to
+
+
 def apply_window_mode(curves: Sequence[Curve], mode: str) -> None:
     """Rewrite each curve's ``effective_end_ms`` so the AUC integration
     window matches the requested cross-curve convention.
@@ -469,15 +897,620 @@ def parse_labels(labels_arg: str | None, n: int) -> List[str | None]:
     return parts
 
 
+# ================================================================
+# FOLLOW MODE
+# ================================================================
+#
+# --follow tails growing coverage-curve.tsv files (or raw logs containing
+# jdart.evaluation lines) while JDart is still running. Each CurveTail only
+# reads the bytes appended since the previous poll and keeps a running
+# integral, so a refresh costs the same after 10 samples as after 100k.
+
+class CurveTail:
+    """Incrementally read samples appended to a TSV or evaluation log.
+
+    ``area[i]`` is the step-function integral from 0 to ``times[i]`` (the
+    synthetic (0, 0) point contributes nothing), so the AUC over any window
+    is a difference of two prefix areas: O(1) when the window ends at or
+    after the last sample, O(log n) otherwise.
+    """
+
+    def __init__(self, path: Path, label: str | None):
+        self.path = path
+        self.label = label or path.parent.name or path.stem
+        self.is_log = path.suffix != ".tsv"
+        self._reset()
+
+    def _reset(self) -> None:
+        self.offset = 0
+        self.partial = b""
+        self.columns: List[str] | None = None
+        self.times = array("q", [0])
+        self.coverage = array("d", [0.0])
+        self.area = array("d", [0.0])
+        self.path_types = array("b")
+        self.path_type_codes: dict = {}
+
+    @property
+    def samples(self) -> int:
+        return len(self.path_types)
+
+    @property
+    def first_path_ms(self) -> int:
+        return self.times[1] if len(self.times) > 1 else 0
+
+    @property
+    def last_ms(self) -> int:
+        return self.times[-1]
+
+    @property
+    def final_coverage(self) -> float:
+        return self.coverage[-1]
+
+    def poll(self) -> int:
+        """Read whatever was appended since the last call; return the new sample count."""
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return 0
+        if size < self.offset:  # truncated or replaced: start over
+            self._reset()
+        if size == self.offset:
+            return 0
+        with self.path.open("rb") as f:
+            f.seek(self.offset)
+            data = f.read(size - self.offset)
+        self.offset += len(data)
+
+        lines = (self.partial + data).split(b"\n")
+        self.partial = lines.pop()  # incomplete last line, if any
+        before = self.samples
+        for raw in lines:
+            if self.is_log:
+                sample = parse_evaluation_line(raw)
+                if sample is not None:
+                    self.add(*sample)
+            else:
+                self._parse_tsv_line(raw.decode("utf-8", errors="replace").rstrip("\r"))
+        return self.samples - before
+
+    def _parse_tsv_line(self, line: str) -> None:
+        if not line:
+            return
+        fields = line.split("\t")
+        if self.columns is None:
+            self.columns = fields
+            missing = {"elapsed_ms", "branch_coverage", "path_type"} - set(fields)
+            if missing:
+                raise ValueError(f"{self.path}: TSV is missing columns {sorted(missing)}")
+            return
+        row = dict(zip(self.columns, fields))
+        self.add(int(row["elapsed_ms"]), float(row["branch_coverage"]), row["path_type"])
+
+    def add(self, elapsed_ms: int, coverage: float, path_type: str) -> None:
+        self.area.append(self.area[-1] + self.coverage[-1] * (elapsed_ms - self.times[-1]))
+        self.times.append(elapsed_ms)
+        self.coverage.append(coverage)
+        code = self.path_type_codes.setdefault(path_type, len(self.path_type_codes))
+        self.path_types.append(code)
+
+    def area_until(self, t: int) -> float:
+        """Step-function integral from 0 to ``t``."""
+        if t >= self.times[-1]:
+            return self.area[-1] + self.coverage[-1] * (t - self.times[-1])
+        i = max(bisect_right(self.times, t) - 1, 0)
+        return self.area[i] + self.coverage[i] * (t - self.times[i])
+
+    def auc(self, start: int, end: int) -> float:
+        if end <= start:
+            return 0.0
+        return self.area_until(end) - self.area_until(start)
+
+    def curve(self, include_startup: bool) -> Curve:
+        """Snapshot as a :class:`Curve` (copies the samples; used for plotting)."""
+        return Curve(
+            label=self.label,
+            times_ms=np.frombuffer(self.times, dtype=np.int64).copy(),
+            coverage=np.frombuffer(self.coverage, dtype=np.float64).copy(),
+            path_types=np.frombuffer(self.path_types, dtype=np.int8).copy(),
+            path_type_names=list(self.path_type_codes),
+            end_time_ms=self.last_ms,
+            include_startup=include_startup,
+        )
+
+
+def follow(tails: Sequence[CurveTail], args: argparse.Namespace) -> None:
+    """Poll ``tails`` every ``args.interval`` seconds and refresh the summary
+    (and the plot, unless ``--no-plot``) whenever samples were appended."""
+    idle_since = time.monotonic()
+    try:
+        while True:
+            new = sum(tail.poll() for tail in tails)
+            now = time.monotonic()
+            if new:
+                idle_since = now
+                print_follow_summary(tails, args)
+                ready = [tail for tail in tails if tail.samples]
+                if not args.no_plot and ready:
+                    plot_curves(live_curves(ready, args), args)
+            elif args.idle_exit is not None and now - idle_since >= args.idle_exit:
+                print(f"[follow] no new samples for {args.idle_exit:g} s, stopping")
+                return
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        print("\n[follow] stopped")
+
+
+def live_curves(tails: Sequence[CurveTail], args: argparse.Namespace) -> List[Curve]:
+    curves = [tail.curve(args.include_startup) for tail in tails]
+    apply_window_mode(curves, args.window_mode)
+    return curves
+
+
+def print_follow_summary(tails: Sequence[CurveTail], args: argparse.Namespace) -> None:
+    ready = [tail for tail in tails if tail.samples]
+    starts = [0 if args.include_startup else tail.first_path_ms for tail in ready]
+    windows = [max(tail.last_ms - start, 0) for tail, start in zip(ready, starts)]
+    if args.window_mode == "extended" and windows:
+        windows = [max(windows)] * len(ready)
+    elif args.window_mode == "common" and windows:
+        windows = [min(windows)] * len(ready)
+
+    print(time.strftime("[follow] %H:%M:%S"))
+    header = (
+        f"{'label':<30}  {'samples':>8}  {'t_1 (ms)':>8}  {'last (ms)':>10}  "
+        f"{'final %':>8}  {'AUC (%·ms)':>12}  {'AUC avg %':>10}"
+    )
+    print(header)
+    print("-" * len(header))
+    for tail, start, window in zip(ready, starts, windows):
+        auc = tail.auc(start, start + window)
+        print(
+            f"{tail.label:<30}  {tail.samples:>8d}  {tail.first_path_ms:>8d}  "
+            f"{tail.last_ms:>10d}  {tail.final_coverage:>8.2f}  "
+            f"{auc:>12.1f}  {auc / window if window > 0 else 0.0:>10.2f}"
+        )
+    for tail in tails:
+        if not tail.samples:
+            print(f"{tail.label:<30}  (waiting for samples in {tail.path})")
+    print(flush=True)
+
+
+# ================================================================
+# AGGREGATE MODE
+# ================================================================
+#
+# --aggregate treats the inputs as repeated runs of a few strategies. Runs
+# are grouped by an ancestor folder (by default <strategy>/<run>/<tsv>),
+# loaded on a process pool, resampled onto one shared time grid and reduced
+# to a mean line with percentile bands per strategy.
+
+DEFAULT_GRID_POINTS = 1000
+
+
+def group_inputs(paths: Sequence[Path], level: int) -> dict:
+    """Group TSV paths by the name of their ``level``-th ancestor folder
+    (1 = parent). Insertion order follows the inputs."""
+    groups: dict = {}
+    for path in paths:
+        parents = path.resolve().parents
+        key = parents[min(level, len(parents)) - 1].name or path.stem
+        groups.setdefault(key, []).append(path)
+    return groups
+
+
+def _load_run(job) -> Curve:
+    path, include_startup, use_cache = job
+    return load_curve(path, None, None, include_startup, use_cache)
+
+
+def load_curves_parallel(paths: Sequence[Path], include_startup: bool, jobs: int | None,
+                         use_cache: bool = True) -> List[Curve]:
+    """:func:`load_curve` every path on a process pool, keeping input order."""
+    jobs = min(jobs or os.cpu_count() or 1, len(paths))
+    work = [(path, include_startup, use_cache) for path in paths]
+    if jobs <= 1:
+        return [_load_run(job) for job in work]
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        return list(pool.map(_load_run, work, chunksize=max(1, len(work) // (4 * jobs))))
+
+
+def resample(curve: Curve, grid_ms: np.ndarray, offset_ms: int) -> np.ndarray:
+    """Value of ``curve``'s right-continuous step function at ``offset_ms +
+    grid_ms``; held at the final coverage past the last sample."""
+    idx = np.searchsorted(curve.times_ms, grid_ms + offset_ms, side="right") - 1
+    return curve.coverage[np.maximum(idx, 0)]
+
+
+@dataclass
+class CurveBand:
+    label: str
+    runs: int
+    grid_ms: np.ndarray
+    mean: np.ndarray
+    median: np.ndarray
+    low: np.ndarray
+    high: np.ndarray
+    auc_avg: np.ndarray  # one entry per run
+    final_coverage: np.ndarray  # one entry per run
+    time_to: np.ndarray  # (runs, len(args.time_to)); NaN = not reached
+
+
+def aggregate(groups: dict, curves: Sequence[Curve], args: argparse.Namespace) -> List[CurveBand]:
+    """Reduce the runs of every group to a :class:`CurveBand` on a shared grid.
+
+    The window mode is applied across all runs of all groups, like the
+    overlay mode does across curves, so per-run AUCs stay comparable.
+    """
+    apply_window_mode(curves, args.window_mode)
+    stats = curve_stats(curves)
+    normalize = not args.include_startup
+    offsets = stats.first_path_ms if normalize else np.zeros(len(curves), dtype=np.int64)
+    span = int(max(c.auc_end_ms - off for c, off in zip(curves, offsets)))
+    grid = np.linspace(0, max(span, 1), args.grid_points).round().astype(np.int64)
+    low_pct, high_pct = args.band
+    time_to = time_to_thresholds(curves, args.time_to or ())
+
+    bands = []
+    start = 0
+    for label, paths in groups.items():
+        members = range(start, start + len(paths))
+        start += len(paths)
+        values = np.vstack([resample(curves[i], grid, int(offsets[i])) for i in members])
+        low, median, high = np.percentile(values, [low_pct, 50, high_pct], axis=0)
+        bands.append(CurveBand(
+            label=label,
+            runs=len(paths),
+            grid_ms=grid,
+            mean=values.mean(axis=0),
+            median=median,
+            low=low,
+            high=high,
+            auc_avg=stats.auc_avg[members.start:members.stop],
+            final_coverage=stats.final_coverage[members.start:members.stop],
+            time_to=time_to[members.start:members.stop],
+        ))
+    return bands
+
+
+def print_aggregate_summary(bands: Sequence[CurveBand]) -> None:
+    header = (
+        f"{'label':<30}  {'runs':>4}  {'final % (mean ± sd)':>20}  "
+        f"{'AUC avg % (mean ± sd)':>22}  {'median':>7}  {'min':>7}  {'max':>7}"
+    )
+    print(header)
+    print("-" * len(header))
+    for b in bands:
+        final = f"{b.final_coverage.mean():.2f} ± {b.final_coverage.std(ddof=1) if b.runs > 1 else 0.0:.2f}"
+        auc = f"{b.auc_avg.mean():.2f} ± {b.auc_avg.std(ddof=1) if b.runs > 1 else 0.0:.2f}"
+        print(
+            f"{b.label:<30}  {b.runs:>4d}  {final:>20}  {auc:>22}  "
+            f"{np.median(b.auc_avg):>7.2f}  {b.auc_avg.min():>7.2f}  {b.auc_avg.max():>7.2f}"
+        )
+
+
+def plot_bands(bands: Sequence[CurveBand], args: argparse.Namespace) -> None:
+    try:
+        import matplotlib
+        matplotlib.use("Agg")  # headless-safe
+        import matplotlib.pyplot as plt
+    except ImportError:
+        sys.stderr.write(
+            "matplotlib is required for plotting. Install with:\n"
+            "  pip install -r requirements.txt\n"
+            "or: pip install matplotlib\n"
+        )
+        sys.exit(2)
+
+    x_max_ms = int(bands[0].grid_ms[-1])
+    use_seconds = x_max_ms >= 2000
+    time_div = 1000.0 if use_seconds else 1.0
+    time_unit = "s" if use_seconds else "ms"
+    low_pct, high_pct = args.band
+
+    fig, ax = plt.subplots(figsize=(9.5, 5.5))
+    for b in bands:
+        xs = b.grid_ms / time_div
+        line, = ax.step(
+            xs, b.mean, where="post", linewidth=1.8,
+            color=DEFAULT_COLOURS.get(b.label, None),
+            label=f"{display_label(b.label)} — mean of {b.runs} runs · "
+            f"avg {b.auc_avg.mean():.2f}%",
+        )
+        colour = line.get_color()
+        ax.step(xs, b.median, where="post", linewidth=1.0, linestyle=(0, (4, 3)),
+                color=colour, alpha=0.8)
+        if not args.no_shade:
+            ax.fill_between(xs, b.low, b.high, step="post", alpha=0.18, color=colour,
+                            linewidth=0)
+
+    if args.threshold is not None:
+        ax.axhline(
+            args.threshold,
+            color="#888888",
+            linestyle="--",
+            linewidth=1.0,
+            label=f"COVET engine branch-coverage threshold ({args.threshold:.0f}%)",
+        )
+
+    ax.set_xlim(left=0, right=x_max_ms / time_div)
+    ax.set_ylim(0, 100)
+    if args.include_startup:
+        ax.set_xlabel(f"Elapsed JDart time ({time_unit})")
+    else:
+        ax.set_xlabel(f"Exploration time since first path ({time_unit})")
+    ax.set_ylabel("Branch coverage (%)")
+    if args.title:
+        ax.set_title(args.title)
+    else:
+        names = " vs ".join(display_label(b.label) for b in bands)
+        ax.set_title(f"Coverage over time (p{low_pct:g}–p{high_pct:g} band, dashed = median) — {names}")
+    ax.grid(True, linestyle=":", alpha=0.5)
+    ax.legend(loc="lower right", fontsize=9, framealpha=0.95)
+    fig.tight_layout()
+
+    out_path = Path(args.output) if args.output else Path("coverage-curve-aggregate.png")
+    fig.savefig(out_path, dpi=args.dpi, bbox_inches="tight")
+    plt.close(fig)
+    print(f"[plot] saved {out_path}")
+
+
+def parse_band(spec: str) -> tuple:
+    low, _, high = spec.partition(",")
+    try:
+        band = (float(low), float(high))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected LOW,HIGH percentiles, got {spec!r}")
+    if not 0 <= band[0] < band[1] <= 100:
+        raise argparse.ArgumentTypeError(f"need 0 <= LOW < HIGH <= 100, got {spec!r}")
+    return band
+
+
+# ================================================================
+# BATCH MODE
+# ================================================================
+#
+# --batch treats every input as an archive root holding one folder per
+# experiment, each with <strategy>/coverage-curve.tsv subfolders. Every
+# experiment is rendered and summarised on a process pool whose workers
+# import matplotlib once, in their initializer, so a figure only pays for
+# drawing; a combined index is written to each root afterwards.
+
+BATCH_TSV_NAME = "coverage-curve.tsv"
+BATCH_SUMMARY_NAME = "coverage-summary.txt"
+BATCH_INDEX_NAME = "coverage-index"
+
+
+def discover_experiments(root: Path) -> dict:
+    """``{experiment folder: [tsv, ...]}`` for every ``coverage-curve.tsv``
+    below ``root``, keyed by the TSV's grandparent. Known strategies come
+    first, in :data:`DEFAULT_COLOURS` order."""
+    order = list(DEFAULT_COLOURS)
+
+    def strategy_key(tsv: Path) -> tuple:
+        name = tsv.parent.name
+        return (order.index(name) if name in order else len(order), name)
+
+    experiments: dict = {}
+    for tsv in root.rglob(BATCH_TSV_NAME):
+        experiments.setdefault(tsv.parent.parent, []).append(tsv)
+    return {exp: sorted(tsvs, key=strategy_key) for exp, tsvs in sorted(experiments.items())}
+
+
+def _init_batch_worker() -> None:
+    try:
+        import matplotlib
+        matplotlib.use("Agg")  # headless-safe
+        import matplotlib.pyplot  # noqa: F401  -- warm import, reused by every task
+    except ImportError:
+        pass  # plot_curves() reports it
+
+
+def _render_experiment(job) -> tuple:
+    """Summarise (and plot) one experiment. Returns ``(experiment, rows,
+    error)``; ``rows`` holds one index row per curve."""
+    experiment, title, tsvs, args = job
+    # One unreadable curve, unwritable directory or failing plot becomes an
+    # error row in the index instead of aborting the whole batch.
+    try:
+        curves = [
+            load_curve(tsv, None, args.end_time, args.include_startup, not args.no_cache)
+            for tsv in tsvs
+        ]
+        apply_window_mode(curves, args.window_mode)
+
+        summary = io.StringIO()
+        stats, time_to = print_summary(curves, args, summary)
+        (experiment / BATCH_SUMMARY_NAME).write_text(summary.getvalue())
+
+        figure = None
+        if not args.no_plot:
+            figure = experiment / args.figure_name
+            names = " vs ".join(display_label(c.label) for c in curves)
+            task_args = argparse.Namespace(**{
+                **vars(args),
+                "inputs": tsvs,
+                "output": figure,
+                "title": args.title or f"{title} — {names}",
+            })
+            with contextlib.redirect_stdout(io.StringIO()):
+                plot_curves(curves, task_args)
+    except (OSError, ValueError, ArithmeticError, RuntimeError) as e:
+        plt = sys.modules.get("matplotlib.pyplot")
+        if plt is not None:
+            plt.close("all")  # the worker renders the next experiment
+        return experiment, [], str(e)
+
+    rows = []
+    for i, c in enumerate(curves):
+        rows.append((
+            c.label, int(stats.first_path_ms[i]), int(stats.end_time_ms[i]),
+            float(stats.final_coverage[i]), float(stats.auc_raw[i]), float(stats.auc_avg[i]),
+            figure, [] if time_to is None else list(time_to[i]),
+        ))
+    return experiment, rows, None
+
+
+def write_batch_index(root: Path, results: Sequence[tuple], args: argparse.Namespace) -> None:
+    """``coverage-index.tsv`` (one row per curve) and ``coverage-index.md``
+    (one section per experiment with its figure) in ``root``."""
+    thresholds = args.time_to or ()
+    tsv_path = root / f"{BATCH_INDEX_NAME}.tsv"
+    with tsv_path.open("w", newline="") as f:
+        writer = csv.writer(f, delimiter="\t")
+        writer.writerow(
+            ["experiment", "label", "t_1_ms", "end_ms", "final_coverage", "auc",
+             "auc_avg", "figure"] + [f"time_to_{t:g}_ms" for t in thresholds]
+        )
+        for experiment, rows, _ in results:
+            for label, t_1, end, final, auc, auc_avg, figure, time_to in rows:
+                writer.writerow(
+                    [experiment.relative_to(root).as_posix() or ".", label, t_1, end,
+                     f"{final:.2f}", f"{auc:.1f}", f"{auc_avg:.2f}",
+                     figure.relative_to(root).as_posix() if figure else ""]
+                    + ["" if np.isnan(v) else f"{v:.0f}" for v in time_to]
+                )
+
+    md_path = root / f"{BATCH_INDEX_NAME}.md"
+    with md_path.open("w") as f:
+        f.write(f"# Coverage curves — {root.resolve().name}\n")
+        for experiment, rows, error in results:
+            name = experiment.relative_to(root).as_posix() or "."
+            f.write(f"\n## {name}\n\n")
+            if error:
+                f.write(f"Failed: {error}\n")
+                continue
+            if rows[0][6] is not None:
+                f.write(f"![{name}]({rows[0][6].relative_to(root).as_posix()})\n\n")
+            f.write("| label | final % | AUC avg % |"
+                    + "".join(f" t→{t:g}% (ms) |" for t in thresholds) + "\n")
+            f.write("|---|---:|---:|" + "---:|" * len(thresholds) + "\n")
+            for label, _, _, final, _, auc_avg, _, time_to in rows:
+                f.write(f"| {display_label(label)} | {final:.2f} | {auc_avg:.2f} |"
+                        + "".join(f" {_format_ms(v)} |" for v in time_to) + "\n")
+    print(f"[batch] index {tsv_path} and {md_path}")
+
+
+def render_batch(roots: Sequence[Path], args: argparse.Namespace) -> int:
+    """Render every experiment below ``roots``; returns the number of failures."""
+    jobs_by_root = {}
+    for root in roots:
+        experiments = discover_experiments(root)
+        if not experiments:
+            sys.stderr.write(f"[batch] no {BATCH_TSV_NAME} found below {root}\n")
+        jobs_by_root[root] = [
+            (experiment, experiment.relative_to(root).as_posix() or root.resolve().name, tsvs, args)
+            for experiment, tsvs in experiments.items()
+        ]
+    work = [job for jobs in jobs_by_root.values() for job in jobs]
+    if not work:
+        return 0
+
+    workers = min(args.jobs or os.cpu_count() or 1, len(work))
+    if workers <= 1:
+        _init_batch_worker()
+        results = map(_render_experiment, work)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers, initializer=_init_batch_worker)
+        results = pool.map(_render_experiment, work)
+
+    failures = 0
+    by_experiment = {}
+    try:
+        for done, (experiment, rows, error) in enumerate(results, 1):
+            by_experiment[experiment] = (experiment, rows, error)
+            if error:
+                failures += 1
+                sys.stderr.write(f"[batch] {experiment}: {error}\n")
+            else:
+                print(f"[batch] {done}/{len(work)} {experiment}", flush=True)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    for root, jobs in jobs_by_root.items():
+        if jobs:
+            write_batch_index(root, [by_experiment[job[0]] for job in jobs], args)
+    return failures
+
+
+# ================================================================
+# RUN REGISTRY
+# ================================================================
+#
+# --registry reads curves straight from the SQLite run registry (blobs of
+# the parsed columns) instead of the TSVs; --record adds the inputs to it.
+
+def registry_curves(args: argparse.Namespace) -> tuple:
+    """``(groups, curves)`` for the runs selected from ``args.registry``;
+    ``groups`` maps each strategy to the sources of its runs, in the order
+    of ``curves``, like :func:`group_inputs` does for TSV paths."""
+    import run_registry
+
+    conn = run_registry.open_registry(args.registry)
+    runs = run_registry.select_runs(
+        conn, args.sut, run_registry.parse_strategies(args.strategy), args.last, args.since
+    )
+    order = list(DEFAULT_COLOURS)
+    runs.sort(key=lambda run: order.index(run.strategy) if run.strategy in order else len(order))
+    per_strategy = {}
+    for run in runs:
+        per_strategy[run.strategy] = per_strategy.get(run.strategy, 0) + 1
+
+    groups: dict = {}
+    curves: List[Curve] = []
+    for run in runs:
+        times, coverage, codes, names = run_registry.run_curve_columns(conn, run.id)
+        times_ms = np.frombuffer(times, dtype="<i8").astype(np.int64)
+        end = args.end_time if args.end_time is not None else run.end_ms
+        if end < times_ms[-1]:
+            raise ValueError(f"--end-time {end} ms precedes last sample of run {run.id} ({run.source})")
+        groups.setdefault(run.strategy, []).append(Path(run.source))
+        curves.append(Curve(
+            label=run.strategy if per_strategy[run.strategy] == 1 else f"{run.strategy} #{run.id}",
+            times_ms=times_ms,
+            coverage=np.frombuffer(coverage, dtype="<f8").astype(np.float64),
+            path_types=np.frombuffer(codes, dtype=np.int8).copy(),
+            path_type_names=names,
+            end_time_ms=end,
+            include_startup=args.include_startup,
+        ))
+    conn.close()
+    return groups, curves
+
+
+def record_curves(db: Path, paths: Sequence[Path], curves: Sequence[Curve],
+                  args: argparse.Namespace) -> None:
+    """Add (or refresh) ``curves``, loaded from ``paths``, in the registry ``db``."""
+    import run_registry
+
+    base = run_registry.run_config_from_jpf(args.jpf) if args.jpf else run_registry.RunConfig()
+    conn = run_registry.open_registry(db)
+    for path, curve in zip(paths, curves):
+        folder_sut, folder_strategy = run_registry.layout_names(path)
+        config = run_registry.RunConfig(
+            sut=args.sut or base.sut or folder_sut,
+            strategy=args.strategy or base.strategy or folder_strategy,
+            exploration=base.exploration,
+            termination=base.termination,
+            z3_timeout=base.z3_timeout,
+        )
+        run_registry.record_run(conn, curve, path, config)
+    conn.close()
+    print(f"[registry] recorded {len(curves)} run(s) in {db}")
+
+
 def main() -> None:
     parser = argparse.ArgumentParser(
         description="Plot JDart coverage-over-time from a coverage-curve.tsv and compute AUC."
     )
     parser.add_argument(
         "inputs",
-        nargs="+",
+        nargs="*",
         type=Path,
-        help="One or more coverage-curve.tsv files. Multiple files are overlaid.",
+        help="One or more coverage-curve.tsv files. Multiple files are overlaid. "
+        "Omitted with --registry.",
     )
     parser.add_argument(
         "-o",
@@ -526,6 +1559,14 @@ def main() -> None:
         default=150,
         help="Raster output DPI. Default: 150.",
     )
+    parser.add_argument(
+        "--no-decimate",
+        action="store_true",
+        help="Draw every sample. By default, step vertices and IGNORE markers "
+        "that fall on an already-drawn pixel at the output --dpi are skipped, "
+        "so render time and file size stay flat for dense curves (stacked "
+        "IGNORE markers then no longer darken).",
+    )
     parser.add_argument(
         "--no-plot",
         action="store_true",
@@ -552,57 +1593,218 @@ def main() -> None:
         "'own': each curve uses its own window (window-length biased; not "
         "recommended for cross-strategy comparison).",
     )
+    parser.add_argument(
+        "--follow",
+        action="store_true",
+        help="Keep running and tail the inputs as they grow (a running JDart "
+        "evaluation). Inputs not ending in .tsv are read as logs and scanned "
+        "for jdart.evaluation 'elapsed=Xms branch_coverage=Y%%' lines. The "
+        "summary (and plot, unless --no-plot) is refreshed whenever new "
+        "samples arrive.",
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=5.0,
+        help="Seconds between polls in --follow mode. Default: 5.",
+    )
+    parser.add_argument(
+        "--idle-exit",
+        type=float,
+        default=None,
+        help="In --follow mode, stop after this many seconds without new "
+        "samples. Default: run until interrupted.",
+    )
+    parser.add_argument(
+        "--time-to",
+        type=parse_thresholds,
+        default=None,
+        metavar="PCT[,PCT...]",
+        help="Also report how long each curve took to first reach these "
+        "branch-coverage thresholds, e.g. 50,75,90,95 (time since t_1, or "
+        "since t=0 with --include-startup). With --aggregate, reports the "
+        "median over the runs that reached each threshold.",
+    )
+    parser.add_argument(
+        "--time-to-csv",
+        type=Path,
+        default=None,
+        help="Write the time-to-threshold values to this CSV, one row per "
+        "input and threshold. Implies --time-to "
+        f"{','.join(f'{t:g}' for t in DEFAULT_TIME_TO)} if not given.",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always parse the TSVs. By default each TSV's parsed columns are "
+        "kept in a <name>.tsv.npz sidecar and reused while the TSV's mtime "
+        "and size are unchanged.",
+    )
+    parser.add_argument(
+        "--aggregate",
+        action="store_true",
+        help="Treat the inputs as repeated runs: group them by strategy folder "
+        "(see --group-level), resample every run onto a shared time grid and "
+        "plot the mean with a percentile band per strategy instead of one "
+        "line per run. Prints per-strategy AUC distributions.",
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Treat the inputs as archive roots: render every experiment "
+        "folder below them (<experiment>/<strategy>/coverage-curve.tsv) on "
+        "a process pool, writing <experiment>/coverage-curve.png (or the "
+        "file name given with -o) and coverage-summary.txt, plus a combined "
+        "coverage-index.tsv/.md in each root.",
+    )
+    parser.add_argument(
+        "--group-level",
+        type=int,
+        default=2,
+        help="With --aggregate, group runs by their N-th ancestor folder "
+        "(1 = parent). Default: 2, i.e. <strategy>/<run>/coverage-curve.tsv.",
+    )
+    parser.add_argument(
+        "--band",
+        type=parse_band,
+        default=(10.0, 90.0),
+        help="With --aggregate, percentiles of the shaded band. Default: 10,90.",
+    )
+    parser.add_argument(
+        "--grid-points",
+        type=int,
+        default=DEFAULT_GRID_POINTS,
+        help=f"With --aggregate, samples of the shared time grid. Default: {DEFAULT_GRID_POINTS}.",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="With --aggregate, worker processes used to load the TSVs; with "
+        "--batch, worker processes rendering experiments. Default: one per "
+        "CPU core.",
+    )
+    parser.add_argument(
+        "--registry",
+        type=Path,
+        default=None,
+        metavar="DB",
+        help="Load the curves from this run registry (see run_registry.py) "
+        "instead of TSVs, selected with --sut / --strategy / --last / "
+        "--since. Combine with --aggregate for per-strategy bands.",
+    )
+    parser.add_argument(
+        "--record",
+        type=Path,
+        default=None,
+        metavar="DB",
+        help="Register the input TSVs in this run registry (tagged with "
+        "--sut / --strategy / --jpf when given).",
+    )
+    parser.add_argument("--sut", default=None, help="Registry SUT name.")
+    parser.add_argument(
+        "--strategy",
+        default=None,
+        help="Registry strategy name(s); comma-separated for --registry.",
+    )
+    parser.add_argument(
+        "--last",
+        type=int,
+        default=None,
+        help="With --registry, only the newest N runs per strategy.",
+    )
+    parser.add_argument(
+        "--since",
+        default=None,
+        help="With --registry, only runs on or after this ISO date.",
+    )
+    parser.add_argument(
+        "--jpf",
+        type=Path,
+        default=None,
+        help="With --record, the sut.jpf the runs used (termination config, SUT).",
+    )
     args = parser.parse_args()
 
     if args.threshold is not None and args.threshold < 0:
         args.threshold = None
+    if args.time_to_csv is not None and args.time_to is None:
+        args.time_to = DEFAULT_TIME_TO
+
+    if args.registry is not None and (args.follow or args.batch):
+        parser.error("--registry cannot be combined with --follow or --batch")
+    if args.registry is None and not args.inputs:
+        parser.error("no inputs given (or use --registry)")
+
+    if args.batch:
+        args.figure_name = args.output.name if args.output else "coverage-curve.png"
+        sys.exit(1 if render_batch(args.inputs, args) else 0)
+
+    if args.registry is not None:
+        if args.inputs:
+            parser.error("--registry loads the curves itself; pass no TSV inputs")
+        if args.output is None and not args.aggregate:
+            args.output = Path("coverage-curve-registry.png")
+        try:
+            groups, curves = registry_curves(args)
+        except ValueError as e:
+            sys.exit(f"[registry] {e}")
+        if not curves:
+            sys.exit("[registry] no matching runs")
+
+    if args.aggregate:
+        if args.registry is None:
+            groups = group_inputs(args.inputs, args.group_level)
+            paths = [path for members in groups.values() for path in members]
+            curves = load_curves_parallel(paths, args.include_startup, args.jobs, not args.no_cache)
+            if args.record is not None:
+                record_curves(args.record, paths, curves, args)
+        bands = aggregate(groups, curves, args)
+        print_aggregate_summary(bands)
+        if args.time_to:
+            print()
+            print_time_to_summary(bands, args.time_to)
+        if args.time_to_csv is not None:
+            write_time_to_csv(
+                args.time_to_csv,
+                ((b.label, path, row) for b in bands
+                 for path, row in zip(groups[b.label], b.time_to)),
+                args.time_to,
+            )
+        if not args.no_plot:
+            plot_bands(bands, args)
+        return
 
-    labels = parse_labels(args.labels, len(args.inputs))
-    curves: List[Curve] = []
-    for tsv_path, label in zip(args.inputs, labels):
-        curves.append(
-            load_curve(tsv_path, label, args.end_time, args.include_startup)
-        )
+    labels = parse_labels(args.labels, len(args.inputs or curves))
+    if args.registry is not None:
+        for curve, label in zip(curves, labels):
+            curve.label = label or curve.label
+
+    if args.follow:
+        tails = [CurveTail(path, label) for path, label in zip(args.inputs, labels)]
+        follow(tails, args)
+        return
+    if args.registry is not None:
+        sources = [path for members in groups.values() for path in members]
+    else:
+        sources = args.inputs
+        curves = []
+        for tsv_path, label in zip(args.inputs, labels):
+            curves.append(
+                load_curve(tsv_path, label, args.end_time, args.include_startup, not args.no_cache)
+            )
+        if args.record is not None:
+            record_curves(args.record, args.inputs, curves, args)
 
     apply_window_mode(curves, args.window_mode)
 
     # Text summary — goes to stdout regardless of --no-plot.
-    # The table shows each curve's NATURAL characteristics (raw T_end from
-    # telemetry, window = T_end - t_1). The shared AUC integration window
-    # (which may differ from the per-curve natural window under extended /
-    # common modes) is called out in the trailing note.
-    header = (
-        f"{'label':<30}  {'t_1 (ms)':>8}  {'T_end (ms)':>10}  "
-        f"{'window (ms)':>11}  {'final %':>8}  {'AUC (%·ms)':>12}  {'AUC avg %':>10}"
-    )
-    print(header)
-    print("-" * len(header))
-    for c in curves:
-        print(
-            f"{c.label:<30}  {c.first_path_ms:>8d}  {c.end_time_ms:>10d}  "
-            f"{c.own_window_ms:>11d}  {c.final_coverage:>8.2f}  "
-            f"{c.auc_raw:>12.1f}  {c.auc_avg:>10.2f}"
-        )
-
-    startup_note = (
-        "from t=0" if args.include_startup else "from t_1 (startup excluded)"
-    )
-    if args.window_mode == "extended":
-        auc_window = max(c.own_window_ms for c in curves)
-        print(
-            f"\nAUC integrated {startup_note} over {auc_window} ms (longest "
-            "natural window; curves that terminated earlier are extended at "
-            "their final coverage)"
-        )
-    elif args.window_mode == "common":
-        auc_window = min(c.own_window_ms for c in curves)
-        print(
-            f"\nAUC integrated {startup_note} over {auc_window} ms (shortest "
-            "natural window; curves that ran longer are truncated)"
-        )
-    else:
-        print(
-            f"\nAUC integrated {startup_note} over each curve's own window"
+    _, time_to = print_summary(curves, args)
+    if args.time_to_csv is not None:
+        write_time_to_csv(
+            args.time_to_csv,
+            zip((c.label for c in curves), sources, time_to),
+            args.time_to,
         )
 
     if args.no_plot:
@@ -0,0 +1,581 @@
+# Copyright (c) 2025-2026 Yoran Mertens
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+#!/usr/bin/env python3
+
+"""
+Local SQLite registry of evaluation runs.
+
+Every comparison used to re-parse ``coverage-curve.tsv`` files and block
+maps from the filesystem. The registry ingests each run once and keeps:
+
+* the coverage curve itself, as packed little-endian blobs (int64 elapsed
+  ms, float64 coverage, int8 path-type codes), so curves can be plotted or
+  re-integrated without the TSV;
+* the AUC summary (t_1, end, final coverage, AUC over the run's own window
+  from t_1);
+* the termination config: exploration strategy, ``jdart.termination``
+  (class and arguments) and ``z3.timeout``, read from a ``sut.jpf`` and its
+  ``@include`` chain;
+* block-map analyzer summaries (``analyze_block_map.py --record``), one
+  key/value row per summary counter.
+
+Runs are indexed on SUT, strategy and date, so cross-run questions such as
+"median AUC of COVET vs DFS over the last 100 runs of LongDivision" are a
+few indexed lookups instead of a filesystem crawl.
+
+Usage::
+
+    python3 scripts/run_registry.py ingest runs.db <tsv-or-dir> [...] \\
+        [--sut NAME] [--strategy NAME] [--jpf covet-engine/configs/sut.jpf] \\
+        [--date YYYY-MM-DD[THH:MM:SS]]
+    python3 scripts/run_registry.py query runs.db [--sut NAME] \\
+        [--strategy A,B] [--last N] [--since DATE]
+
+Directories are searched recursively for ``coverage-curve.tsv``. Unless
+given explicitly, a run's strategy comes from the ``--jpf`` exploration
+class or else the nearest ancestor folder named ``dynamic-coverage-guided``,
+``dfs`` or ``bfs`` (the TSV's parent if there is none), its SUT from the
+simple class name of ``concolic.method.*`` in the ``--jpf`` chain or else
+the folder above the strategy folder, and its date from
+the TSV's modification time. Re-ingesting an unchanged TSV with the same
+SUT, strategy, termination config and date is a no-op; otherwise its row
+is replaced.
+
+``plot_coverage_curve.py --registry runs.db --sut NAME`` plots registered
+runs (``--record runs.db`` registers its inputs), and
+``analyze_block_map.py --registry runs.db`` prints the stored analyzer
+summaries.
+"""
+from __future__ import annotations
+
+import argparse
+import datetime
+import re
+import sqlite3
+import statistics
+import sys
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence
+
+SCHEMA_VERSION = 1
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id              INTEGER PRIMARY KEY,
+    sut             TEXT NOT NULL,
+    strategy        TEXT NOT NULL,
+    run_at          TEXT NOT NULL,      -- ISO-8601 UTC
+    source          TEXT NOT NULL UNIQUE,
+    source_mtime_ns INTEGER,
+    source_size     INTEGER,
+    exploration     TEXT,
+    termination     TEXT,
+    z3_timeout      INTEGER,
+    samples         INTEGER NOT NULL,
+    first_path_ms   INTEGER NOT NULL,
+    end_ms          INTEGER NOT NULL,
+    final_coverage  REAL NOT NULL,
+    auc_raw         REAL NOT NULL,      -- own window, from t_1
+    auc_avg         REAL NOT NULL,
+    times_ms        BLOB NOT NULL,      -- little-endian int64, leading 0
+    coverage        BLOB NOT NULL,      -- little-endian float64, leading 0.0
+    path_types      BLOB NOT NULL,      -- int8 codes into path_type_names
+    path_type_names TEXT NOT NULL       -- comma-separated
+);
+CREATE INDEX IF NOT EXISTS runs_sut ON runs (sut, strategy, run_at);
+CREATE INDEX IF NOT EXISTS runs_strategy ON runs (strategy, run_at);
+CREATE INDEX IF NOT EXISTS runs_date ON runs (run_at);
+
+CREATE TABLE IF NOT EXISTS block_maps (
+    id              INTEGER PRIMARY KEY,
+    sut             TEXT NOT NULL,
+    recorded_at     TEXT NOT NULL,
+    block_map       TEXT NOT NULL UNIQUE,
+    coverage_data   TEXT,
+    seconds         REAL
+);
+CREATE INDEX IF NOT EXISTS block_maps_sut ON block_maps (sut, recorded_at);
+CREATE INDEX IF NOT EXISTS block_maps_date ON block_maps (recorded_at);
+
+CREATE TABLE IF NOT EXISTS block_map_stats (
+    block_map_id    INTEGER NOT NULL REFERENCES block_maps (id) ON DELETE CASCADE,
+    key             TEXT NOT NULL,
+    value           REAL,
+    PRIMARY KEY (block_map_id, key)
+) WITHOUT ROWID;
+"""
+
+CURVE_NAME = "coverage-curve.tsv"
+
+# jdart.exploration class -> the strategy folder names of the evaluation layout.
+EXPLORATION_STRATEGIES = {
+    "CoverageHeuristicStrategy": "dynamic-coverage-guided",
+    "DFSStrategy": "dfs",
+    "BFSStrategy": "bfs",
+}
+
+
+def open_registry(path: Path) -> sqlite3.Connection:
+    """Open (creating if needed) the registry at ``path``."""
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA foreign_keys = ON")
+    conn.execute("PRAGMA journal_mode = WAL")
+    version = conn.execute("PRAGMA user_version").fetchone()[0]
+    if version not in (0, SCHEMA_VERSION):
+        conn.close()
+        raise ValueError(f"{path}: registry schema v{version}, expected v{SCHEMA_VERSION}")
+    conn.executescript(SCHEMA)
+    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+    return conn
+
+
+def iso_date(value: float | str | None = None) -> str:
+    """ISO-8601 UTC timestamp of a POSIX time (now if ``None``); strings are
+    validated and normalised."""
+    if isinstance(value, str):
+        parsed = datetime.datetime.fromisoformat(value)
+        if parsed.tzinfo is not None:
+            parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+        return parsed.isoformat(timespec="seconds")
+    stamp = datetime.datetime.now(datetime.timezone.utc) if value is None else \
+        datetime.datetime.fromtimestamp(value, datetime.timezone.utc)
+    return stamp.replace(tzinfo=None).isoformat(timespec="seconds")
+
+
+# ================================================================
+# RUN CONFIG (sut.jpf)
+# ================================================================
+
+JPF_ASSIGNMENT = re.compile(r"([^=+\s]+)\s*(\+?=)\s*(.*)")
+
+
+def read_jpf_properties(path: Path, props: Optional[Dict[str, str]] = None) -> Dict[str, str]:
+    """Properties of a JPF config, following ``@include`` (relative to the
+    including file) in order, so later assignments override earlier ones.
+    ``key += value`` appends with a comma. Missing includes (e.g. a
+    ``sut_gen.jpf`` that was never generated) are skipped."""
+    props = {} if props is None else props
+    try:
+        text = path.read_text()
+    except OSError:
+        return props
+    text = re.sub(r"\\\n\s*", "", text)  # line continuations
+    for raw in text.splitlines():
+        line = raw.strip()
+        if not line or line.startswith("#"):
+            continue
+        match = JPF_ASSIGNMENT.match(line)
+        if match is None:
+            continue
+        key, op, value = match.groups()
+        append = op == "+="
+        if key == "@include":
+            read_jpf_properties(path.parent / value, props)
+        elif append and props.get(key):
+            props[key] = f"{props[key]},{value}"
+        else:
+            props[key] = value
+    return props
+
+
+@dataclass
+class RunConfig:
+    sut: Optional[str] = None
+    strategy: Optional[str] = None
+    exploration: Optional[str] = None
+    termination: Optional[str] = None
+    z3_timeout: Optional[int] = None
+
+
+def run_config_from_jpf(path: Path) -> RunConfig:
+    """SUT, strategy and termination settings of the run configured by ``path``."""
+    props = read_jpf_properties(path)
+    config = RunConfig()
+
+    exploration = props.get("jdart.exploration")
+    if exploration:
+        config.exploration = exploration
+        simple = exploration.split("(", 1)[0].rsplit(".", 1)[-1]
+        config.strategy = EXPLORATION_STRATEGIES.get(simple, simple)
+    config.termination = props.get("jdart.termination")
+    timeout = props.get("z3.timeout")
+    if timeout and timeout.isdigit():
+        config.z3_timeout = int(timeout)
+
+    # concolic.method.<name> = <fully.qualified.Class>.<name>(<params>)
+    method = props.get("concolic.method")
+    target = props.get(f"concolic.method.{method}") if method else None
+    if target:
+        qualified = target.split("(", 1)[0].rsplit(".", 1)[0]
+        config.sut = qualified.rsplit(".", 1)[-1]
+    return config
+
+
+# ================================================================
+# RUNS
+# ================================================================
+
+@dataclass
+class RunRecord:
+    id: int
+    sut: str
+    strategy: str
+    run_at: str
+    source: str
+    exploration: Optional[str]
+    termination: Optional[str]
+    z3_timeout: Optional[int]
+    samples: int
+    first_path_ms: int
+    end_ms: int
+    final_coverage: float
+    auc_raw: float
+    auc_avg: float
+
+
+RUN_COLUMNS = ", ".join(RunRecord.__dataclass_fields__)
+
+
+def is_registered(conn: sqlite3.Connection, source: Path, config: RunConfig,
+                  run_at: Optional[str] = None) -> bool:
+    """True when ``source`` is registered with its current mtime and size and
+    with the same ``config`` (and ``run_at``, if given), i.e. when recording
+    it again would not change its row."""
+    stat = source.stat()
+    row = conn.execute(
+        "SELECT source_mtime_ns, source_size, sut, strategy, exploration, termination, "
+        "z3_timeout, run_at FROM runs WHERE source = ?",
+        (str(source.resolve()),),
+    ).fetchone()
+    if row is None:
+        return False
+    expected = (stat.st_mtime_ns, stat.st_size, config.sut, config.strategy,
+                config.exploration, config.termination, config.z3_timeout,
+                run_at or iso_date(stat.st_mtime))
+    return tuple(row) == expected
+
+
+def record_run(conn: sqlite3.Connection, curve, source: Path, config: RunConfig,
+               run_at: Optional[str] = None) -> int:
+    """Insert or replace the run read from ``source``.
+
+    ``curve`` is a ``plot_coverage_curve.Curve``; its AUC is taken over its
+    own window from t_1, independent of any window mode applied to it.
+    ``config.sut`` and ``config.strategy`` must be set. Returns the run id.
+    """
+    stat = source.stat()
+    start = curve.first_path_ms
+    end = curve.end_time_ms
+    window = max(end - start, 0)
+    auc_raw = _own_window_auc(curve)
+    row = {
+        "sut": config.sut,
+        "strategy": config.strategy,
+        "run_at": run_at or iso_date(stat.st_mtime),
+        "source": str(source.resolve()),
+        "source_mtime_ns": stat.st_mtime_ns,
+        "source_size": stat.st_size,
+        "exploration": config.exploration,
+        "termination": config.termination,
+        "z3_timeout": config.z3_timeout,
+        "samples": len(curve.times_ms) - 1,
+        "first_path_ms": start,
+        "end_ms": end,
+        "final_coverage": curve.final_coverage,
+        "auc_raw": auc_raw,
+        "auc_avg": auc_raw / window if window > 0 else 0.0,
+        "times_ms": curve.times_ms.astype("<i8").tobytes(),
+        "coverage": curve.coverage.astype("<f8").tobytes(),
+        "path_types": curve.path_types.astype("i1").tobytes(),
+        "path_type_names": ",".join(curve.path_type_names),
+    }
+    columns = ", ".join(row)
+    updates = ", ".join(f"{key} = excluded.{key}" for key in row if key != "source")
+    with conn:
+        conn.execute(
+            f"INSERT INTO runs ({columns}) VALUES ({', '.join('?' * len(row))}) "
+            f"ON CONFLICT (source) DO UPDATE SET {updates}",
+            tuple(row.values()),
+        )
+        return conn.execute("SELECT id FROM runs WHERE source = ?", (row["source"],)).fetchone()[0]
+
+
+def _own_window_auc(curve) -> float:
+    from plot_coverage_curve import step_integral  # numpy is only needed for curves
+
+    return step_integral(curve.times_ms, curve.coverage, curve.first_path_ms, curve.end_time_ms)
+
+
+def select_runs(conn: sqlite3.Connection, sut: Optional[str] = None,
+                strategies: Optional[Sequence[str]] = None, last: Optional[int] = None,
+                since: Optional[str] = None) -> List[RunRecord]:
+    """Registered runs, newest first within each strategy. ``last`` keeps the
+    newest ``last`` runs *per strategy*; ``since`` is an ISO date."""
+    if not strategies:
+        query = "SELECT DISTINCT strategy FROM runs"
+        params: list = []
+        if sut is not None:
+            query += " WHERE sut = ?"
+            params.append(sut)
+        strategies = [row[0] for row in conn.execute(query + " ORDER BY strategy", params)]
+
+    runs: List[RunRecord] = []
+    for strategy in strategies:
+        query = f"SELECT {RUN_COLUMNS} FROM runs WHERE strategy = ?"
+        params = [strategy]
+        if sut is not None:
+            query += " AND sut = ?"
+            params.append(sut)
+        if since is not None:
+            query += " AND run_at >= ?"
+            params.append(iso_date(since))
+        query += " ORDER BY run_at DESC, id DESC"
+        if last is not None:
+            query += " LIMIT ?"
+            params.append(last)
+        runs.extend(RunRecord(*row) for row in conn.execute(query, params))
+    return runs
+
+
+def run_curve_columns(conn: sqlite3.Connection, run_id: int) -> tuple:
+    """``(times bytes, coverage bytes, path-type code bytes, names)`` of a run,
+    as stored (see :data:`SCHEMA`)."""
+    row = conn.execute(
+        "SELECT times_ms, coverage, path_types, path_type_names FROM runs WHERE id = ?",
+        (run_id,),
+    ).fetchone()
+    if row is None:
+        raise KeyError(run_id)
+    names = row["path_type_names"].split(",") if row["path_type_names"] else []
+    return row["times_ms"], row["coverage"], row["path_types"], names
+
+
+# ================================================================
+# BLOCK MAP SUMMARIES
+# ================================================================
+
+def record_block_map(conn: sqlite3.Connection, sut: str, result: dict,
+                     recorded_at: Optional[str] = None) -> int:
+    """Store one ``analyze_block_map`` result (``block_map``, ``coverage_data``,
+    ``seconds``, ``summary``), replacing an earlier one for the same file."""
+    block_map = str(Path(result["block_map"]).resolve())
+    with conn:
+        conn.execute(
+            "INSERT INTO block_maps (sut, recorded_at, block_map, coverage_data, seconds) "
+            "VALUES (?, ?, ?, ?, ?) ON CONFLICT (block_map) DO UPDATE SET "
+            "sut = excluded.sut, recorded_at = excluded.recorded_at, "
+            "coverage_data = excluded.coverage_data, seconds = excluded.seconds",
+            (sut, recorded_at or iso_date(), block_map,
+             result.get("coverage_data") or None, result.get("seconds")),
+        )
+        block_map_id = conn.execute(
+            "SELECT id FROM block_maps WHERE block_map = ?", (block_map,)
+        ).fetchone()[0]
+        conn.execute("DELETE FROM block_map_stats WHERE block_map_id = ?", (block_map_id,))
+        conn.executemany(
+            "INSERT INTO block_map_stats (block_map_id, key, value) VALUES (?, ?, ?)",
+            ((block_map_id, key, value) for key, value in result["summary"].items()),
+        )
+    return block_map_id
+
+
+def select_block_maps(conn: sqlite3.Connection, sut: Optional[str] = None,
+                      last: Optional[int] = None, since: Optional[str] = None) -> List[dict]:
+    """Stored block-map results, newest first, in the ``analyze_file()``
+    result shape (plus ``sut`` and ``recorded_at``)."""
+    query = "SELECT id, sut, recorded_at, block_map, coverage_data, seconds FROM block_maps"
+    clauses, params = [], []
+    if sut is not None:
+        clauses.append("sut = ?")
+        params.append(sut)
+    if since is not None:
+        clauses.append("recorded_at >= ?")
+        params.append(iso_date(since))
+    if clauses:
+        query += " WHERE " + " AND ".join(clauses)
+    query += " ORDER BY recorded_at DESC, id DESC"
+    if last is not None:
+        query += " LIMIT ?"
+        params.append(last)
+
+    results = []
+    for row in conn.execute(query, params).fetchall():
+        summary = {
+            key: int(value) if value is not None and float(value).is_integer() else value
+            for key, value in conn.execute(
+                "SELECT key, value FROM block_map_stats WHERE block_map_id = ?", (row["id"],)
+            )
+        }
+        results.append({
+            "sut": row["sut"],
+            "recorded_at": row["recorded_at"],
+            "block_map": row["block_map"],
+            "coverage_data": row["coverage_data"] or "",
+            "seconds": row["seconds"] or 0.0,
+            "summary": summary,
+            "error": None,
+        })
+    return results
+
+
+# ================================================================
+# CLI
+# ================================================================
+
+def find_curves(inputs: Iterable[Path]) -> List[Path]:
+    found: List[Path] = []
+    for path in inputs:
+        found.extend(sorted(path.rglob(CURVE_NAME)) if path.is_dir() else [path])
+    return found
+
+
+def layout_names(tsv: Path) -> tuple:
+    """``(sut, strategy)`` guessed from the folders around ``tsv``: the nearest
+    ancestor named like a known strategy (so both ``<sut>/<strategy>/`` and
+    ``<sut>/<strategy>/<run>/`` work) and the folder above it; without one,
+    the grandparent and parent folders."""
+    parents = tsv.resolve().parents
+    known = set(EXPLORATION_STRATEGIES.values())
+    for i, folder in enumerate(parents[:-1]):
+        if folder.name in known:
+            return parents[i + 1].name, folder.name
+    return parents[1].name, parents[0].name
+
+
+def ingest(conn: sqlite3.Connection, tsvs: Sequence[Path], args: argparse.Namespace) -> tuple:
+    """Register ``tsvs``; returns ``(added or updated, unchanged, failed)``."""
+    from plot_coverage_curve import load_curve
+
+    base = run_config_from_jpf(args.jpf) if args.jpf else RunConfig()
+    run_at = iso_date(args.date) if args.date else None
+    added = unchanged = failed = 0
+    for tsv in tsvs:
+        folder_sut, folder_strategy = layout_names(tsv)
+        config = RunConfig(
+            sut=args.sut or base.sut or folder_sut,
+            strategy=args.strategy or base.strategy or folder_strategy,
+            exploration=base.exploration,
+            termination=base.termination,
+            z3_timeout=base.z3_timeout,
+        )
+        try:
+            if is_registered(conn, tsv, config, run_at):
+                unchanged += 1
+                continue
+            curve = load_curve(tsv, None, None, False)
+        except (OSError, ValueError) as e:
+            sys.stderr.write(f"[registry] skipped {tsv}: {e}\n")
+            failed += 1
+            continue
+        record_run(conn, curve, tsv, config, run_at)
+        added += 1
+    return added, unchanged, failed
+
+
+def print_run_summary(runs: Sequence[RunRecord]) -> None:
+    """Per (SUT, strategy): run count and AUC / final coverage distribution."""
+    groups: Dict[tuple, List[RunRecord]] = {}
+    for run in runs:
+        groups.setdefault((run.sut, run.strategy), []).append(run)
+
+    header = (
+        f"{'sut':<24}  {'strategy':<26}  {'runs':>5}  {'AUC avg % median':>16}  "
+        f"{'mean':>7}  {'final % median':>14}  {'newest':>19}"
+    )
+    print(header)
+    print("-" * len(header))
+    for (sut, strategy), members in sorted(groups.items()):
+        auc = [run.auc_avg for run in members]
+        final = [run.final_coverage for run in members]
+        print(
+            f"{sut:<24}  {strategy:<26}  {len(members):>5d}  {statistics.median(auc):>16.2f}  "
+            f"{statistics.fmean(auc):>7.2f}  {statistics.median(final):>14.2f}  "
+            f"{max(run.run_at for run in members):>19}"
+        )
+
+
+def parse_strategies(spec: Optional[str]) -> Optional[List[str]]:
+    return [part.strip() for part in spec.split(",") if part.strip()] if spec else None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="SQLite registry of coverage curves, AUCs and block-map summaries."
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    ingest_parser = sub.add_parser("ingest", help="Register coverage-curve.tsv runs.")
+    ingest_parser.add_argument("registry", type=Path, help="SQLite file (created if missing).")
+    ingest_parser.add_argument(
+        "inputs", nargs="+", type=Path,
+        help=f"TSVs, or directories searched recursively for {CURVE_NAME}.",
+    )
+    ingest_parser.add_argument("--sut", default=None, help="SUT name for every input.")
+    ingest_parser.add_argument("--strategy", default=None, help="Strategy name for every input.")
+    ingest_parser.add_argument(
+        "--jpf", type=Path, default=None,
+        help="sut.jpf the runs used; supplies exploration, termination, "
+        "z3.timeout and (via concolic.method) the SUT name.",
+    )
+    ingest_parser.add_argument(
+        "--date", default=None,
+        help="Run date (ISO-8601) for every input. Default: each TSV's mtime.",
+    )
+
+    query_parser = sub.add_parser("query", help="Summarise registered runs.")
+    query_parser.add_argument("registry", type=Path)
+    query_parser.add_argument("--sut", default=None)
+    query_parser.add_argument("--strategy", default=None, help="Comma-separated strategies.")
+    query_parser.add_argument("--last", type=int, default=None,
+                              help="Only the newest N runs per strategy.")
+    query_parser.add_argument("--since", default=None, help="Only runs on or after this ISO date.")
+    args = parser.parse_args()
+
+    for option in ("date", "since"):
+        value = getattr(args, option, None)
+        if value:
+            try:
+                iso_date(value)
+            except ValueError as e:
+                sys.exit(f"[registry] invalid --{option} {value!r}: {e}")
+
+    try:
+        conn = open_registry(args.registry)
+    except (sqlite3.Error, ValueError) as e:
+        sys.exit(f"[registry] {e}")
+
+    if args.command == "ingest":
+        tsvs = find_curves(args.inputs)
+        added, unchanged, failed = ingest(conn, tsvs, args)
+        print(f"[registry] {added} run(s) recorded, {unchanged} unchanged, "
+              f"{failed} failed -> {args.registry}")
+        sys.exit(1 if failed else 0)
+
+    runs = select_runs(conn, args.sut, parse_strategies(args.strategy), args.last, args.since)
+    if not runs:
+        sys.exit("[registry] no matching runs")
+    print_run_summary(runs)
+
+
+if __name__ == "__main__":
+    main()
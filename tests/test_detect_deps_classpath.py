@@ -0,0 +1,132 @@
+# Copyright (c) 2025-2026 Yoran Mertens
+#
+# Permission is hereby granted, free of charge, to any person obtaining a copy
+# of this software and associated documentation files (the "Software"), to deal
+# in the Software without restriction, including without limitation the rights
+# to use, copy, modify, merge, publish, distribute, sublicense, and/or sell
+# copies of the Software, and to permit persons to whom the Software is
+# furnished to do so, subject to the following conditions:
+#
+# The above copyright notice and this permission notice shall be included in
+# all copies or substantial portions of the Software.
+#
+# THE SOFTWARE IS PROVIDED "AS IS", WITHOUT WARRANTY OF ANY KIND, EXPRESS OR
+# IMPLIED, INCLUDING BUT NOT LIMITED TO THE WARRANTIES OF MERCHANTABILITY,
+# FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL THE
+# AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER
+# LIABILITY, WHETHER IN AN ACTION OF CONTRACT, TORT OR OTHERWISE, ARISING FROM,
+# OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN
+# THE SOFTWARE.
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "scripts"))
+
+import pytest  # noqa: E402
+
+from detect_deps_classpath import (  # noqa: E402
+    UnfingerprintableBuild,
+    build_fingerprint,
+    ivy_retrieved_jars,
+    parse_maven_dependency_list,
+)
+
+
+def write_build_xml(project_dir: Path, pattern: str) -> None:
+    (project_dir / "build.xml").write_text(
+        '<project xmlns:ivy="antlib:org.apache.ivy.ant"><target name="retrieve">'
+        f'<ivy:retrieve pattern="{pattern}"/></target></project>'
+    )
+
+
+def test_default_pattern_has_no_per_conf_directory(tmp_path):
+    # Ivy's default pattern retrieves every conf into one lib/; it must not
+    # crash on the adjacent tokens, and must not be used for a single conf.
+    (tmp_path / "lib").mkdir()
+    (tmp_path / "lib" / "junit-4.13.jar").write_text("")
+    assert ivy_retrieved_jars(tmp_path, "runtime") is None
+
+
+def test_per_conf_pattern_with_optional_classifier(tmp_path):
+    write_build_xml(tmp_path, "${ivy.lib.dir}/[conf]/[artifact]-[revision](-[classifier]).[ext]")
+    runtime = tmp_path / "lib" / "runtime"
+    runtime.mkdir(parents=True)
+    (runtime / "guava-31.jar").write_text("")
+    (runtime / "guava-31-tests.jar").write_text("")
+    (runtime / "README.txt").write_text("")
+    (tmp_path / "lib" / "test").mkdir()
+    (tmp_path / "lib" / "test" / "junit-4.13.jar").write_text("")
+
+    jars = ivy_retrieved_jars(tmp_path, "runtime")
+    assert [Path(j).name for j in jars] == ["guava-31-tests.jar", "guava-31.jar"]
+
+
+def test_missing_conf_directory(tmp_path):
+    write_build_xml(tmp_path, "lib/[conf]/[artifact]-[revision].[ext]")
+    assert ivy_retrieved_jars(tmp_path, "test") is None
+
+
+def test_maven_list_artifact_named_like_a_scope():
+    text = """
+The following files have been resolved:
+   org.foo:test:jar:1.0:compile:/r/org/foo/test/1.0/test-1.0.jar -- module test
+   org.bar:runtime:jar:2.0:test:/r/org/bar/runtime/2.0/runtime-2.0.jar (optional)
+   none
+"""
+    cps = parse_maven_dependency_list(text)
+    assert cps["runtime"] == "/r/org/foo/test/1.0/test-1.0.jar"
+    assert cps["test"] == (
+        "/r/org/foo/test/1.0/test-1.0.jar:/r/org/bar/runtime/2.0/runtime-2.0.jar"
+    )
+
+
+def gradle_build(root: Path, files: dict) -> None:
+    for name, text in files.items():
+        (root / name).parent.mkdir(parents=True, exist_ok=True)
+        (root / name).write_text(text)
+
+
+@pytest.mark.parametrize("changed", [
+    "core/build.gradle",
+    "web/build.gradle.kts",
+    "modules/legacy/build.gradle",
+    "gradle/deps.gradle",
+    "buildSrc/src/main/groovy/Conventions.groovy",
+    "plugins/settings.gradle",
+])
+def test_gradle_fingerprint_covers_build_inputs(tmp_path, changed):
+    gradle_build(tmp_path, {
+        "settings.gradle": (
+            "include ':core',\n"
+            "        ':web'\n"
+            "include(\n  ':legacy'  // moved\n)\n"
+            "project(':legacy').projectDir = file('modules/legacy')\n"
+            "includeBuild 'plugins'\n"
+        ),
+        "build.gradle": "apply from: \"$rootDir/gradle/deps.gradle\"\n",
+        "gradle/deps.gradle": "ext.junit = '4.13'\n",
+        "core/build.gradle": "",
+        "web/build.gradle.kts": "",
+        "modules/legacy/build.gradle": "",
+        "buildSrc/src/main/groovy/Conventions.groovy": "",
+        "buildSrc/build/classes/Conventions.class": "",
+        "plugins/settings.gradle": "",
+    })
+    before = build_fingerprint(tmp_path, "gradle")
+    (tmp_path / "buildSrc/build/classes/Conventions.class").write_text("rebuilt")
+    assert build_fingerprint(tmp_path, "gradle") == before
+    (tmp_path / changed).write_text("// changed\n")
+    assert build_fingerprint(tmp_path, "gradle") != before
+
+
+@pytest.mark.parametrize("settings, build", [
+    ("file('.').eachDir { include it.name }\n", ""),
+    ("include ':a'\nproject(':a').projectDir = file(dirs['a'])\n", ""),
+    ("", "apply from: 'https://example.org/deps.gradle'\n"),
+    ("", "apply from: \"$scriptsDir/deps.gradle\"\n"),
+])
+def test_gradle_fingerprint_rejects_computed_layout(tmp_path, settings, build):
+    gradle_build(tmp_path, {"settings.gradle": settings, "build.gradle": build})
+    with pytest.raises(UnfingerprintableBuild):
+        build_fingerprint(tmp_path, "gradle")